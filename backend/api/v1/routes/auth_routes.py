@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 from schemas.auth_schema import LoginRequest, LoginResponse
 from services.auth_service import AuthService
+from core.metrics import TimedRoute
 
-router = APIRouter(tags=["Autenticación"])
+router = APIRouter(tags=["Autenticación"], route_class=TimedRoute)
 
 @router.post("/login", response_model=LoginResponse, summary="Iniciar sesión")
 async def login(credentials: LoginRequest):
@@ -4,8 +4,9 @@ from db.base import SessionLocal
 from schemas.autoparte_schema import AutoparteCreate, AutoparteResponse
 from services.autoparte_service import AutoparteService
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
 
-router = APIRouter(tags=["Autopartes"])
+router = APIRouter(tags=["Autopartes"], route_class=TimedRoute)
 
 
 
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from db.base import SessionLocal
+from schemas.dashboard_schema import DashboardResponse
+from services.dashboard_service import DashboardService
+from core.compression import PrecompressedResponse
+from core.conditional import etag_matches
+from core.metrics import TimedRoute
+
+router = APIRouter(tags=["Dashboard"], route_class=TimedRoute)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_dashboard_service(db: Session = Depends(get_db)) -> DashboardService:
+    return DashboardService(db)
+
+
+@router.get("/", response_model=DashboardResponse, summary="Totales del dashboard")
+def get_dashboard(request: Request, service: DashboardService = Depends(get_dashboard_service)):
+    """
+    Todos los números de la pantalla de inicio en una sola petición:
+    productos (y cuántos están en stock mínimo), servicios, empleados,
+    órdenes pendientes de pago (todo `estadoPago` distinto de "pagado",
+    incluidos los pagos parciales) con el monto por cobrar y las ventas del día.
+
+    Los totales se calculan en una sola consulta y se guardan en caché unos
+    segundos. La respuesta lleva `ETag`: si el cliente envía
+    `If-None-Match` con el mismo valor y los totales no cambiaron, la
+    respuesta es `304 Not Modified` sin cuerpo.
+
+    **Response EXITOSA:
+    ```json
+    {
+        "productos": {"total": 1250, "bajo_stock": 14},
+        "servicios": 30,
+        "empleados": {"total": 15, "activos": 12},
+        "ordenes": {"total": 4200, "pendientes_pago": 35, "por_cobrar": 18450},
+        "ventas": {"cantidad_hoy": 22, "ingresos_hoy": 61300}
+    }
+    ```
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    body, etag = service.dashboard_json()
+    # no-cache: el navegador guarda la respuesta pero revalida siempre (304 si no cambió)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return PrecompressedResponse(body, headers=headers)
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from db.base import SessionLocal
-from schemas.empleado_schema import EmpleadoCreate, EmpleadoResponse
+from schemas.empleado_schema import EmpleadoBatchResponse, EmpleadoCreate, EmpleadoResponse
 from services.empleado_service import EmpleadoService
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
+from core.batch import batch_ids
+from core.serialization import RawJSONResponse, fieldset
 
-router = APIRouter(tags=["Empleados"])
+router = APIRouter(tags=["Empleados"], route_class=TimedRoute)
 
 def get_db():
     db = SessionLocal()
@@ -61,6 +64,7 @@ def create_empleado(
 
 @router.get("/", response_model=list[EmpleadoResponse], summary="Listar todos los empleados")
 def list_empleados(
+    fields: tuple[str, ...] | None = Depends(fieldset(EmpleadoResponse)),
     service: EmpleadoService = Depends(get_empleado_service)
 ):
     """
@@ -89,10 +93,44 @@ def list_empleados(
     **Autenticación:**
     No requiere autenticación (público)
     """
+    if fields is not None:
+        return RawJSONResponse(service.list_empleados_json(fields))
     return service.list_empleados()
 
+@router.get("/batch", response_model=EmpleadoBatchResponse, summary="Obtener varios empleados por ID")
+def get_empleados_batch(
+    ids: list[int] = Depends(batch_ids),
+    service: EmpleadoService = Depends(get_empleado_service)
+):
+    """
+    Obtiene varios empleados en una sola petición.
+
+    Los que están en caché se sirven desde ahí y el resto se lee con una
+    única consulta `IN`. Los ids que no existen se informan en `missing`
+    (la petición no falla).
+
+    **Parámetros:**
+    - **ids** (query): ids separados por coma, máximo 500 (ej: `?ids=15,16,99`)
+
+    **Response EXITOSA:
+    ```json
+    {
+        "items": [{"id": 15, "...": "..."}, {"id": 16, "...": "..."}],
+        "missing": [99]
+    }
+    ```
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return RawJSONResponse(service.get_batch_json(ids))
+
 @router.get("/{id}", response_model=EmpleadoResponse, summary="Obtener empleado por ID")
-def get_empleado(id: int, service: EmpleadoService = Depends(get_empleado_service)):
+def get_empleado(
+    id: int,
+    fields: tuple[str, ...] | None = Depends(fieldset(EmpleadoResponse)),
+    service: EmpleadoService = Depends(get_empleado_service)
+):
     """
     Obtiene un empleado específico por su ID.
     
@@ -121,6 +159,11 @@ def get_empleado(id: int, service: EmpleadoService = Depends(get_empleado_servic
     **Autenticación:**
     No requiere autenticación (público)
     """
+    if fields is not None:
+        body = service.get_by_id_json(id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Empleado no encontrado")
+        return RawJSONResponse(body)
     empleado = service.get_by_id(id)
     if not empleado:
         raise HTTPException(status_code=404, detail="Empleado no encontrado")
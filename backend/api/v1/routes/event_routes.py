@@ -0,0 +1,101 @@
+import asyncio
+
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+
+from core import events
+from core.config import settings
+from core.metrics import TimedRoute
+
+router = APIRouter(tags=["Eventos"], route_class=TimedRoute)
+
+
+def _parse_ids(value: str | None) -> set[int] | None:
+    if not value:
+        return None
+    return {int(item) for item in value.split(",") if item.strip().isdigit()}
+
+
+def _parse_types(value: str | None) -> set[str] | None:
+    if not value:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip() in events.EVENT_TYPES}
+
+
+async def _event_stream(request: Request, last_event_id: int | None, types, producto_ids):
+    sub = events.broker.subscribe()
+    try:
+        # Sugerencia de reconexión para EventSource (ms)
+        yield b"retry: 3000\n\n"
+
+        # La suscripción se abre antes del replay: lo que llegue a la cola y
+        # ya se haya reenviado se descarta por id
+        replayed_until = 0
+        if last_event_id is not None:
+            missed = events.broker.replay(last_event_id)
+            if missed is None:
+                # No se puede reanudar: el cliente debe recargar sus datos
+                replayed_until = events.broker.last_id
+                yield f"id: {replayed_until}\nevent: reset\ndata: {{}}\n\n".encode()
+            else:
+                replayed_until = missed[-1].id if missed else last_event_id
+                for event in missed:
+                    if event.matches(types, producto_ids):
+                        yield event.encode()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Heartbeat: comentario SSE que mantiene viva la conexión en proxies
+                yield b": ping\n\n"
+                continue
+            if event.id <= replayed_until:
+                continue
+            if event.matches(types, producto_ids):
+                yield event.encode()
+            if sub.overflowed and sub.queue.empty():
+                break
+    finally:
+        events.broker.unsubscribe(sub)
+
+
+@router.get("/", summary="Stream de eventos de inventario (SSE)")
+async def stream_events(
+    request: Request,
+    types: str | None = Query(None, description="Tipos separados por coma: stock, price, catalog"),
+    productos: str | None = Query(None, description="IDs de producto separados por coma"),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Stream Server-Sent Events con los cambios de stock, precio y catálogo,
+    emitidos después de cada commit. Reemplaza el polling de `GET /productos`.
+    
+    **Filtros:**
+    - **types** (query): `stock`, `price` y/o `catalog` (por defecto todos)
+    - **productos** (query): solo eventos de esos productos
+    
+    **Reanudación:**
+    El navegador reenvía `Last-Event-ID` al reconectar y se reciben los eventos
+    perdidos que sigan en el buffer. Si ya no están, llega un evento `reset`
+    y el cliente debe recargar el listado.
+    
+    **Ejemplo de evento:**
+    ```
+    id: 42
+    event: stock
+    data: {"producto_id":15,"nombre":"Filtro de Aceite Premium","stock":24,"precioVenta":250,"precioCompra":150,"venta_id":87}
+    ```
+    
+    Cada `EVENTS_HEARTBEAT_SECONDS` se envía un comentario `: ping`.
+    
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return StreamingResponse(
+        _event_stream(request, last_event_id, _parse_types(types), _parse_ids(productos)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
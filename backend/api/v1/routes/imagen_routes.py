@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from schemas.imagen_schema import ImagenResponse
+from core.auth import require_supabase_user
+from core.config import settings
+from core.images import FALLBACK_CACHE, IMMUTABLE, MEDIA_TYPES, store
+from core.metrics import TimedRoute
+
+router = APIRouter(tags=["Imágenes"], route_class=TimedRoute)
+
+PREFIX = "/api/v1/imagenes"
+
+
+@router.post("/", response_model=ImagenResponse, dependencies=[Depends(require_supabase_user)], summary="Subir imagen")
+async def upload_imagen(file: UploadFile = File(...)):
+    """
+    Sube una imagen (JPEG, PNG, WebP o GIF) al almacén local.
+
+    La URL devuelta incluye el hash del contenido: es permanente y se sirve
+    con caché inmutable. El frontend guarda el `hash` como `img` del
+    producto y muestra una miniatura (`/{hash}/sm` o `/{hash}/md`) en lugar
+    del original.
+
+    **Response exitosa:**
+    ```json
+    {
+        "hash": "3f2a9c0d4e5b6a7c8d9e0f1a2b3c4d5e",
+        "url": "/api/v1/imagenes/3f2a9c0d4e5b6a7c8d9e0f1a2b3c4d5e",
+        "miniaturas": {
+            "sm": "/api/v1/imagenes/3f2a9c0d4e5b6a7c8d9e0f1a2b3c4d5e/sm",
+            "md": "/api/v1/imagenes/3f2a9c0d4e5b6a7c8d9e0f1a2b3c4d5e/md",
+            "lg": "/api/v1/imagenes/3f2a9c0d4e5b6a7c8d9e0f1a2b3c4d5e/lg"
+        }
+    }
+    ```
+
+    **Errores:**
+    - 400 Bad Request: Formato no soportado, imagen dañada o con más de IMAGE_MAX_PIXELS píxeles
+    - 413 Payload Too Large: Supera IMAGE_MAX_BYTES (5 MB por defecto)
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    data = await file.read(settings.IMAGE_MAX_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="La imagen supera el tamaño máximo")
+    try:
+        digest, _ = await run_in_threadpool(store.save, data)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {
+        "hash": digest,
+        "url": f"{PREFIX}/{digest}",
+        "miniaturas": {size: f"{PREFIX}/{digest}/{size}" for size in settings.IMAGE_THUMBNAIL_SIZES},
+    }
+
+
+@router.get("/{hash}", summary="Imagen original")
+def get_imagen(hash: str):
+    """
+    Sirve la imagen original. La URL depende del contenido, así que la
+    respuesta es inmutable (`Cache-Control: immutable`, un año).
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    found = store.find_original(hash)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    path, ext = found
+    return FileResponse(path, media_type=MEDIA_TYPES[ext], headers={"Cache-Control": IMMUTABLE})
+
+
+@router.get("/{hash}/{size}", summary="Miniatura de una imagen")
+def get_miniatura(hash: str, size: str):
+    """
+    Sirve la miniatura del tamaño pedido (`sm` 128 px, `md` 320 px, `lg`
+    640 px por defecto, lado mayor). Se genera la primera vez y después se
+    sirve desde disco.
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    if size not in settings.IMAGE_THUMBNAIL_SIZES:
+        raise HTTPException(status_code=404, detail="Tamaño de miniatura no soportado")
+    found = store.thumbnail(hash, size)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    path, media_type, is_thumbnail = found
+    cache_control = IMMUTABLE if is_thumbnail else FALLBACK_CACHE
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": cache_control})
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from db.base import SessionLocal
-from schemas.orden_schema import OrdenCreate, OrdenResponse
+from schemas.orden_schema import OrdenCreate, OrdenResponse, OrdenServicioBase, OrdenServicioUpdate
 from services.orden_service import OrdenService
 from datetime import date
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
+from core.serialization import RawJSONResponse, fast_json_enabled
+from core.streaming import export_response
 
-router = APIRouter(tags=["Ordenes"])
+router = APIRouter(tags=["Ordenes"], route_class=TimedRoute)
 
 def get_db():
     db = SessionLocal()
@@ -34,6 +37,7 @@ def create_orden(
     - **Estado**: Debe ser uno de: "pendiente", "en_proceso", "completado", "cancelado"
     - **Servicios**: Debe incluir al menos 1 servicio
     - **Empleados**: Puede incluir 0 o más empleados
+    - **Precio**: Con servicios es la suma de sus `precio_servicio` (se puede omitir; si se envía debe coincidir). Sin servicios es obligatorio
     
     **Ejemplo de Request CORRECTO:
     ```json
@@ -199,8 +203,27 @@ def list_ordens(
     **Autenticación:
     No requiere autenticación (público)
     """
+    if fast_json_enabled():
+        return RawJSONResponse(service.list_ordens_json())
     return service.list_ordens()
 
+@router.get("/export", summary="Exportar órdenes (streaming)")
+def export_ordenes(formato: str = Query("json", description="json (arreglo) o ndjson (un objeto por línea)")):
+    """
+    Exporta todas las órdenes con el mismo formato que el listado, en streaming.
+
+    Recorre un cursor del lado del servidor y envía el JSON por bloques: la
+    memoria del servidor no crece con el tamaño de la tabla.
+
+    **Parámetros:**
+    - **formato** (query): `json` (por defecto) o `ndjson`
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return export_response(lambda db: OrdenService(db).iter_ordenes(), formato, "ordenes")
+
+
 @router.get("/{id}", response_model=OrdenResponse, summary="Obtener orden por ID", description="Busca una orden específica usando su ID único.")
 def get_orden_by_id(id: int, service: OrdenService = Depends(get_orden_service)):
     """
@@ -220,6 +243,67 @@ def get_orden_by_id(id: int, service: OrdenService = Depends(get_orden_service))
         raise HTTPException(status_code=404, detail="Orden no encontrada")
     return orden
 
+@router.post("/{id}/servicios", response_model=OrdenResponse, dependencies=[Depends(require_supabase_user)], summary="Agregar servicio a una orden")
+def add_orden_servicio(id: int, data: OrdenServicioBase, service: OrdenService = Depends(get_orden_service)):
+    """
+    Agrega una línea de servicio a la orden y recalcula su precio (suma de
+    precio_servicio de todas sus líneas) en la misma transacción.
+
+    **Ejemplo de Request:**
+    ```json
+    {
+        "servicio_id": 5,
+        "precio_servicio": 150
+    }
+    ```
+
+    **Errores:**
+    - 404 Not Found: Si la orden no existe
+    - 400 Bad Request: Si el servicio no existe o el precio es negativo
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    orden = service.add_servicio(id, data)
+    if not orden:
+        raise HTTPException(status_code=404, detail="Orden no encontrada")
+    return orden
+
+@router.patch("/{id}/servicios/{linea_id}", response_model=OrdenResponse, dependencies=[Depends(require_supabase_user)], summary="Cambiar el precio de un servicio de la orden")
+def update_orden_servicio(id: int, linea_id: int, data: OrdenServicioUpdate, service: OrdenService = Depends(get_orden_service)):
+    """
+    Cambia el precio_servicio de una línea (`linea_id` es el `id` de la
+    línea en `servicios`) y recalcula el precio de la orden.
+
+    **Errores:**
+    - 404 Not Found: Si la orden o la línea no existen
+    - 400 Bad Request: Si el precio es negativo
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    orden = service.update_servicio(id, linea_id, data)
+    if not orden:
+        raise HTTPException(status_code=404, detail="Orden o línea de servicio no encontrada")
+    return orden
+
+@router.delete("/{id}/servicios/{linea_id}", response_model=OrdenResponse, dependencies=[Depends(require_supabase_user)], summary="Quitar un servicio de la orden")
+def remove_orden_servicio(id: int, linea_id: int, service: OrdenService = Depends(get_orden_service)):
+    """
+    Quita una línea de servicio y recalcula el precio de la orden.
+
+    **Errores:**
+    - 404 Not Found: Si la orden o la línea no existen
+    - 400 Bad Request: Si es la última línea de la orden
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    orden = service.remove_servicio(id, linea_id)
+    if not orden:
+        raise HTTPException(status_code=404, detail="Orden o línea de servicio no encontrada")
+    return orden
+
 @router.get("/fecha/{fecha}", response_model=list[OrdenResponse], summary="Buscar órdenes por fecha", description="Busca todas las órdenes registradas en una fecha específica.")
 def get_ordens_by_fecha(fecha: date, service: OrdenService = Depends(get_orden_service)):
     """
@@ -231,6 +315,8 @@ def get_ordens_by_fecha(fecha: date, service: OrdenService = Depends(get_orden_s
     Returns:
         list[OrdenResponse]: Lista de órdenes de esa fecha.
     """
+    if fast_json_enabled():
+        return RawJSONResponse(service.get_by_fecha_json(fecha))
     return service.get_by_fecha(fecha)
 
 @router.delete("/{id}", dependencies=[Depends(require_supabase_user)], summary="Eliminar orden", description="Elimina una orden del sistema.")
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from db.base import SessionLocal
-from schemas.producto_schema import ProductoCreate, ProductoResponse
+from schemas.producto_schema import BarcodeAllocationResponse, ProductoBatchResponse, ProductoCreate, ProductoResponse
+from schemas.inventario_schema import AjusteStockCreate, StockHistoryResponse
 from services.producto_service import ProductoService
+from services.inventario_service import InventarioService
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
+from core.batch import MAX_IDS, batch_ids
+from core.labels import label_sheet
+from core.compression import PrecompressedResponse
+from core.serialization import RawJSONResponse, fast_json_enabled, fieldset
+from core.streaming import export_response
 
-router = APIRouter(tags=["Productos"])
+router = APIRouter(tags=["Productos"], route_class=TimedRoute)
 
 
 
@@ -21,6 +32,10 @@ def get_db():
 def get_producto_service(db: Session = Depends(get_db)) -> ProductoService:
     return ProductoService(db)
 
+
+def get_inventario_service(db: Session = Depends(get_db)) -> InventarioService:
+    return InventarioService(db)
+
 @router.post("/", response_model=ProductoResponse, dependencies=[Depends(require_supabase_user)], summary="Crear nuevo producto")
 def create_producto(
     data: ProductoCreate,
@@ -114,6 +129,7 @@ def create_producto(
 
 @router.get("/", response_model=list[ProductoResponse], summary="Listar todos los productos")
 def list_productos(
+    fields: tuple[str, ...] | None = Depends(fieldset(ProductoResponse)),
     service: ProductoService = Depends(get_producto_service)
 ):
     """
@@ -165,14 +181,145 @@ def list_productos(
     - **cod_barras**: Código único del producto
     - **tipo**: Siempre "producto" (no incluye autopartes)
     
+    Con `?fields=id,nombre,stock,precioVenta` solo se leen y devuelven esos campos.
+    
     **Autenticación:
     No requiere autenticación (público)
     """
+    if fields is not None or fast_json_enabled():
+        return PrecompressedResponse(service.list_productos_json(fields))
     return service.list_productos()
 
 
+@router.get("/export", summary="Exportar productos (streaming)")
+def export_productos(formato: str = Query("json", description="json (arreglo) o ndjson (un objeto por línea)")):
+    """
+    Exporta todos los productos con el mismo formato que el listado, en streaming.
+
+    Recorre un cursor del lado del servidor y envía el JSON por bloques: la
+    memoria del servidor no crece con el tamaño de la tabla.
+
+    **Parámetros:**
+    - **formato** (query): `json` (por defecto) o `ndjson`
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return export_response(lambda db: ProductoService(db).iter_productos(), formato, "productos")
+
+
+@router.get("/batch", response_model=ProductoBatchResponse, summary="Obtener varios productos por ID")
+def get_productos_batch(
+    ids: list[int] = Depends(batch_ids),
+    service: ProductoService = Depends(get_producto_service)
+):
+    """
+    Obtiene varios productos en una sola petición.
+
+    Los que están en caché se sirven desde ahí y el resto se lee con una
+    única consulta `IN`. Los ids que no existen se informan en `missing`
+    (la petición no falla).
+
+    **Parámetros:**
+    - **ids** (query): ids separados por coma, máximo 500 (ej: `?ids=15,16,99`)
+
+    **Response EXITOSA:
+    ```json
+    {
+        "items": [{"id": 15, "...": "..."}, {"id": 16, "...": "..."}],
+        "missing": [99]
+    }
+    ```
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return RawJSONResponse(service.get_batch_json(ids))
+
+
+@router.post("/barcodes/allocate", response_model=BarcodeAllocationResponse, dependencies=[Depends(require_supabase_user)], summary="Reservar códigos de barras")
+def allocate_barcodes(
+    categoria: str = Query(..., min_length=1, max_length=100, description="Categoría del producto (ej: Filtros)"),
+    count: int = Query(1, ge=1, le=100, description="Cantidad de códigos a reservar"),
+    service: ProductoService = Depends(get_producto_service)
+):
+    """
+    Reserva códigos de barras nuevos con formato `T-A001-FIL` para una categoría.
+
+    La numeración es una secuencia por categoría que se incrementa de forma
+    atómica: dos usuarios que crean productos a la vez nunca reciben el mismo
+    código y el navegador ya no necesita descargar todos los códigos
+    existentes. Un código reservado y no usado simplemente queda sin asignar.
+
+    **Response EXITOSA:
+    ```json
+    {
+        "categoria": "Filtros",
+        "codigo_categoria": "FIL",
+        "codigos": ["T-A046-FIL", "T-A047-FIL"]
+    }
+    ```
+
+    **Errores:**
+    - 409 Conflict: Si la categoría agotó sus códigos (ZZ999)
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    try:
+        return service.allocate_barcodes(categoria, count)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@router.get("/labels", summary="Hoja de etiquetas con códigos de barras (SVG)")
+def get_label_sheet(
+    ids: str | None = Query(None, description=f"Ids separados por coma (máximo {MAX_IDS})"),
+    categoria: str | None = Query(None, description="Todos los productos de una categoría"),
+    columnas: int = Query(3, ge=2, le=4, description="Etiquetas por fila"),
+    copias: int = Query(1, ge=1, le=50, description="Copias de cada etiqueta"),
+    service: ProductoService = Depends(get_producto_service)
+):
+    """
+    Genera en una sola respuesta la hoja de etiquetas (Code 128) para una
+    lista de productos o una categoría completa, lista para imprimir.
+
+    Cada etiqueta se dibuja una vez y queda en caché por código de barras:
+    reimprimir una hoja es concatenar etiquetas ya generadas. La hoja se
+    envía en streaming, fila por fila.
+
+    **Parámetros:**
+    - **ids** o **categoria** (query): uno de los dos es obligatorio
+    - **columnas** (query): 2, 3 (por defecto) o 4
+    - **copias** (query): copias de cada etiqueta (reposición)
+
+    Los productos inexistentes o sin código de barras se omiten y se
+    informan en el header `X-Labels-Omitted`.
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    if (ids is None) == (categoria is None):
+        raise HTTPException(status_code=400, detail="Indique ids o categoria")
+    labels, omitidos = service.label_rows(batch_ids(ids) if ids is not None else None, categoria)
+    labels = [label for label in labels for _ in range(copias)]
+    if len(labels) > MAX_IDS * 10:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_IDS * 10} etiquetas por hoja")
+    headers = {
+        "Content-Disposition": 'inline; filename="etiquetas.svg"',
+        "X-Labels-Count": str(len(labels)),
+    }
+    if omitidos:
+        headers["X-Labels-Omitted"] = ",".join(map(str, omitidos))
+    return StreamingResponse(label_sheet(labels, len(labels), columnas), media_type="image/svg+xml", headers=headers)
+
+
 @router.get("/barcode/{codBarras}", response_model=ProductoResponse, summary="Buscar producto por código de barras")
-def get_producto_by_barcode(codBarras: str, service: ProductoService = Depends(get_producto_service)):
+def get_producto_by_barcode(
+    codBarras: str,
+    fields: tuple[str, ...] | None = Depends(fieldset(ProductoResponse)),
+    service: ProductoService = Depends(get_producto_service)
+):
     """
     Busca un producto usando su código de barras.
     
@@ -208,6 +355,11 @@ def get_producto_by_barcode(codBarras: str, service: ProductoService = Depends(g
     **Autenticación:
     No requiere autenticación (público)
     """
+    if fields is not None:
+        body = service.get_by_barcode_json(codBarras, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        return PrecompressedResponse(body)
     producto = service.get_by_barcode(codBarras)
     if not producto:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
@@ -215,7 +367,11 @@ def get_producto_by_barcode(codBarras: str, service: ProductoService = Depends(g
 
 
 @router.get("/{id}", response_model=ProductoResponse, summary="Obtener producto por ID")
-def get_producto(id: int, service: ProductoService = Depends(get_producto_service)):
+def get_producto(
+    id: int,
+    fields: tuple[str, ...] | None = Depends(fieldset(ProductoResponse)),
+    service: ProductoService = Depends(get_producto_service)
+):
     """
     Obtiene un producto específico por su ID.
     
@@ -249,12 +405,104 @@ def get_producto(id: int, service: ProductoService = Depends(get_producto_servic
     **Autenticación:
     No requiere autenticación (público)
     """
+    if fields is not None:
+        body = service.get_by_id_json(id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        return PrecompressedResponse(body)
     producto = service.get_by_id(id)
     if not producto:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return producto
 
 
+@router.get("/{id}/stock-history", response_model=StockHistoryResponse, summary="Historial de stock de un producto")
+def get_stock_history(
+    id: int,
+    response: Response,
+    desde: datetime | None = Query(None, description="Inicio del período (exclusivo); su stock es stock_inicial"),
+    hasta: datetime | None = Query(None, description="Fin del período (inclusive), por defecto ahora"),
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de movimientos"),
+    service: InventarioService = Depends(get_inventario_service)
+):
+    """
+    Movimientos de stock de un producto (ventas, ajustes manuales,
+    actualizaciones) con el stock resultante de cada uno.
+
+    `stock_inicial` es el stock a la fecha `desde`: se calcula desde la última
+    foto periódica anterior más los movimientos posteriores, así que consultar
+    el stock a cualquier fecha no recorre todo el historial. Para saber el
+    stock de un día basta con `?desde=2025-03-01T23:59:59&limit=1`.
+
+    **Response EXITOSA:
+    ```json
+    {
+        "producto_id": 15,
+        "desde": "2025-03-01T00:00:00",
+        "hasta": "2025-03-31T23:59:59",
+        "stock_inicial": 30,
+        "stock_final": 24,
+        "has_more": false,
+        "movimientos": [
+            {"id": 812, "fecha": "2025-03-04T10:12:00", "tipo": "venta", "cantidad": -2, "stock": 28, "venta_id": 87, "motivo": null},
+            {"id": 840, "fecha": "2025-03-09T18:40:00", "tipo": "ajuste", "cantidad": -4, "stock": 24, "venta_id": null, "motivo": "Merma"}
+        ]
+    }
+    ```
+
+    El historial comienza con el movimiento de `apertura` (stock al habilitar
+    el libro de movimientos) o de `alta` del producto.
+
+    **Errores:**
+    - 404 Not Found: Si el producto no existe
+    - 400 Bad Request: Si desde es posterior a hasta
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    if desde is not None and hasta is not None and desde > hasta:
+        raise HTTPException(status_code=400, detail="desde debe ser anterior a hasta")
+    historial = service.stock_history(id, desde, hasta, limit)
+    if historial is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    response.headers["Cache-Control"] = "no-store"
+    return historial
+
+
+@router.post("/{id}/ajustes", response_model=ProductoResponse, dependencies=[Depends(require_supabase_user)], summary="Ajuste manual de stock")
+def ajustar_stock(
+    id: int,
+    data: AjusteStockCreate,
+    service: ProductoService = Depends(get_producto_service)
+):
+    """
+    Suma (o resta, con cantidad negativa) unidades al stock y registra el
+    movimiento con su motivo: conteos físicos, mermas, ingreso de mercadería.
+
+    **Ejemplo de Request:**
+    ```json
+    {
+        "cantidad": -3,
+        "motivo": "Merma por rotura"
+    }
+    ```
+
+    **Errores:**
+    - 404 Not Found: Si el producto no existe
+    - 400 Bad Request: Si el ajuste deja el stock negativo
+
+    **Autenticación:**
+    Requiere token JWT en header: `Authorization: Bearer <token>`
+    """
+    try:
+        producto = service.ajustar_stock(id, data.cantidad, data.motivo)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if not producto:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return producto
+
+
 @router.put("/{id}", response_model=ProductoResponse, dependencies=[Depends(require_supabase_user)], summary="Actualizar producto")
 def update_producto(
     id: int,
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from db.base import SessionLocal
-from schemas.servicio_schema import ServicioCreate, ServicioResponse
+from schemas.servicio_schema import ServicioBatchResponse, ServicioCreate, ServicioResponse
 from services.servicio_service import ServicioService
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
+from core.batch import batch_ids
+from core.compression import PrecompressedResponse
+from core.serialization import RawJSONResponse, fast_json_enabled, fieldset
 
-router = APIRouter(tags=["Servicios"])
+router = APIRouter(tags=["Servicios"], route_class=TimedRoute)
 
 def get_db():
     db = SessionLocal()
@@ -61,6 +65,7 @@ def create_servicio(
 
 @router.get("/", response_model=list[ServicioResponse], summary="Listar todos los servicios")
 def list_servicios(
+    fields: tuple[str, ...] | None = Depends(fieldset(ServicioResponse)),
     service: ServicioService = Depends(get_servicio_service)
 ):
     """
@@ -89,10 +94,44 @@ def list_servicios(
     **Autenticación:**
     No requiere autenticación (público)
     """
+    if fields is not None or fast_json_enabled():
+        return PrecompressedResponse(service.list_servicios_json(fields))
     return service.list_servicios()
 
+@router.get("/batch", response_model=ServicioBatchResponse, summary="Obtener varios servicios por ID")
+def get_servicios_batch(
+    ids: list[int] = Depends(batch_ids),
+    service: ServicioService = Depends(get_servicio_service)
+):
+    """
+    Obtiene varios servicios en una sola petición.
+
+    Los que están en caché se sirven desde ahí y el resto se lee con una
+    única consulta `IN`. Los ids que no existen se informan en `missing`
+    (la petición no falla).
+
+    **Parámetros:**
+    - **ids** (query): ids separados por coma, máximo 500 (ej: `?ids=15,16,99`)
+
+    **Response EXITOSA:
+    ```json
+    {
+        "items": [{"id": 15, "...": "..."}, {"id": 16, "...": "..."}],
+        "missing": [99]
+    }
+    ```
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return RawJSONResponse(service.get_batch_json(ids))
+
 @router.get("/{id}", response_model=ServicioResponse, summary="Obtener servicio por ID")
-def get_servicio(id: int, service: ServicioService = Depends(get_servicio_service)):
+def get_servicio(
+    id: int,
+    fields: tuple[str, ...] | None = Depends(fieldset(ServicioResponse)),
+    service: ServicioService = Depends(get_servicio_service)
+):
     """
     Obtiene un servicio específico por su ID.
     
@@ -120,6 +159,11 @@ def get_servicio(id: int, service: ServicioService = Depends(get_servicio_servic
     **Autenticación:**
     No requiere autenticación (público)
     """
+    if fields is not None:
+        body = service.get_by_id_json(id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Servicio no encontrado")
+        return PrecompressedResponse(body)
     servicio = service.get_by_id(id)
     if not servicio:
         raise HTTPException(status_code=404, detail="Servicio no encontrado")
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from db.base import SessionLocal
+from core.startup import readiness
+from core.config import settings
+from db import replica
 from datetime import datetime
+from core.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def get_db():
@@ -34,7 +39,14 @@ def health_check(db: Session = Depends(get_db)):
             "persistence": {
                 "database_connected": true,
                 "database_name": "postgres",
-                "database_version": "PostgreSQL 17.6 on aarch64-unknown-linux-gnu"
+                "database_version": "PostgreSQL 17.6 on aarch64-unknown-linux-gnu",
+                "replica": {
+                    "configured": true,
+                    "healthy": true,
+                    "lag_seconds": 0.4,
+                    "error": null,
+                    "checked_at": "2025-12-04T11:32:37.102311"
+                }
             }
         },
         "timestamp": "2025-12-04T11:32:39.910088",
@@ -72,6 +84,7 @@ def health_check(db: Session = Depends(get_db)):
     - Validar deployment después de cambios
     - Debugging de problemas de conectividad
     - Verificar versión de PostgreSQL
+    - Vigilar el retraso de la réplica de lectura (`replica.lag_seconds`, si DATABASE_REPLICA_URL está configurada)
     
     **Autenticación:
     No requiere autenticación (público)
@@ -92,7 +105,8 @@ def health_check(db: Session = Depends(get_db)):
                 "persistence": {
                     "database_connected": result.status == 1,
                     "database_name": db_info[0] if db_info else "unknown",
-                    "database_version": db_info[1].split(',')[0] if db_info else "unknown"
+                    "database_version": db_info[1].split(',')[0] if db_info else "unknown",
+                    "replica": {"configured": bool(settings.DATABASE_REPLICA_URL), **replica.state.as_dict()},
                 }
             },
             "timestamp": datetime.now().isoformat(),
@@ -105,3 +119,34 @@ def health_check(db: Session = Depends(get_db)):
             "timestamp": datetime.now().isoformat(),
             "architecture_flow": "✗ Fallo en comunicación"
         }
+
+
+@router.get("/ready", summary="Verificar si el worker está listo")
+def ready_check():
+    """
+    Estado de preparación del worker (readiness)
+    
+    El proceso acepta peticiones en cuanto arranca; este endpoint indica si ya
+    terminó el calentamiento: conexión a la base de datos, pool precargado y
+    cachés de productos, códigos de barras y servicios.
+    
+    **Response EXITOSA:
+    ```json
+    {
+        "ready": true,
+        "attempts": 1,
+        "error": null,
+        "missing_tables": [],
+        "started_at": "2025-12-04T11:32:39.910088",
+        "ready_at": "2025-12-04T11:32:40.120431"
+    }
+    ```
+    **Status:** `503 Service Unavailable` mientras no esté listo
+    
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content=readiness.as_dict()
+    )
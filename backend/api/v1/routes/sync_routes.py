@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from db.base import SessionLocal
+from schemas.sync_schema import SyncResponse
+from services.sync_service import SyncService
+from core.metrics import TimedRoute
+from core.serialization import RawJSONResponse
+
+router = APIRouter(tags=["Sincronización"], route_class=TimedRoute)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_sync_service(db: Session = Depends(get_db)) -> SyncService:
+    return SyncService(db)
+
+
+@router.get("/changes", response_model=SyncResponse, summary="Cambios desde un token")
+def get_changes(
+    since: int | None = Query(None, ge=0, description="Token devuelto en `next` por la consulta anterior (omitir si no hay caché)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Máximo de entradas del log por página"),
+    service: SyncService = Depends(get_sync_service)
+):
+    """
+    Devuelve solo lo que cambió en productos, servicios, empleados y órdenes
+    desde `since`, para que un cliente con caché no vuelva a descargar todo.
+    
+    **Uso:**
+    1. Primera vez (sin `since`): devuelve todo (`reset: true`) y un token en `next`
+    2. Después: `GET /sync/changes?since=<next>` devuelve altas/modificaciones en `upserts` y bajas en `deletes`
+    3. Si `has_more` es `true`, repetir con el nuevo `next` hasta que sea `false`
+    
+    **Response EXITOSA:
+    ```json
+    {
+        "since": 120,
+        "next": 124,
+        "has_more": false,
+        "reset": false,
+        "changes": {
+            "productos": {
+                "upserts": [{"id": 15, "nombre": "Filtro de Aceite Premium", "stock": 24, "row_version": 124, "...": "..."}],
+                "deletes": [9]
+            },
+            "servicios": {"upserts": [], "deletes": []},
+            "empleados": {"upserts": [], "deletes": []},
+            "ordenes": {"upserts": [], "deletes": []}
+        }
+    }
+    ```
+    
+    Los objetos tienen la misma forma que en los listados, más `row_version` y `updated_at`.
+    
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return RawJSONResponse(service.changes(since, limit), headers={"Cache-Control": "no-store"})
@@ -1,14 +1,17 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from db.base import SessionLocal
-from schemas.venta_schema import VentaCreate, VentaResponse
+from schemas.venta_schema import VentaCreate, VentaResponse, VentasResumenResponse
 from services.venta_service import VentaService
 from core.auth import require_supabase_user
+from core.metrics import TimedRoute
+from core.serialization import RawJSONResponse, fast_json_enabled
+from core.streaming import export_response
 
-router = APIRouter(tags=["Ventas"])
+router = APIRouter(tags=["Ventas"], route_class=TimedRoute)
 
 
 
@@ -129,6 +132,7 @@ def create_venta(
     **Nota:
     - El stock se descuenta automáticamente al registrar la venta
     - El total se calcula como: Σ(cantidad × precio_unitario)
+    - precio_unitario y costo_unitario se toman del precio de venta y de compra del producto al registrar la venta y no cambian si luego cambia el catálogo
     - La fecha_venta es opcional (por defecto usa la fecha actual)
     
     **Autenticación:
@@ -188,9 +192,59 @@ def list_ventas(
     **Autenticación:
     No requiere autenticación (público)
     """
+    if fast_json_enabled():
+        return RawJSONResponse(service.list_ventas_json())
     return service.list_ventas()
 
 
+@router.get("/export", summary="Exportar ventas (streaming)")
+def export_ventas(formato: str = Query("json", description="json (arreglo) o ndjson (un objeto por línea)")):
+    """
+    Exporta todas las ventas con el mismo formato que el listado, en streaming.
+
+    Recorre un cursor del lado del servidor y envía el JSON por bloques: la
+    memoria del servidor no crece con el tamaño de la tabla.
+
+    **Parámetros:**
+    - **formato** (query): `json` (por defecto) o `ndjson`
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return export_response(lambda db: VentaService(db).iter_ventas(), formato, "ventas")
+
+
+@router.get("/resumen", response_model=VentasResumenResponse, summary="Resumen de ventas del periodo")
+def resumen_ventas(
+    desde: datetime | None = Query(None, description="Inicio del periodo (incluido)"),
+    hasta: datetime | None = Query(None, description="Fin del periodo (excluido)"),
+    service: VentaService = Depends(get_venta_service)
+):
+    """
+    Cantidad de ventas, unidades, ingresos, costo y margen del periodo.
+
+    Usa los precios guardados en cada línea al momento de la venta, así que
+    el resultado no cambia si después se modifican los precios del catálogo.
+
+    **Response EXITOSA:
+    ```json
+    {
+        "desde": "2025-03-01T00:00:00",
+        "hasta": "2025-04-01T00:00:00",
+        "ventas": 120,
+        "unidades": 310,
+        "ingresos": 84500,
+        "costo": 52300,
+        "margen": 32200
+    }
+    ```
+
+    **Autenticación:
+    No requiere autenticación (público)
+    """
+    return service.resumen(desde, hasta)
+
+
 @router.get("/{id}", response_model=VentaResponse, summary="Obtener venta por ID", description="Busca una venta específica usando su ID único.")
 def get_venta_by_id(id: int, service: VentaService = Depends(get_venta_service)):
     """
@@ -222,6 +276,8 @@ def get_ventas_by_fecha(fecha: datetime, service: VentaService = Depends(get_ven
     Returns:
         list[VentaResponse]: Lista de ventas de esa fecha.
     """
+    if fast_json_enabled():
+        return RawJSONResponse(service.get_by_fecha_json(fecha))
     return service.get_by_fecha(fecha)
 
 
@@ -0,0 +1,244 @@
+"""
+Benchmark en proceso de todos los routers de la API.
+
+Levanta main.app sobre httpx.ASGITransport (sin red ni servidor) contra una
+base SQLite sembrada y, si se define BENCH_POSTGRES_URL, también contra
+PostgreSQL (base desechable: se borran y recrean las tablas). Mide
+throughput y latencias p50/p95/p99 por escenario y tamaño de dataset,
+guarda los resultados en JSON y los compara con una línea base: si un
+escenario empeora más que la tolerancia, el proceso termina con código 1.
+
+Ejecutar desde backend/ con:
+    python -m benchmarks.api --sizes 100 1000 10000
+    python -m benchmarks.api --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_RESULTS_DIR = BENCH_DIR / "results"
+
+
+def _scenarios(counts: dict) -> list[dict]:
+    """
+    Escenarios por router: (nombre, método, path o función que genera el path, body).
+    """
+    def rid(n):
+        return lambda rnd: rnd.randint(1, n)
+
+    productos = counts["productos"]
+    autoparte_ids = [i for i in range(4, productos + 1, 4)] or [4]
+    return [
+        {"name": "productos.list", "method": "GET", "path": lambda rnd: "/api/v1/productos/"},
+        {"name": "productos.get", "method": "GET", "path": lambda rnd: f"/api/v1/productos/{rid(productos)(rnd)}"},
+        {"name": "productos.barcode", "method": "GET",
+         "path": lambda rnd: f"/api/v1/productos/barcode/{rnd.choice(counts['barcodes'])}"},
+        {"name": "autopartes.list", "method": "GET", "path": lambda rnd: "/api/v1/autopartes/"},
+        {"name": "autopartes.get", "method": "GET",
+         "path": lambda rnd: f"/api/v1/autopartes/{rnd.choice(autoparte_ids)}"},
+        {"name": "autopartes.anio", "method": "GET", "path": lambda rnd: f"/api/v1/autopartes/anio/{rnd.randint(2005, 2025)}"},
+        {"name": "ventas.list", "method": "GET", "path": lambda rnd: "/api/v1/ventas/"},
+        {"name": "ventas.get", "method": "GET", "path": lambda rnd: f"/api/v1/ventas/{rid(counts['ventas'])(rnd)}"},
+        {"name": "ventas.create", "method": "POST", "path": lambda rnd: "/api/v1/ventas/",
+         "body": lambda rnd: {
+             "fecha": datetime.now().isoformat(),
+             "productos": [{"producto_id": rid(productos)(rnd), "cantidad": 1}],
+         }},
+        {"name": "ordenes.list", "method": "GET", "path": lambda rnd: "/api/v1/ordenes/"},
+        {"name": "ordenes.get", "method": "GET", "path": lambda rnd: f"/api/v1/ordenes/{rid(counts['ordenes'])(rnd)}"},
+        {"name": "ordenes.fecha", "method": "GET",
+         "path": lambda rnd: f"/api/v1/ordenes/fecha/2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"},
+        {"name": "servicios.list", "method": "GET", "path": lambda rnd: "/api/v1/servicios/"},
+        {"name": "servicios.get", "method": "GET", "path": lambda rnd: f"/api/v1/servicios/{rid(counts['servicios'])(rnd)}"},
+        {"name": "empleados.list", "method": "GET", "path": lambda rnd: "/api/v1/empleados/"},
+        {"name": "empleados.get", "method": "GET", "path": lambda rnd: f"/api/v1/empleados/{rid(counts['empleados'])(rnd)}"},
+        {"name": "status.health", "method": "GET", "path": lambda rnd: "/api/v1/status/"},
+        {"name": "status.ready", "method": "GET", "path": lambda rnd: "/api/v1/status/ready"},
+    ]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+async def _run_scenario(client: httpx.AsyncClient, scenario: dict, requests: int, concurrency: int,
+                        seed: int, max_seconds: float | None = None) -> dict:
+    rnd = random.Random(seed)
+    calls = [
+        (scenario["path"](rnd), scenario["body"](rnd) if "body" in scenario else None)
+        for _ in range(requests)
+    ]
+    latencies: list[float] = []
+    errors = 0
+    queue = iter(calls)
+
+    start = time.perf_counter()
+    deadline = start + max_seconds if max_seconds else None
+
+    async def worker():
+        nonlocal errors
+        for path, body in queue:
+            # Con datasets grandes, los listados completos se cortan por tiempo
+            if deadline and time.perf_counter() > deadline:
+                return
+            start = time.perf_counter()
+            response = await client.request(scenario["method"], path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def _prepare(url: str, size: int) -> dict:
+    """
+    Apunta la aplicación a `url`, siembra el dataset y precalienta cachés.
+    """
+    from benchmarks.dataset import seed
+    from core.cache import cache
+    from core.config import settings
+    from core.startup import readiness, warm_up
+    from db.base import dispose_engine, get_engine
+
+    dispose_engine()
+    settings.DATABASE_URL = url
+    counts = seed(get_engine(), size)
+    cache.clear()
+    # ASGITransport no ejecuta el lifespan: calentar aquí
+    warm_up()
+    readiness.ready = True
+    return counts
+
+
+async def _run_backend(backend: str, url: str, sizes: list[int], args) -> dict:
+    from core.auth import require_supabase_user
+    from main import app
+
+    # Los endpoints de escritura validan el token contra Supabase
+    app.dependency_overrides[require_supabase_user] = lambda: {"id": "benchmark"}
+
+    results = {}
+    for size in sizes:
+        counts = _prepare(url, size)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in _scenarios(counts):
+                if args.only and not any(scenario["name"].startswith(o) for o in args.only):
+                    continue
+                # Calentamiento: no se mide
+                await _run_scenario(client, scenario, min(20, args.requests), 1, args.seed)
+                key = f"{backend}/{size}/{scenario['name']}"
+                results[key] = await _run_scenario(
+                    client, scenario, args.requests, args.concurrency, args.seed, args.max_seconds)
+                r = results[key]
+                print(f"{key:<42} {r['rps']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}  "
+                      f"p95 {r['p95_ms']:>8.2f}  p99 {r['p99_ms']:>8.2f} ms  errores {r['errors']}")
+    app.dependency_overrides.pop(require_supabase_user, None)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Devuelve los escenarios que empeoraron respecto a la línea base: p95 más
+    alto o throughput más bajo que la tolerancia relativa.
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {base['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {base['rps']:.1f} -> {current['rps']:.1f} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark en proceso de la API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Cantidad de productos de cada dataset")
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-seconds", type=float, default=15.0, help="Tiempo máximo por escenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Prefijos de escenario a ejecutar (p. ej. productos ventas)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo permitido")
+    parser.add_argument("--output", type=Path, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [("sqlite", f"sqlite:///{os.path.join(tmp, 'bench.db')}")]
+        if os.environ.get("BENCH_POSTGRES_URL"):
+            backends.append(("postgresql", os.environ["BENCH_POSTGRES_URL"]))
+        for backend, url in backends:
+            results.update(asyncio.run(_run_backend(backend, url, args.sizes, args)))
+
+        from db.base import dispose_engine
+        dispose_engine()
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"requests": args.requests, "concurrency": args.concurrency, "sizes": args.sizes},
+        "results": results,
+    }
+    output = args.output or DEFAULT_RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResultados guardados en {output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Línea base actualizada: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("Sin línea base para comparar (usar --save-baseline)")
+        return
+
+    regressions = compare(results, json.loads(args.baseline.read_text())["results"], args.tolerance)
+    if regressions:
+        print("\nRegresiones de rendimiento:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Datos de prueba para los benchmarks, generados con seed_data.
+"""
+from sqlalchemy import select
+
+from db.models import Producto
+from seed_data import generate
+
+
+def seed(engine, size: int, seed: int = 42) -> dict:
+    """
+    Recrea las tablas e inserta `size` productos (un cuarto autopartes) con
+    ventas y órdenes proporcionales.
+    """
+    counts = {
+        "productos": size,
+        "servicios": max(5, size // 50),
+        "empleados": max(3, size // 100),
+        "ventas": size,
+        "ordenes": max(10, size // 2),
+    }
+    generate(engine, seed=seed, reset=True, verbose=False, **counts)
+    with engine.connect() as conn:
+        counts["barcodes"] = conn.execute(select(Producto.codBarras).limit(1000)).scalars().all()
+    return counts
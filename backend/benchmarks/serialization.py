@@ -0,0 +1,77 @@
+"""
+CPU de serialización de listados: ruta Pydantic (ORM + response_model +
+json) frente a la ruta rápida (filas Core + orjson).
+
+Para cada listado mide el tiempo de CPU por petición, normalizado a 10k
+filas. La caché se vacía antes de cada petición para medir el trabajo
+completo. Que ambas rutas devuelvan el mismo JSON lo comprueba
+tests/test_serialization.py.
+
+Ejecutar desde backend/ con:
+    python -m benchmarks.serialization --size 10000
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+ENDPOINTS = [
+    ("productos", "/api/v1/productos/"),
+    ("ventas", "/api/v1/ventas/"),
+    ("ordenes", "/api/v1/ordenes/"),
+]
+
+
+def _measure(client, path: str, repeat: int) -> tuple[float, bytes]:
+    from core.cache import cache
+
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        cache.clear()
+        start = time.process_time()
+        response = client.get(path)
+        best = min(best, time.process_time() - start)
+        response.raise_for_status()
+        body = response.content
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU de serialización JSON por 10k filas")
+    parser.add_argument("--size", type=int, default=10000, help="Productos (y ventas) del dataset")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones; se toma la mejor")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    from benchmarks.api import _prepare
+    from core.config import settings
+    from db.base import dispose_engine
+    from main import app
+
+    # La ruta ORM carga las relaciones en lotes de selectinload: no es N+1
+    logging.getLogger("core.sql_stats").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _prepare(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.size)
+        with TestClient(app) as client:
+            print(f"{'listado':<10} {'filas':>7} {'pydantic ms':>12} {'orjson ms':>10} "
+                  f"{'ahorro ms/10k':>14} {'x':>6}")
+            for name, path in ENDPOINTS:
+                settings.JSON_RESPONSE_CLASS = "json"
+                slow, body = _measure(client, path, args.repeat)
+                settings.JSON_RESPONSE_CLASS = "orjson"
+                fast, _ = _measure(client, path, args.repeat)
+
+                rows = max(len(json.loads(body)), 1)
+                saved = (slow - fast) * 1000 * 10000 / rows
+                print(f"{name:<10} {rows:>7} {slow * 1000:>12.1f} {fast * 1000:>10.1f} "
+                      f"{saved:>14.1f} {slow / fast if fast else 0:>6.1f}")
+        dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
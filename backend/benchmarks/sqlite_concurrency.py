@@ -0,0 +1,125 @@
+"""
+Benchmark de concurrencia en SQLite: perfil por defecto vs perfil de producción.
+
+Lectores y escritores concurrentes sobre la tabla de productos durante unos
+segundos; compara operaciones por segundo y errores "database is locked".
+
+Ejecutar desde backend/ con: python -m benchmarks.sqlite_concurrency
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from db.base import Base, build_engine
+from db.models import Producto
+
+
+def _baseline_engine(url: str):
+    # Configuración previa al perfil: rollback journal, sin pragmas
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+
+def _seed(engine, n_productos: int):
+    Base.metadata.create_all(engine)
+    rows = [
+        {
+            "nombre": f"Producto {i}",
+            "descripcion": "Producto de prueba para benchmark",
+            "precioVenta": 200,
+            "precioCompra": 100,
+            "marca": "Marca",
+            "categoria": f"Cat {i % 20}",
+            "stock": 1_000_000,
+            "stockMin": 5,
+            "tipo": "producto",
+        }
+        for i in range(n_productos)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Producto), rows)
+
+
+def _run(engine, readers: int, writers: int, seconds: float, n_productos: int):
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader():
+        rnd = random.Random()
+        local = {"reads": 0, "errors": 0}
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(Producto.__table__).where(
+                            Producto.categoria == f"Cat {rnd.randrange(20)}"
+                        )
+                    ).fetchall()
+                local["reads"] += 1
+            except OperationalError:
+                local["errors"] += 1
+        with lock:
+            counts["reads"] += local["reads"]
+            counts["errors"] += local["errors"]
+
+    def writer():
+        rnd = random.Random()
+        local = {"writes": 0, "errors": 0}
+        while not stop.is_set():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE productos SET stock = stock - 1 WHERE id = :id"),
+                        {"id": rnd.randrange(1, n_productos + 1)}
+                    )
+                local["writes"] += 1
+            except OperationalError:
+                local["errors"] += 1
+        with lock:
+            counts["writes"] += local["writes"]
+            counts["errors"] += local["errors"]
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {k: v / seconds if k != "errors" else v for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--productos", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'perfil':<12} {'lecturas/s':>12} {'escrituras/s':>14} {'errores':>9}")
+        for nombre, factory in (("default", _baseline_engine), ("produccion", build_engine)):
+            url = f"sqlite:///{os.path.join(tmp, nombre + '.db')}"
+            engine = factory(url)
+            _seed(engine, args.productos)
+            result = _run(engine, args.readers, args.writers, args.seconds, args.productos)
+            engine.dispose()
+            print(f"{nombre:<12} {result['reads']:>12.0f} {result['writes']:>14.0f} {result['errors']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Códigos de barras del taller con formato T-A001-FIL (ver FORMATO_CODIGO_BARRAS.md).
+
+Misma codificación que generateBarcode/convertToBase26 del frontend:
+letras base-26 (A-Z, AA-ZZ) seguidas de un número de 001 a 999.
+"""
+import unicodedata
+
+PREFIX = "T"
+NUMBERS_PER_LETTER = 999
+MAX_SEQUENCE = (26 + 26 * 26) * NUMBERS_PER_LETTER  # ZZ999
+
+CATEGORY_CODES = {
+    "Filtros": "FIL",
+    "Aceites": "ACE",
+    "Llantas": "LLA",
+    "Baterías": "BAT",
+    "Frenos": "FRE",
+    "Lubricantes": "LUB",
+    "Herramientas": "HER",
+    "Repuestos": "REP",
+    "Accesorios": "ACC",
+    "Iluminación": "ILU",
+    "Eléctricos": "ELE",
+    "Suspensión": "SUS",
+    "Motor": "MOT",
+    "Transmisión": "TRA",
+    "Refrigeración": "REF",
+    "Combustible": "COM",
+    "Escape": "ESC",
+    "Carrocería": "CAR",
+    "Limpieza": "LIM",
+    "Seguridad": "SEG",
+}
+
+
+def encode_sequence(num: int) -> str:
+    """
+    Convierte un número (1-MAX_SEQUENCE) al formato A001-ZZ999.
+
+    >>> encode_sequence(1), encode_sequence(1000), encode_sequence(25975)
+    ('A001', 'B001', 'AA001')
+    """
+    if not 1 <= num <= MAX_SEQUENCE:
+        raise ValueError(f"Secuencia fuera de rango (1-{MAX_SEQUENCE}): {num}")
+    letter_index, number_part = divmod(num - 1, NUMBERS_PER_LETTER)
+    if letter_index < 26:
+        letters = chr(65 + letter_index)
+    else:
+        first, second = divmod(letter_index - 26, 26)
+        letters = chr(65 + first) + chr(65 + second)
+    return f"{letters}{number_part + 1:03d}"
+
+
+def decode_sequence(code: str) -> int | None:
+    """
+    Inversa de encode_sequence: "AA001" -> 25975. None si no tiene el formato.
+    """
+    letters = code.rstrip("0123456789")
+    number = code[len(letters):]
+    if not (1 <= len(letters) <= 2 and letters.isascii() and letters.isupper() and len(number) == 3):
+        return None
+    number_part = int(number)
+    if number_part == 0:
+        return None
+    if len(letters) == 1:
+        letter_index = ord(letters) - 65
+    else:
+        letter_index = 26 + (ord(letters[0]) - 65) * 26 + (ord(letters[1]) - 65)
+    return letter_index * NUMBERS_PER_LETTER + number_part
+
+
+def parse_barcode(barcode: str) -> tuple[int, str] | None:
+    """
+    (secuencia, código de categoría) de un código T-A001-FIL, o None.
+    """
+    parts = barcode.split("-")
+    if len(parts) != 3 or parts[0] != PREFIX:
+        return None
+    sequence = decode_sequence(parts[1])
+    return (sequence, parts[2]) if sequence is not None else None
+
+
+def category_code(categoria: str) -> str:
+    """
+    Sufijo de 3 letras de la categoría (mapa fijo o primeras 3 letras sin acentos).
+    """
+    if categoria in CATEGORY_CODES:
+        return CATEGORY_CODES[categoria]
+    clean = unicodedata.normalize("NFD", categoria or "")
+    clean = "".join(c for c in clean if not unicodedata.combining(c) and not c.isspace())
+    return clean.upper()[:3] or "GEN"
+
+
+def build_barcode(num: int, categoria: str) -> str:
+    return f"{PREFIX}-{encode_sequence(num)}-{category_code(categoria)}"
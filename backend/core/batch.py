@@ -0,0 +1,68 @@
+"""
+Lecturas en lote por id (`GET /productos/batch?ids=1,2,3`).
+
+La UI resolvía entidades relacionadas de a una (un GET por línea de venta).
+Los endpoints batch devuelven todas las pedidas en una sola respuesta: las
+que están en la caché de detalle (`<entidad>_item_<id>`) se toman de ahí y
+el resto sale de una única consulta `IN`, que además llena esa caché por el
+mismo camino single-flight que el detalle (`cache.get_or_set_many`). Los
+ids inexistentes se informan en `missing` en lugar de fallar la petición.
+
+El cuerpo se arma concatenando los JSON ya serializados de cada elemento,
+sin volver a codificar lo que viene de la caché.
+"""
+from collections.abc import Callable, Iterable, Mapping
+
+from fastapi import HTTPException, Query
+
+from core.cache import cache
+from core.compression import Precompressed
+from core.serialization import dumps
+
+MAX_IDS = 500
+
+
+def batch_ids(ids: str = Query(..., description=f"Ids separados por coma (máximo {MAX_IDS})")) -> list[int]:
+    """
+    Dependencia para `?ids=`: ids únicos en el orden pedido.
+    """
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="ids debe ser una lista de enteros separados por coma") from exc
+    unique = list(dict.fromkeys(parsed))
+    if not unique:
+        raise HTTPException(status_code=400, detail="Debe indicar al menos un id")
+    if len(unique) > MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_IDS} ids por petición")
+    return unique
+
+
+def fetch_batch(
+    ids: list[int],
+    cache_prefix: str,
+    load_rows: Callable[[list[int]], Iterable[Mapping]],
+    encode: Callable[[Mapping], dict],
+    ttl_seconds: int = 300,
+    soft_ttl_seconds: int | None = None,
+    loader_for: Callable[[int], Callable[[], Precompressed | None]] | None = None,
+) -> bytes:
+    """
+    JSON `{"items": [...], "missing": [...]}` con los elementos en el orden
+    de `ids`. Las entradas de caché `{cache_prefix}{id}` son las mismas que
+    usa el detalle por id (respuesta completa, sin ?fields=); con
+    `soft_ttl_seconds` y `loader_for` se refrescan en segundo plano igual
+    que las del detalle.
+    """
+    def load_many(pending: list[int]) -> dict[int, Precompressed]:
+        return {row["id"]: Precompressed(dumps(encode(row))) for row in load_rows(pending)}
+
+    found = cache.get_or_set_many(
+        {id: f"{cache_prefix}{id}" for id in ids}, load_many, ttl_seconds=ttl_seconds,
+        soft_ttl_seconds=soft_ttl_seconds, loader_for=loader_for,
+    )
+    bodies = {id: body.identity for id, body in found.items()}
+
+    items = b",".join(bodies[id] for id in ids if id in bodies)
+    missing = [id for id in ids if id not in bodies]
+    return b'{"items":[' + items + b'],"missing":' + dumps(missing) + b"}"
@@ -1,6 +1,81 @@
+"""
+Caché en memoria con TTL y cálculo único por clave (single-flight).
+
+`get_or_set` / `aget_or_set` agrupan los fallos concurrentes de una misma
+clave: el primer llamador (el líder) ejecuta el cargador y los demás esperan
+su resultado en lugar de repetir la consulta. Si el cargador falla, la misma
+excepción llega a todos los que esperaban; si tarda más de `timeout`
+segundos, los que esperan reciben CacheLoadTimeout (el líder sigue y guarda
+el valor igual). Una invalidación durante el cálculo hace que el resultado se
+entregue a quienes ya esperaban pero no se guarde.
+
+Con `soft_ttl_seconds` (o `get_or_refresh`) la entrada guarda su cargador y
+tiene dos vencimientos (stale-while-revalidate):
+
+- Antes del TTL blando se sirve tal cual.
+- Entre el blando y el duro se sirve el valor vencido y un hilo de
+  refresco (CACHE_REFRESH_WORKERS) lo recalcula; si el refresco falla se
+  sigue sirviendo el anterior hasta el TTL duro.
+- Las claves calientes (CACHE_HOT_MIN_HITS lecturas desde su última carga)
+  se refrescan antes de vencer (`refresh_hot`, ver core/startup.py) y se
+  vuelven a cargar en segundo plano cuando una escritura las invalida.
+
+El cargador corre después de la petición que lo registró: no debe usar la
+sesión de esa petición (ver `db.base.session_loader`).
+
+Los cargadores corren siempre contra la base principal, aunque la petición
+que los dispara lea de la réplica: un valor en caché lo ven todos los
+clientes del worker, incluido el que acaba de escribir.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
-from typing import Optional, Any, Dict
-import json
+from typing import Optional, Any, Callable, Dict
+
+from core.config import settings
+from core.metrics import cache_coalesced, cache_hits, cache_misses, cache_refreshes, cache_stale
+from db import replica
+
+logger = logging.getLogger(__name__)
+
+
+def _namespace(key: str) -> str:
+    # 'productos_list' -> 'productos', 'producto_15' -> 'producto'
+    return key.split('_', 1)[0]
+
+
+def _from_primary(load: Callable, *args) -> Any:
+    # RoutingSession consulta prefer_replica en cada sentencia: también
+    # cubre cargadores que usan la sesión de la petición
+    token = replica.prefer_replica.set(False)
+    try:
+        return load(*args)
+    finally:
+        replica.prefer_replica.reset(token)
+
+
+class CacheLoadTimeout(TimeoutError):
+    """
+    Otro llamador está calculando la clave y no terminó dentro del plazo.
+    """
+
+
+class _Flight:
+    """
+    Cálculo en curso de una clave. El Future se pasa a RUNNING al crearlo:
+    nadie puede cancelarlo y todos los que esperan reciben lo mismo.
+    """
+    __slots__ = ("future", "invalidated", "task")
+
+    def __init__(self):
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+        self.invalidated = False
+        self.task = None
+
 
 class SimpleCache:
     """
@@ -8,52 +83,295 @@ class SimpleCache:
     """
     def __init__(self):
         self._cache: Dict[str, Dict[str, Any]] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None or datetime.now() > entry['expires_at']:
+            return None
+        return entry['value']
     
     def get(self, key: str) -> Optional[Any]:
         """
-        Obtiene un valor del caché si existe y no ha expirado
+        Obtiene un valor del caché si existe y no ha expirado. Pasado el TTL
+        blando devuelve el valor vencido y agenda su refresco.
         """
         if key not in self._cache:
+            cache_misses.inc((_namespace(key),))
             return None
         
         entry = self._cache[key]
-        if datetime.now() > entry['expires_at']:
+        now = datetime.now()
+        if now > entry['expires_at']:
             # Expiró, eliminar
-            del self._cache[key]
+            self._cache.pop(key, None)
+            cache_misses.inc((_namespace(key),))
             return None
         
+        cache_hits.inc((_namespace(key),))
+        entry['hits'] += 1
+        if entry['loader'] is not None and now > entry['stale_at']:
+            cache_stale.inc((_namespace(key),))
+            self._refresh(key, entry)
         return entry['value']
     
-    def set(self, key: str, value: Any, ttl_seconds: int = 300):
+    def set(self, key: str, value: Any, ttl_seconds: int = 300, soft_ttl_seconds: int | None = None,
+            loader: Callable[[], Any] | None = None):
         """
-        Guarda un valor en el caché con un TTL (por defecto 5 minutos)
+        Guarda un valor en el caché con un TTL (por defecto 5 minutos). Con
+        `loader` y `soft_ttl_seconds` la entrada se refresca en segundo plano.
         """
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=ttl_seconds)
         self._cache[key] = {
             'value': value,
-            'expires_at': datetime.now() + timedelta(seconds=ttl_seconds)
+            'expires_at': expires_at,
+            'stale_at': now + timedelta(seconds=soft_ttl_seconds) if soft_ttl_seconds is not None else expires_at,
+            'loader': loader if soft_ttl_seconds is not None else None,
+            'ttl_seconds': ttl_seconds,
+            'soft_ttl_seconds': soft_ttl_seconds,
+            'hits': 0,
         }
+
+    def _join(self, key: str) -> tuple[Any, _Flight | None, bool]:
+        """
+        (valor, vuelo, es_líder): el valor si otro llamador lo guardó
+        mientras tanto; si no, el cálculo en curso o uno nuevo a cargo de
+        quien llama.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value, None, False
+            flight = self._inflight.get(key)
+            if flight is not None:
+                cache_coalesced.inc((_namespace(key),))
+                return None, flight, False
+            flight = self._inflight[key] = _Flight()
+            return None, flight, True
+
+    def _land(self, key: str, flight: _Flight, value: Any = None, error: BaseException | None = None,
+              ttl_seconds: int = 300, soft_ttl_seconds: int | None = None, loader: Callable[[], Any] | None = None):
+        # Guardar y retirar el vuelo bajo el lock: un llamador nuevo encuentra
+        # el valor o el vuelo, nunca ninguno de los dos
+        with self._lock:
+            if error is None and not flight.invalidated:
+                if value is not None:
+                    self.set(key, value, ttl_seconds, soft_ttl_seconds, loader)
+                else:
+                    # Un refresco que ya no encuentra el registro retira el vencido
+                    self._cache.pop(key, None)
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(value)
+
+    def _refresh(self, key: str, entry: Dict[str, Any]) -> bool:
+        """
+        Agenda el recálculo de `entry` en un hilo de refresco, salvo que la
+        clave ya tenga un cálculo vigente en curso.
+        """
+        with self._lock:
+            current = self._inflight.get(key)
+            if current is not None and not current.invalidated:
+                return False
+            flight = self._inflight[key] = _Flight()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(settings.CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+        self._executor.submit(self._run_refresh, key, flight, entry)
+        return True
+
+    def _run_refresh(self, key: str, flight: _Flight, entry: Dict[str, Any]):
+        try:
+            value = _from_primary(entry['loader'])
+        except Exception as e:
+            # Se sigue sirviendo el valor anterior hasta su TTL duro
+            logger.warning("Refresco de la caché '%s' fallido: %s", key, e)
+            cache_refreshes.inc((_namespace(key), "error"))
+            with self._lock:
+                # Reintento como mucho una vez por intervalo, no en cada lectura
+                if self._cache.get(key) is entry:
+                    entry['stale_at'] = datetime.now() + timedelta(seconds=settings.CACHE_REFRESH_INTERVAL_SECONDS)
+            self._land(key, flight, error=e)
+            return
+        cache_refreshes.inc((_namespace(key), "ok"))
+        self._land(key, flight, value, ttl_seconds=entry['ttl_seconds'],
+                   soft_ttl_seconds=entry['soft_ttl_seconds'], loader=entry['loader'])
+
+    @staticmethod
+    def _hot(entry: Dict[str, Any]) -> bool:
+        return entry['loader'] is not None and entry['hits'] >= settings.CACHE_HOT_MIN_HITS
+
+    def refresh_hot(self, horizon_seconds: float) -> int:
+        """
+        Refresca las claves calientes cuyo TTL blando vence dentro de
+        `horizon_seconds`, para que sus lectores nunca las encuentren
+        vencidas. Devuelve cuántos refrescos se agendaron.
+        """
+        limit = datetime.now() + timedelta(seconds=horizon_seconds)
+        with self._lock:
+            due = [(key, entry) for key, entry in self._cache.items()
+                   if self._hot(entry) and entry['stale_at'] <= limit]
+        return sum(self._refresh(key, entry) for key, entry in due)
+
+    @staticmethod
+    def _timeout(timeout: float | None) -> float:
+        return settings.CACHE_LOAD_TIMEOUT_SECONDS if timeout is None else timeout
+
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl_seconds: int = 300,
+                   timeout: float | None = None, soft_ttl_seconds: int | None = None) -> Any:
+        """
+        Valor en caché o, si falta, el que calcule `loader` una sola vez
+        para todos los llamadores concurrentes. None no se guarda. Con
+        `soft_ttl_seconds` la entrada se refresca en segundo plano con
+        `loader` (stale-while-revalidate).
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value, flight, leader = self._join(key)
+        if flight is None:
+            return value
+        if not leader:
+            try:
+                return flight.future.result(timeout=self._timeout(timeout))
+            except FutureTimeout:
+                raise CacheLoadTimeout(f"Tiempo de espera agotado calculando '{key}'") from None
+        try:
+            value = _from_primary(loader)
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, value, ttl_seconds=ttl_seconds, soft_ttl_seconds=soft_ttl_seconds, loader=loader)
+        return value
+
+    def get_or_refresh(self, key: str, loader: Callable[[], Any], timeout: float | None = None) -> Any:
+        """
+        get_or_set con los TTL blando y duro de la configuración. `loader`
+        debe abrir su propia sesión: también corre fuera de la petición.
+        """
+        return self.get_or_set(key, loader, ttl_seconds=settings.CACHE_HARD_TTL_SECONDS, timeout=timeout,
+                               soft_ttl_seconds=settings.CACHE_SOFT_TTL_SECONDS)
+
+    def get_or_set_many(self, keys: Dict[Any, str], load_many: Callable[[list], Dict[Any, Any]],
+                        ttl_seconds: int = 300, timeout: float | None = None, soft_ttl_seconds: int | None = None,
+                        loader_for: Callable[[Any], Callable[[], Any]] | None = None) -> Dict[Any, Any]:
+        """
+        get_or_set para varias claves {id: clave} con una sola carga:
+        `load_many(ids)` devuelve {id: valor} de las claves que este llamador
+        lidera; las que ya calcula otro se esperan. Devuelve {id: valor} de
+        las encontradas. Con `soft_ttl_seconds`, `loader_for(id)` da el
+        cargador de refresco de cada entrada.
+        """
+        values: Dict[Any, Any] = {}
+        led: Dict[Any, _Flight] = {}
+        waiting: Dict[Any, _Flight] = {}
+        for id, key in keys.items():
+            value = self.get(key)
+            if value is None:
+                value, flight, leader = self._join(key)
+                if flight is not None:
+                    (led if leader else waiting)[id] = flight
+                    continue
+            values[id] = value
+
+        if led:
+            try:
+                loaded = _from_primary(load_many, list(led))
+            except BaseException as e:
+                for id, flight in led.items():
+                    self._land(keys[id], flight, error=e)
+                raise
+            for id, flight in led.items():
+                value = loaded.get(id)
+                loader = loader_for(id) if loader_for is not None else None
+                self._land(keys[id], flight, value, ttl_seconds=ttl_seconds,
+                           soft_ttl_seconds=soft_ttl_seconds, loader=loader)
+                if value is not None:
+                    values[id] = value
+
+        for id, flight in waiting.items():
+            try:
+                value = flight.future.result(timeout=self._timeout(timeout))
+            except FutureTimeout:
+                raise CacheLoadTimeout(f"Tiempo de espera agotado calculando '{keys[id]}'") from None
+            if value is not None:
+                values[id] = value
+        return values
+
+    async def aget_or_set(self, key: str, loader: Callable[[], Any], ttl_seconds: int = 300,
+                          timeout: float | None = None) -> Any:
+        """
+        Versión asyncio de get_or_set; comparte los cálculos en curso con
+        los llamadores síncronos. `loader` puede ser una corrutina o una
+        función síncrona (se ejecuta en un hilo). El cálculo corre en su
+        propia tarea: si el líder se cancela, los demás reciben el valor.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value, flight, leader = self._join(key)
+        if flight is None:
+            return value
+        if leader:
+            async def run():
+                # La tarea tiene su propia copia del contexto: la carga va a la base principal
+                replica.prefer_replica.set(False)
+                try:
+                    result = await loader() if inspect.iscoroutinefunction(loader) else await asyncio.to_thread(loader)
+                except BaseException as e:
+                    self._land(key, flight, error=e)
+                    return
+                self._land(key, flight, result, ttl_seconds=ttl_seconds)
+
+            flight.task = asyncio.ensure_future(run())
+        waiter = asyncio.wrap_future(flight.future)
+        # asyncio.wait no cancela el Future compartido al vencer el plazo
+        done, _ = await asyncio.wait({waiter}, timeout=None if leader else self._timeout(timeout))
+        if not done:
+            raise CacheLoadTimeout(f"Tiempo de espera agotado calculando '{key}'")
+        return waiter.result()
     
     def delete(self, key: str):
         """
         Elimina una entrada del caché
         """
-        if key in self._cache:
-            del self._cache[key]
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.invalidated = True
+        if entry is not None and self._hot(entry):
+            self._refresh(key, entry)
     
     def clear(self):
         """
         Limpia todo el caché
         """
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            for flight in self._inflight.values():
+                flight.invalidated = True
     
     def invalidate_pattern(self, pattern: str):
         """
-        Invalida todas las claves que coincidan con un patrón
+        Invalida todas las claves que coincidan con un patrón (las calientes se recargan en segundo plano)
         Ejemplo: invalidate_pattern('productos') elimina todas las claves que contengan 'productos'
         """
-        keys_to_delete = [key for key in self._cache.keys() if pattern in key]
-        for key in keys_to_delete:
-            del self._cache[key]
+        with self._lock:
+            removed = {key: self._cache.pop(key) for key in [key for key in self._cache.keys() if pattern in key]}
+            for key, flight in self._inflight.items():
+                if pattern in key:
+                    flight.invalidated = True
+        # Las claves calientes se vuelven a cargar ya (después del commit de
+        # quien invalida): sus lectores esperan ese cálculo en vez de consultar
+        for key, entry in removed.items():
+            if self._hot(entry):
+                self._refresh(key, entry)
 
 # Instancia global del caché
 cache = SimpleCache()
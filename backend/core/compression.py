@@ -0,0 +1,97 @@
+"""
+Cuerpos JSON precomprimidos para respuestas cacheadas.
+
+GZipMiddleware comprime cada respuesta al vuelo, aunque el cuerpo salga de
+la caché y sea idéntico al anterior. Los cuerpos cacheados se guardan como
+`Precompressed`, con sus variantes gzip y brotli generadas una sola vez al
+llenar la caché; `PrecompressedResponse` elige la variante según
+Accept-Encoding y declara `Vary: Accept-Encoding`. Como la respuesta ya lleva
+Content-Encoding, GZipMiddleware la deja pasar sin tocarla y solo comprime
+las respuestas que no vienen de la caché.
+
+brotli es opcional (`pip install brotli`): sin él solo se guarda gzip.
+"""
+import gzip
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+# Mismo umbral que GZipMiddleware: por debajo no compensa comprimir
+MIN_SIZE = 1000
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """
+    Codificaciones aceptadas (q > 0) de un header Accept-Encoding.
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding.strip())
+    return accepted
+
+
+class Precompressed:
+    """
+    Cuerpo sin comprimir más sus variantes gzip y brotli (si aplica).
+    """
+    __slots__ = ("identity", "gzip", "br")
+
+    def __init__(self, body: bytes):
+        self.identity = body
+        self.gzip = None
+        self.br = None
+        if len(body) >= MIN_SIZE:
+            # mtime=0: el mismo cuerpo produce siempre los mismos bytes
+            self.gzip = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    def variant(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = "*" in accepted
+        if self.br is not None and ("br" in accepted or wildcard):
+            return self.br, "br"
+        if self.gzip is not None and ("gzip" in accepted or wildcard):
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+class PrecompressedResponse(Response):
+    """
+    Respuesta JSON que sirve la variante precomprimida adecuada al cliente.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Precompressed, status_code: int = 200, headers: dict | None = None):
+        self.precompressed = content
+        super().__init__(content.identity, status_code=status_code, headers=headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body, encoding = self.precompressed.variant(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is not None:
+            self.body = body
+            self.headers["content-encoding"] = encoding
+            self.headers["content-length"] = str(len(body))
+            # GZipMiddleware no toca respuestas con Content-Encoding: el Vary
+            # va aquí. Sin codificar (cuerpo >= MIN_SIZE) lo agrega el middleware.
+            self.headers.add_vary_header("Accept-Encoding")
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,29 @@
+"""
+Peticiones condicionales (ETag / If-None-Match).
+
+El ETag se calcula sobre el cuerpo sin comprimir y es débil (`W/"..."`):
+las variantes gzip/brotli de un mismo cuerpo son equivalentes, así que un
+cliente que guardó cualquiera de ellas recibe 304 si el contenido no cambió.
+"""
+import hashlib
+
+
+def weak_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (lista de ETags o `*`) contra `etag`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _opaque(etag)
+    return any(_opaque(tag) == opaque for tag in if_none_match.split(","))
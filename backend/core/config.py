@@ -3,11 +3,77 @@ import os
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./taller_diego.db"
+    # Réplica de lectura opcional (ver db/replica.py y core/read_routing.py)
+    DATABASE_REPLICA_URL: str = ""
     SUPABASE_URL: str = ""
     SUPABASE_ANON_KEY: str = ""
     JWT_SECRET: str = ""
 
+    # Pool de conexiones y arranque
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PREFILL: int = 5
+    WARMUP_RETRY_SECONDS: float = 5.0
+
+    # Perfil SQLite (solo aplica si DATABASE_URL es sqlite)
+    SQLITE_POOL_SIZE: int = 8
+    SQLITE_MAX_OVERFLOW: int = 8
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Instrumentación SQL por petición
+    SERVER_TIMING: bool = True
+    SQL_STATEMENT_BUDGET: int = 50
+    SQL_ROUTE_BUDGETS: dict[str, int] = {}
+    SQL_BUDGET_MODE: str = "warn"  # "warn" registra una advertencia, "raise" falla la petición
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Serialización: "orjson" usa la ruta rápida en listados, "json" la de Pydantic
+    JSON_RESPONSE_CLASS: str = "orjson"
+
+    # Caché en memoria: espera máxima por el cálculo de otro llamador (single-flight)
+    CACHE_LOAD_TIMEOUT_SECONDS: float = 30.0
+    # Stale-while-revalidate (cachés de productos y servicios): pasado el TTL
+    # blando se sirve el valor vencido y se refresca en segundo plano; pasado
+    # el duro, la lectura espera la consulta. Las claves leídas al menos
+    # CACHE_HOT_MIN_HITS veces se refrescan antes de vencer (revisión cada
+    # CACHE_REFRESH_INTERVAL_SECONDS)
+    CACHE_SOFT_TTL_SECONDS: int = 60
+    CACHE_HARD_TTL_SECONDS: int = 600
+    CACHE_REFRESH_INTERVAL_SECONDS: float = 5.0
+    CACHE_HOT_MIN_HITS: int = 3
+    CACHE_REFRESH_WORKERS: int = 2
+
+    # Réplica de lectura: tras una escritura, las lecturas del mismo cliente
+    # (y de este worker) van a la base principal durante este tiempo
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 5.0
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    REPLICA_EXCLUDED_PATHS: list[str] = ["/api/v1/status", "/api/v1/sync", "/api/v1/auth"]
+
+    # Descuento de stock en ventas: "lock" (SELECT ... FOR UPDATE) o
+    # "atomic" (UPDATE condicional, sin lectura previa)
+    STOCK_DECREMENT_MODE: str = "lock"
+
+    # Libro de movimientos de inventario: intervalo entre fotos de stock
+    INVENTORY_SNAPSHOT_SECONDS: float = 3600.0
+
+    # Dashboard (/api/v1/dashboard): vida de los totales en caché
+    DASHBOARD_CACHE_SECONDS: int = 10
+
+    # Imágenes de productos (almacén local y miniaturas, ver core/images.py)
+    IMAGES_DIR: str = "./media/imagenes"
+    IMAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    # Ancho x alto máximo (bombas de descompresión: pocos bytes, muchos píxeles)
+    IMAGE_MAX_PIXELS: int = 40_000_000
+    IMAGE_THUMBNAIL_SIZES: dict[str, int] = {"sm": 128, "md": 320, "lg": 640}
+
+    # Server-Sent Events de inventario
+    EVENTS_BUFFER_SIZE: int = 1000
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
     class Config:
         env_file = f"{os.path.dirname(os.path.dirname(__file__))}/.env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,131 @@
+"""
+Eventos de inventario para Server-Sent Events (/api/v1/events).
+
+Los repositorios publican, después de cada commit, eventos de stock, precio
+y catálogo. El broker les asigna un id creciente, los guarda en un buffer
+circular acotado (para reanudar con Last-Event-ID) y los reparte a las
+colas asyncio de los clientes conectados. `publish` se llama desde los
+hilos del threadpool, así que la entrega a cada cola se hace con
+`call_soon_threadsafe` en el loop del suscriptor.
+
+El broker vive en memoria: con varios workers cada uno tiene el suyo y un
+cliente solo recibe los eventos de las escrituras atendidas por su worker.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from core.config import settings
+
+EVENT_TYPES = ("stock", "price", "catalog")
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+    created_at: float = field(default_factory=time.time)
+
+    def matches(self, types: set[str] | None, producto_ids: set[int] | None) -> bool:
+        if types and self.type not in types:
+            return False
+        if producto_ids and self.data.get("producto_id") not in producto_ids:
+            return False
+        return True
+
+    def encode(self) -> bytes:
+        payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"), default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """
+    Cola de un cliente conectado. Si el cliente no consume y la cola se
+    llena, se marca como desbordada y el stream se cierra: al reconectar
+    con Last-Event-ID recupera lo que siga en el buffer.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _put(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+
+    def __init__(self, buffer_size: int):
+        self._lock = threading.Lock()
+        self._buffer: deque[Event] = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, type: str, data: dict) -> Event:
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, type, data)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, event)
+            except RuntimeError:
+                # Loop cerrado (apagado): ya no hay a quién entregar
+                self.unsubscribe(sub)
+        return event
+
+    def subscribe(self, queue_size: int = 1000) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop(), queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def replay(self, last_event_id: int) -> list[Event] | None:
+        """
+        Eventos posteriores a `last_event_id` que siguen en el buffer, o None
+        si ya no se puede reanudar (el buffer rotó o el servidor reinició).
+        """
+        with self._lock:
+            if last_event_id > self._last_id:
+                return None
+            if self._buffer and last_event_id < self._buffer[0].id - 1:
+                return None
+            return [event for event in self._buffer if event.id > last_event_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+broker = EventBroker(settings.EVENTS_BUFFER_SIZE)
+
+
+def publish(type: str, data: dict) -> Event:
+    return broker.publish(type, data)
+
+
+def producto_snapshot(producto) -> dict:
+    return {
+        "producto_id": producto.id,
+        "nombre": producto.nombre,
+        "stock": producto.stock,
+        "precioVenta": producto.precioVenta,
+        "precioCompra": producto.precioCompra,
+    }
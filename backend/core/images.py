@@ -0,0 +1,193 @@
+"""
+Almacén local de imágenes de productos con miniaturas en caché.
+
+Los originales se guardan en disco con su hash de contenido como nombre
+(`<IMAGES_DIR>/originales/ab/<hash>.jpg`), así que la URL de una imagen
+cambia si y solo si cambia su contenido y se puede servir como inmutable.
+Las miniaturas de tamaños fijos (IMAGE_THUMBNAIL_SIZES) se generan la
+primera vez que se piden y quedan en disco
+(`<IMAGES_DIR>/miniaturas/<tamaño>/<hash>.<ext>`); las siguientes
+peticiones son un FileResponse directo (sendfile cuando el servidor lo
+soporta).
+
+Pillow es opcional (`pip install Pillow`): sin él no se generan
+miniaturas y se sirve el original con una caché corta, para que al
+instalarlo los clientes pasen a recibir la miniatura. Con Pillow cada
+subida se decodifica entera antes de guardarla (formato coherente con los
+bytes mágicos, sin daños y dentro de IMAGE_MAX_PIXELS).
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - Pillow es opcional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+FALLBACK_CACHE = "public, max-age=3600"
+
+HASH_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# extensión -> (media type, formato de Pillow para la miniatura, extensión de la miniatura)
+FORMATS = {
+    "jpg": ("image/jpeg", "JPEG", "jpg"),
+    "png": ("image/png", "PNG", "png"),
+    "webp": ("image/webp", "WEBP", "webp"),
+    # GIF animado: la miniatura es el primer cuadro en PNG
+    "gif": ("image/gif", "PNG", "png"),
+}
+MEDIA_TYPES = {ext: media for ext, (media, _, _) in FORMATS.items()}
+# Formato que informa Pillow -> extensión
+PIL_FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+
+def detect_format(data: bytes) -> str | None:
+    """
+    Extensión según los bytes mágicos (no se confía en el Content-Type del cliente).
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return None
+
+
+def _too_large(img) -> bool:
+    return img.width * img.height > settings.IMAGE_MAX_PIXELS
+
+
+def validate_image(data: bytes, ext: str):
+    """
+    Con Pillow: ValueError si la imagen no se puede decodificar, su formato
+    real no es `ext` o supera IMAGE_MAX_PIXELS. Sin Pillow no hace nada.
+    """
+    if Image is None:
+        return
+    try:
+        # verify() revisa la estructura (y CRC en PNG) pero no decodifica
+        # los píxeles y deja el objeto inutilizable: se vuelve a abrir
+        with Image.open(io.BytesIO(data)) as img:
+            if PIL_FORMATS.get(img.format) != ext:
+                raise ValueError("El contenido no corresponde al formato de la imagen")
+            if _too_large(img):
+                raise ValueError("La imagen supera el máximo de píxeles permitido")
+            img.verify()
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+    except ValueError:
+        raise
+    except Exception as exc:  # Pillow lanza OSError, SyntaxError, struct.error, DecompressionBombError...
+        raise ValueError("La imagen está dañada o no se puede leer") from exc
+
+
+def _write_atomic(path: Path, write):
+    # Archivo temporal + rename: un lector nunca ve un archivo a medio escribir
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ImageStore:
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _original(self, digest: str, ext: str) -> Path:
+        return self.root / "originales" / digest[:2] / f"{digest}.{ext}"
+
+    def save(self, data: bytes) -> tuple[str, str]:
+        """
+        Guarda el original (si no existía) y devuelve (hash, extensión).
+        """
+        ext = detect_format(data)
+        if ext is None:
+            raise ValueError("Formato de imagen no soportado (JPEG, PNG, WebP o GIF)")
+        validate_image(data, ext)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        path = self._original(digest, ext)
+        if not path.exists():
+            _write_atomic(path, lambda f: f.write(data))
+        return digest, ext
+
+    def find_original(self, digest: str) -> tuple[Path, str] | None:
+        if not HASH_RE.match(digest):
+            return None
+        for ext in FORMATS:
+            path = self._original(digest, ext)
+            if path.is_file():
+                return path, ext
+        return None
+
+    def thumbnail(self, digest: str, size: str) -> tuple[Path, str, bool] | None:
+        """
+        (ruta, media type, es_miniatura) del tamaño pedido, generándolo si
+        hace falta. Sin Pillow, o si el original no se puede decodificar
+        (subido antes de validar las imágenes), devuelve el original
+        (es_miniatura False).
+        """
+        found = self.find_original(digest)
+        if found is None:
+            return None
+        original, ext = found
+        if Image is None:
+            return original, MEDIA_TYPES[ext], False
+
+        _, pil_format, thumb_ext = FORMATS[ext]
+        path = self.root / "miniaturas" / size / f"{digest}.{thumb_ext}"
+        if not path.is_file():
+            # Un solo hilo genera cada miniatura; los demás esperan y la leen
+            try:
+                with self._lock_for(digest, size):
+                    if not path.is_file():
+                        self._render(original, path, settings.IMAGE_THUMBNAIL_SIZES[size], pil_format)
+            except Exception as exc:
+                logger.warning("Miniatura %s/%s no generada: %s", digest, size, exc)
+                return original, MEDIA_TYPES[ext], False
+            finally:
+                with self._locks_guard:
+                    self._locks.pop((digest, size), None)
+        return path, MEDIA_TYPES[thumb_ext], True
+
+    def _lock_for(self, digest: str, size: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((digest, size), threading.Lock())
+
+    @staticmethod
+    def _render(original: Path, path: Path, pixels: int, pil_format: str):
+        with Image.open(original) as img:
+            if _too_large(img):
+                raise ValueError("La imagen supera el máximo de píxeles permitido")
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((pixels, pixels))
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            options = {"JPEG": {"quality": 82, "optimize": True},
+                       "WEBP": {"quality": 80},
+                       "PNG": {"optimize": True}}[pil_format]
+            _write_atomic(path, lambda f: img.save(f, pil_format, **options))
+
+
+store = ImageStore(settings.IMAGES_DIR)
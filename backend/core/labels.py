@@ -0,0 +1,129 @@
+"""
+Hojas de etiquetas con código de barras (Code 128) en SVG.
+
+Cada etiqueta (nombre del producto, barras y texto legible) se dibuja una
+sola vez en una caja fija de LABEL_WIDTH x LABEL_HEIGHT unidades y se
+guarda en la caché por código de barras; la hoja solo la posiciona y
+escala con un `<g transform>`, así que reimprimir es concatenar fragmentos
+ya generados. La hoja se emite en streaming, fila por fila.
+
+Solo SVG: no hay dependencia de PDF en el backend. El navegador imprime el
+SVG directamente (tamaño de hoja en mm, ancho A4).
+"""
+from collections.abc import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from core.cache import cache
+
+# Patrones Code 128 (anchos barra/espacio alternados, empezando por barra)
+CODE128_PATTERNS = (
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312", "132212", "221213",
+    "221312", "231212", "112232", "122132", "122231", "113222", "123122", "123221", "223211", "221132",
+    "221231", "213212", "223112", "312131", "311222", "321122", "321221", "312212", "322112", "322211",
+    "212123", "212321", "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121", "313121", "211331",
+    "231131", "213113", "213311", "213131", "311123", "311321", "331121", "312113", "312311", "332111",
+    "314111", "221411", "431111", "111224", "111422", "121124", "121421", "141122", "141221", "112214",
+    "112412", "122114", "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112", "421211", "212141",
+    "214121", "412121", "111143", "111341", "131141", "114113", "114311", "411113", "411311", "113141",
+    "114131", "311141", "411131", "211412", "211214", "211232", "2331112",
+)
+START_B = 104
+STOP = 106
+QUIET_ZONE = 10  # módulos en blanco a cada lado
+
+# Caja de una etiqueta (unidades del viewBox; la hoja la escala)
+LABEL_WIDTH = 100
+LABEL_HEIGHT = 60
+SHEET_WIDTH_MM = 210
+LABEL_TTL_SECONDS = 24 * 3600
+
+
+def encodable(text: str | None) -> bool:
+    return bool(text) and all(32 <= ord(char) <= 127 for char in text)
+
+
+def code128_widths(text: str) -> str:
+    """
+    Anchos de barras y espacios (Code 128 subconjunto B) de `text`, con
+    inicio, dígito de control y parada.
+    """
+    values = []
+    for char in text:
+        code = ord(char)
+        if not 32 <= code <= 127:
+            raise ValueError(f"Carácter no codificable en Code 128 B: {char!r}")
+        values.append(code - 32)
+    checksum = (START_B + sum(i * v for i, v in enumerate(values, start=1))) % 103
+    return "".join(CODE128_PATTERNS[v] for v in (START_B, *values, checksum, STOP))
+
+
+def _bars_path(widths: str, module: float, x0: float, y0: float, height: float) -> str:
+    parts = []
+    x = x0
+    for i, w in enumerate(widths):
+        width = int(w) * module
+        if i % 2 == 0:
+            parts.append(f"M{x:.3f} {y0}h{width:.3f}v{height}h{-width:.3f}z")
+        x += width
+    return "".join(parts)
+
+
+def render_label(codigo: str, nombre: str) -> bytes:
+    """
+    Fragmento SVG (sin posicionar) de una etiqueta.
+    """
+    widths = code128_widths(codigo)
+    modules = sum(int(w) for w in widths) + 2 * QUIET_ZONE
+    module = (LABEL_WIDTH - 8) / modules
+    x0 = 4 + QUIET_ZONE * module
+    nombre = nombre if len(nombre) <= 32 else nombre[:31] + "…"
+    return (
+        f'<rect width="{LABEL_WIDTH}" height="{LABEL_HEIGHT}" fill="#fff" stroke="#ccc" stroke-width="0.3"/>'
+        f'<text x="{LABEL_WIDTH / 2}" y="10" font-size="6" text-anchor="middle" font-family="sans-serif">{escape(nombre)}</text>'
+        f'<path d="{_bars_path(widths, module, x0, 14, 32)}"/>'
+        f'<text x="{LABEL_WIDTH / 2}" y="54" font-size="6" text-anchor="middle" font-family="monospace">{escape(codigo)}</text>'
+    ).encode("utf-8")
+
+
+def cached_label(codigo: str, nombre: str) -> bytes:
+    """
+    Etiqueta desde la caché (clave por código de barras); se vuelve a
+    dibujar si el nombre del producto cambió.
+    """
+    key = f"labels_{codigo}"
+    cached = cache.get(key)
+    if cached is not None and cached[0] == nombre:
+        return cached[1]
+    fragment = render_label(codigo, nombre)
+    cache.set(key, (nombre, fragment), ttl_seconds=LABEL_TTL_SECONDS)
+    return fragment
+
+
+def label_sheet(labels: Iterable[tuple[str, str]], total: int, columnas: int) -> Iterator[bytes]:
+    """
+    Hoja SVG con `total` etiquetas (codigo, nombre) en `columnas` columnas,
+    emitida por filas.
+    """
+    scale = SHEET_WIDTH_MM / columnas / LABEL_WIDTH
+    row_height = LABEL_HEIGHT * scale
+    rows = max(1, -(-total // columnas))
+    height = rows * row_height
+    yield (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SHEET_WIDTH_MM}mm" height="{height:.2f}mm" '
+        f'viewBox="0 0 {SHEET_WIDTH_MM} {height:.2f}">'
+    ).encode("utf-8")
+
+    buffer = bytearray()
+    for i, (codigo, nombre) in enumerate(labels):
+        row, col = divmod(i, columnas)
+        buffer += f'<g transform="translate({col * SHEET_WIDTH_MM / columnas:.3f} {row * row_height:.3f}) scale({scale:.5f})">'.encode()
+        buffer += cached_label(codigo, nombre)
+        buffer += b"</g>"
+        if col == columnas - 1:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"</svg>"
+    yield bytes(buffer)
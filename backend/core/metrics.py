@@ -0,0 +1,306 @@
+"""
+Métricas en formato de texto de Prometheus.
+
+Pensado para estar siempre activo: cada hilo escribe en su propio shard
+(sin locks en la ruta caliente) y los histogramas usan buckets
+preasignados. Los shards solo se suman al generar /metrics.
+"""
+import bisect
+import inspect
+import re
+import threading
+import time
+from functools import wraps
+
+from fastapi.routing import APIRoute
+
+from core import sql_stats
+from core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._shards_lock = threading.Lock()
+        _registry.append(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.data
+        except AttributeError:
+            # Solo ocurre una vez por hilo
+            data = {}
+            with self._shards_lock:
+                self._shards.append(data)
+            self._local.data = data
+            return data
+
+    def _snapshots(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() es atómico bajo el GIL
+        return [shard.copy() for shard in shards]
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames)
+
+    def observe(self, labels: tuple, value: float):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # Un contador por bucket, +Inf y la suma al final
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in self._snapshots():
+            for labels, counts in shard.items():
+                acc = totals.setdefault(labels, [0] * (len(self.buckets) + 2))
+                for i, value in enumerate(list(counts)):
+                    acc[i] += value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, counts in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound)) if bound != "+Inf" else bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Gauge calculado al generar /metrics a partir de una función que devuelve
+    pares (labels, valor).
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), callback=None):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        for labels, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+# --- Métricas de la aplicación ---
+
+http_requests = Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+http_latency = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", ("method", "route"))
+_started = Counter("http_requests_started_total", "Peticiones HTTP iniciadas")
+_finished = Counter("http_requests_finished_total", "Peticiones HTTP finalizadas")
+http_in_flight = Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso",
+    callback=lambda: [((), _started.collect().get((), 0) - _finished.collect().get((), 0))])
+db_statements = Histogram(
+    "db_statements_per_request", "Sentencias SQL ejecutadas por petición", ("route",),
+    buckets=STATEMENT_BUCKETS)
+db_time = Histogram(
+    "db_time_per_request_seconds", "Tiempo en base de datos por petición", ("route",))
+cache_hits = Counter("cache_hits_total", "Aciertos de la caché en memoria", ("namespace",))
+cache_misses = Counter("cache_misses_total", "Fallos de la caché en memoria", ("namespace",))
+cache_coalesced = Counter(
+    "cache_coalesced_total", "Fallos de caché que esperaron el cálculo de otro llamador", ("namespace",))
+cache_stale = Counter(
+    "cache_stale_total", "Valores vencidos (TTL blando) servidos mientras se refrescan", ("namespace",))
+cache_refreshes = Counter(
+    "cache_refreshes_total", "Refrescos de caché en segundo plano", ("namespace", "result"))
+
+
+def _pool_stats():
+    from db.base import get_engine
+
+    pool = get_engine().pool
+    stats = []
+    for name in ("size", "checkedout", "overflow", "checkedin"):
+        fn = getattr(pool, name, None)
+        if fn is not None:
+            stats.append(((name,), fn()))
+    return stats
+
+
+db_pool = Gauge("db_pool_connections", "Estado del pool de SQLAlchemy", ("state",), callback=_pool_stats)
+
+
+def _replica_lag():
+    from db import replica
+
+    lag = replica.state.lag_seconds
+    return [((), lag)] if lag is not None else []
+
+
+db_replica_lag = Gauge("db_replica_lag_seconds", "Retraso de la réplica de lectura", callback=_replica_lag)
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+_PARAM_RE = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def route_template(scope) -> str:
+    """
+    Plantilla completa de la ruta atendida (p. ej. /api/v1/productos/{id}).
+    Según la versión de FastAPI, la ruta del scope puede no incluir el prefijo
+    del router, así que se reconstruye a partir del path real.
+    """
+    route = scope.get("route")
+    relative = getattr(route, "path", None)
+    if relative is None:
+        return "unmatched"
+    params = scope.get("path_params", {})
+    try:
+        rendered = _PARAM_RE.sub(lambda m: str(params[m.group(1)]), relative)
+    except KeyError:
+        return relative
+    path = scope["path"]
+    if rendered and path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + relative
+    return relative
+
+
+def _mark_endpoint_end():
+    stats = sql_stats.current()
+    if stats is not None:
+        stats.endpoint_end = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute que marca cuándo termina el endpoint, para separar en
+    Server-Timing el tiempo de serialización (incluidas cargas perezosas).
+    """
+    def __init__(self, path, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            @wraps(endpoint)
+            async def timed_endpoint(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_end()
+        else:
+            @wraps(endpoint)
+            def timed_endpoint(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_end()
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra conteo, latencia y uso de base de datos por
+    ruta, y agrega los headers Server-Timing y X-DB-Statements. Se etiqueta con la plantilla de la ruta (p. ej. /api/v1/productos/{id})
+    para mantener acotada la cardinalidad.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats, token = sql_stats.begin_request(scope)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing(time.perf_counter()).encode()))
+                    headers.append((b"x-db-statements", str(stats.statements).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        _started.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            sql_stats.end_request(token)
+            _finished.inc()
+            route = route_template(scope)
+            method = scope["method"]
+            http_requests.inc((method, route, str(status_code)))
+            http_latency.observe((method, route), elapsed)
+            db_statements.observe((route,), stats.statements)
+            db_time.observe((route,), stats.db_time)
+            sql_stats.report(stats, route)
@@ -0,0 +1,80 @@
+"""
+Enrutamiento de lecturas a la réplica (solo con DATABASE_REPLICA_URL).
+
+Las peticiones GET/HEAD fuera de REPLICA_EXCLUDED_PATHS se marcan para leer
+de la réplica, salvo dentro de la ventana de "leer lo propio" del cliente
+que escribió: una escritura exitosa deja la cookie `primary_until` con el
+fin de la ventana (REPLICA_READ_YOUR_WRITES_SECONDS), así que ese cliente
+vuelve a la base principal aunque su siguiente petición la atienda otro
+worker. Los demás clientes siguen leyendo de la réplica.
+
+Las cachés en memoria del worker no se llenan nunca desde la réplica (ver
+core/cache.py): lo que se guarda ahí lo ven todos los clientes.
+"""
+import math
+import time
+
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from db import replica
+
+COOKIE = "primary_until"
+READ_METHODS = frozenset({"GET", "HEAD"})
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def _cookie_deadline(scope: Scope) -> float:
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            try:
+                return float(cookie_parser(value.decode("latin-1")).get(COOKIE, 0))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def _excluded(path: str) -> bool:
+    return any(path.startswith(prefix) for prefix in settings.REPLICA_EXCLUDED_PATHS)
+
+
+class ReadRoutingMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.DATABASE_REPLICA_URL:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method in WRITE_METHODS:
+            await self.app(scope, receive, self._mark_writes(send))
+            return
+
+        if (
+            method in READ_METHODS
+            and not _excluded(scope["path"])
+            and time.time() >= _cookie_deadline(scope)
+        ):
+            token = replica.prefer_replica.set(True)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                replica.prefer_replica.reset(token)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _mark_writes(send: Send) -> Send:
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+                cookie = (f"{COOKIE}={time.time() + window:.3f}; Max-Age={math.ceil(window)}; "
+                          f"Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        return send_wrapper
@@ -0,0 +1,160 @@
+"""
+Serialización JSON rápida para listados grandes.
+
+El camino normal de FastAPI valida cada objeto ORM contra el response_model
+y luego lo codifica con json de la librería estándar. Para listados de miles
+de filas ese doble paso domina el tiempo de CPU. Aquí los listados se
+construyen directamente desde filas Core (mappings) a dicts con los mismos
+campos, orden y tipos que el response_model, y se codifican con orjson.
+
+Los encoders se derivan de los campos del modelo Pydantic, así que un campo
+nuevo en el schema aparece también en la respuesta rápida. Los validadores
+de salida (sanitize_html) no se ejecutan: los datos ya pasaron por ellos al
+crearse o actualizarse. `python -m benchmarks.serialization` compara ambos
+caminos byte a byte (tras decodificar) y mide la CPU ahorrada.
+"""
+import json
+import types
+import typing
+from collections.abc import Callable, Mapping
+from functools import lru_cache
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse codificada con orjson (UTF-8, sin espacios).
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class RawJSONResponse(Response):
+    """
+    Respuesta con un cuerpo JSON ya serializado: FastAPI no vuelve a validarlo.
+    """
+    media_type = "application/json"
+
+
+def fast_json_enabled() -> bool:
+    return settings.JSON_RESPONSE_CLASS == "orjson" and orjson is not None
+
+
+def default_response_class() -> type[JSONResponse]:
+    return ORJSONResponse if fast_json_enabled() else JSONResponse
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _default(value):
+    # Fallback sin orjson: fechas en ISO 8601 igual que Pydantic
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _scalar_type(annotation):
+    """
+    Quita Optional/Union con None: `float | None` -> float.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return _scalar_type(args[0])
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    annotation = _scalar_type(annotation)
+    if typing.get_origin(annotation) is list:
+        annotation = typing.get_args(annotation)[0]
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def row_encoder(model: type[BaseModel], prefix: str = "", fields: tuple[str, ...] | None = None) -> Callable[[Mapping], dict]:
+    """
+    Devuelve una función fila -> dict con los campos escalares de `model` en
+    su mismo orden. Los float se convierten (las columnas son Integer y
+    Pydantic emite 250.0). Los campos anidados (otros modelos o listas de
+    modelos) quedan en None para que el llamador los complete. Con `prefix`
+    se leen columnas etiquetadas de un JOIN (p. ej. "producto__nombre");
+    con `fields` solo se emiten esos campos.
+    """
+    plan = []
+    for name, field in model.model_fields.items():
+        if fields is not None and name not in fields:
+            continue
+        if _is_model(field.annotation):
+            plan.append((name, None, None, True))
+        else:
+            coerce = float if _scalar_type(field.annotation) is float else None
+            plan.append((name, prefix + name, coerce, False))
+
+    def encode(row: Mapping) -> dict:
+        out = {}
+        for name, column, coerce, nested in plan:
+            if nested:
+                out[name] = None
+                continue
+            value = row[column]
+            out[name] = coerce(value) if coerce is not None and value is not None else value
+        return out
+
+    return encode
+
+
+@lru_cache(maxsize=256)
+def fieldset_encoder(model: type[BaseModel], fields: tuple[str, ...] | None) -> Callable[[Mapping], dict]:
+    return row_encoder(model, fields=fields)
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """
+    Valida `?fields=a,b` contra los campos escalares de `model`. Devuelve los
+    campos en el orden del modelo (clave de caché canónica) o None si no se
+    pidió un subconjunto.
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    allowed = [name for name, field in model.model_fields.items() if not _is_model(field.annotation)]
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested) or None
+
+
+def fieldset(model: type[BaseModel]):
+    """
+    Dependencia para el parámetro `?fields=` de listados y detalles.
+    """
+    description = f"Campos a devolver separados por coma ({', '.join(model.model_fields)})"
+
+    def dependency(fields: str | None = Query(None, description=description)) -> tuple[str, ...] | None:
+        try:
+            return parse_fields(fields, model)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return dependency
+
+
+def fields_key(fields: tuple[str, ...] | None) -> str:
+    # Sufijo de caché por conjunto de campos ("" = respuesta completa)
+    return f":{','.join(fields)}" if fields else ""
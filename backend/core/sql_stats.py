@@ -0,0 +1,153 @@
+"""
+Estadísticas de SQL por petición: cada petición HTTP abre un RequestStats en
+un ContextVar y los eventos del engine acumulan sentencias, tiempo y
+"formas" de sentencia repetidas en él. Los endpoints síncronos corren en el
+threadpool con una copia del contexto, por lo que comparten el mismo objeto.
+"""
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StatementBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "shapes", "start", "endpoint_end", "scope", "budget_checked")
+
+    def __init__(self, scope=None):
+        self.statements = 0
+        self.db_time = 0.0
+        self.shapes: dict[str, int] = {}
+        self.start = time.perf_counter()
+        self.endpoint_end: float | None = None
+        self.scope = scope
+        self.budget_checked = False
+
+    def repeated(self, threshold: int | None = None) -> dict[str, int]:
+        """
+        Formas de sentencia ejecutadas al menos `threshold` veces (posible N+1).
+        """
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    def server_timing(self, end: float) -> str:
+        total = (end - self.start) * 1000
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries"']
+        if self.endpoint_end is not None:
+            parts.append(f"serialize;dur={(end - self.endpoint_end) * 1000:.1f}")
+        parts.append(f"app;dur={total:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def begin_request(scope=None) -> tuple[RequestStats, object]:
+    stats = RequestStats(scope)
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current() -> RequestStats | None:
+    return _current.get()
+
+
+@contextmanager
+def capture():
+    """
+    Cuenta las sentencias ejecutadas dentro del bloque. Útil en pruebas:
+
+        with sql_stats.capture() as stats:
+            VentaRepository(db).get_all()
+        assert stats.statements <= 2
+    """
+    stats, token = begin_request()
+    try:
+        yield stats
+    finally:
+        end_request(token)
+
+
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_PLACEHOLDERS_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,?)+\)")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """
+    Normaliza una sentencia para agrupar las que solo difieren en parámetros.
+    """
+    shape = _SPACES_RE.sub(" ", statement).strip()
+    shape = _PLACEHOLDERS_RE.sub("(?)", shape)
+    return _NUMBER_RE.sub("N", shape)
+
+
+def budget_for(route: str) -> int:
+    return settings.SQL_ROUTE_BUDGETS.get(route, settings.SQL_STATEMENT_BUDGET)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # El inicio va en el contexto de ejecución, que muere con la sentencia:
+    # si la sentencia falla no queda nada colgado en la conexión del pool
+    if _current.get() is not None and context is not None:
+        context._sql_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    start = getattr(context, "_sql_stats_start", None)
+    if start is None:
+        return
+    stats.statements += 1
+    stats.db_time += time.perf_counter() - start
+    shape = statement_shape(statement)
+    stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+
+    if settings.SQL_BUDGET_MODE == "raise" and stats.scope is not None and not stats.budget_checked:
+        from core.metrics import route_template
+
+        route = route_template(stats.scope)
+        budget = budget_for(route)
+        if budget and stats.statements > budget:
+            stats.budget_checked = True
+            raise StatementBudgetExceeded(
+                f"{route} superó el presupuesto de {budget} sentencias SQL"
+            )
+
+
+def report(stats: RequestStats, route: str):
+    """
+    Registra advertencias por presupuesto excedido o sentencias repetidas.
+    """
+    budget = budget_for(route)
+    if budget and stats.statements > budget:
+        logger.warning("%s ejecutó %s sentencias SQL (presupuesto %s)", route, stats.statements, budget)
+    for shape, count in stats.repeated().items():
+        logger.warning("Posible N+1 en %s: %s ejecuciones de %s", route, count, shape[:200])
+
+
+def install(engine):
+    """
+    Registra los eventos de conteo sobre un engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from core.cache import cache
+from core.config import settings
+from core.serialization import fast_json_enabled
+from db.base import SessionLocal, dispose_engine, get_engine, get_replica_engine, init_db, prefill_pool
+from db import replica
+import db.models  # registra las tablas en Base.metadata
+from db import migrations
+from services.producto_service import ProductoService
+from services.servicio_service import ServicioService
+from repositories.inventario_repo import InventarioRepository
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Estado de preparación del worker, separado de la vida del proceso:
+    el worker acepta conexiones de inmediato y pasa a "listo" cuando termina
+    el calentamiento (base de datos, pool y cachés).
+    """
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.error: str | None = None
+        self.missing_tables: list[str] = []
+        self.pending_migrations: list[str] = []
+        self.started_at = datetime.now()
+        self.ready_at: datetime | None = None
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "error": self.error,
+            "missing_tables": self.missing_tables,
+            "pending_migrations": self.pending_migrations,
+            "started_at": self.started_at.isoformat(),
+            "ready_at": self.ready_at.isoformat() if self.ready_at else None,
+        }
+
+
+readiness = Readiness()
+
+
+def warm_caches():
+    """
+    Precarga las cachés más consultadas: listado de productos, mapa de
+    códigos de barras y servicios.
+    """
+    db = SessionLocal()
+    try:
+        productos = ProductoService(db)
+        productos.list_productos()
+        productos.get_barcode_map()
+        servicios = ServicioService(db)
+        servicios.list_servicios()
+        if fast_json_enabled():
+            # Cuerpos ya serializados y precomprimidos de los listados
+            productos.list_productos_json()
+            servicios.list_servicios_json()
+    finally:
+        db.close()
+
+
+def warm_up():
+    missing = init_db()
+    if missing:
+        logger.warning("Tablas faltantes en la base de datos: %s", ", ".join(sorted(missing)))
+    readiness.missing_tables = sorted(missing)
+    readiness.pending_migrations = [m.nombre for m in migrations.pending()]
+    if readiness.pending_migrations:
+        logger.warning("Migraciones pendientes (python -m db.migrations upgrade): %s",
+                       ", ".join(readiness.pending_migrations))
+    prefill_pool(settings.DB_POOL_PREFILL)
+    if not {"movimientos_inventario", "snapshots_inventario"} & missing:
+        run_inventory_job(InventarioRepository.ensure_opening_balances)
+    warm_caches()
+
+
+def run_inventory_job(job):
+    db = SessionLocal()
+    try:
+        return job(InventarioRepository(db))
+    finally:
+        db.close()
+
+
+async def run_inventory_snapshots():
+    # Fotos periódicas de stock; con varios workers la primera en correr deja
+    # sin trabajo a las demás (solo se fotografían productos con movimientos nuevos)
+    while True:
+        await asyncio.sleep(settings.INVENTORY_SNAPSHOT_SECONDS)
+        if not readiness.ready or {"movimientos_inventario", "snapshots_inventario"} & set(readiness.missing_tables):
+            continue
+        try:
+            creadas = await asyncio.to_thread(run_inventory_job, InventarioRepository.take_snapshots)
+            logger.info("Fotos de inventario creadas: %s", creadas)
+        except Exception as e:
+            logger.warning("Fotos de inventario fallidas: %s", e)
+
+
+async def run_cache_refresher():
+    # Claves calientes: se recargan antes de su TTL blando, así sus lectores
+    # nunca encuentran un valor vencido ni esperan una consulta
+    while True:
+        await asyncio.sleep(settings.CACHE_REFRESH_INTERVAL_SECONDS)
+        if readiness.ready:
+            cache.refresh_hot(settings.CACHE_REFRESH_INTERVAL_SECONDS)
+
+
+def check_replica():
+    engine = get_replica_engine()
+    try:
+        lag = replica.measure_lag(engine)
+    except Exception as e:
+        replica.state.healthy = False
+        replica.state.error = str(e)
+    else:
+        replica.state.lag_seconds = lag
+        replica.state.healthy = lag is None or lag <= settings.REPLICA_MAX_LAG_SECONDS
+        replica.state.error = None if replica.state.healthy else "Retraso mayor a REPLICA_MAX_LAG_SECONDS"
+    replica.state.checked_at = datetime.now()
+
+
+async def run_replica_monitor():
+    # Sin réplica configurada no hay nada que vigilar
+    if get_replica_engine() is None:
+        return
+    while True:
+        healthy = replica.state.healthy
+        await asyncio.to_thread(check_replica)
+        if healthy != replica.state.healthy:
+            logger.warning("Réplica de lectura %s: %s", "disponible" if replica.state.healthy else "fuera de servicio",
+                           replica.state.error or f"retraso {replica.state.lag_seconds}")
+        await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+
+
+async def run_warm_up():
+    # Reintenta hasta que la base de datos responda; una caída no tumba el worker
+    while True:
+        readiness.attempts += 1
+        try:
+            await asyncio.to_thread(warm_up)
+        except Exception as e:
+            readiness.error = str(e)
+            logger.warning("Calentamiento fallido (intento %s): %s", readiness.attempts, e)
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+            continue
+        readiness.ready = True
+        readiness.error = None
+        readiness.ready_at = datetime.now()
+        return
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Crear el engine no abre conexiones; el trabajo con la BD va en segundo plano
+    get_engine()
+    task = asyncio.create_task(run_warm_up())
+    snapshots = asyncio.create_task(run_inventory_snapshots())
+    replica_monitor = asyncio.create_task(run_replica_monitor())
+    cache_refresher = asyncio.create_task(run_cache_refresher())
+    try:
+        yield
+    finally:
+        task.cancel()
+        snapshots.cancel()
+        replica_monitor.cancel()
+        cache_refresher.cancel()
+        dispose_engine()
@@ -0,0 +1,96 @@
+"""
+Exportaciones en streaming con memoria constante.
+
+Los listados normales materializan la tabla completa (objetos, dicts y el
+JSON entero). Las exportaciones recorren cursores del lado del servidor
+(`yield_per`/`stream_results`) y emiten el JSON por bloques a medida que
+llegan las filas, así que la memoria del worker no depende del tamaño de la
+tabla.
+
+El generador abre su propia sesión: la del `Depends(get_db)` del endpoint
+se cierra antes de que termine de enviarse la respuesta.
+"""
+from collections.abc import Callable, Iterable, Iterator, Mapping
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from core.serialization import dumps
+from db.base import SessionLocal
+
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+YIELD_PER = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+class GroupedRows:
+    """
+    Recorre filas hijas ordenadas por `key` a la par de las filas padre
+    (también ordenadas), sin cargarlas todas: un merge join en Python.
+    """
+
+    def __init__(self, rows: Iterable[Mapping], key: str):
+        self._rows = iter(rows)
+        self._key = key
+        self._next = next(self._rows, None)
+
+    def take(self, value) -> list[Mapping]:
+        group = []
+        # Filas huérfanas (padre filtrado o inexistente): se descartan
+        while self._next is not None and self._next[self._key] < value:
+            self._next = next(self._rows, None)
+        while self._next is not None and self._next[self._key] == value:
+            group.append(self._next)
+            self._next = next(self._rows, None)
+        return group
+
+
+def _chunks(items: Iterator[dict], fmt: str) -> Iterator[bytes]:
+    """
+    Agrupa los elementos codificados en bloques de ~CHUNK_SIZE bytes.
+    """
+    buffer = bytearray(b"[" if fmt == "json" else b"")
+    first = True
+    for item in items:
+        if fmt == "json":
+            if not first:
+                buffer += b","
+            buffer += dumps(item)
+        else:
+            buffer += dumps(item)
+            buffer += b"\n"
+        first = False
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if fmt == "json":
+        buffer += b"]"
+    if buffer:
+        yield bytes(buffer)
+
+
+def export_response(producer: Callable[[Session], Iterator[dict]], fmt: str, filename: str) -> StreamingResponse:
+    """
+    StreamingResponse con los elementos de `producer(db)` como arreglo JSON
+    o NDJSON (una línea por elemento).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato no soportado (json o ndjson)")
+    media_type, extension = EXPORT_FORMATS[fmt]
+
+    def body():
+        db = SessionLocal()
+        try:
+            yield from _chunks(producer(db), fmt)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
@@ -1,5 +1,9 @@
-from db.base import engine, Base
-import db.models
+import logging
 
-Base.metadata.create_all(bind=engine)
-print("✅ Tablas creadas correctamente en Supabase")
+import db.models  # registra las tablas en Base.metadata
+from db.migrations import upgrade
+
+# Crea las tablas y aplica las migraciones pendientes (ver db/migrations)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+applied = upgrade()
+print(f"✅ Esquema al día ({len(applied)} migraciones aplicadas)")
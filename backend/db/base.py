@@ -1,27 +1,151 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import declarative_base, sessionmaker
+import threading
+
+from sqlalchemy import Delete, Insert, Update, create_engine, inspect, text
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from core.config import settings
+from core import sql_stats
+from db import replica
+from db import sqlite as sqlite_profile
+
+
+class RoutingSession(Session):
+    """
+    Sesión que lee de la réplica (si hay una configurada, sana y la petición
+    es de solo lectura, ver db/replica.py). Una vez que la sesión escribe,
+    todo lo que sigue va a la base principal.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["wrote"] = True
+        elif not self.info.get("wrote") and replica.routable():
+            engine = get_replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+# El engine se crea de forma perezosa: importar este módulo (rutas, scripts,
+# modelos) no abre conexiones. SessionLocal se enlaza al crear el engine.
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
+
+Base = declarative_base()
+
+_engine = None
+_replica_engine = None
+_engine_lock = threading.Lock()
+
+
+def _engine_kwargs(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return sqlite_profile.engine_kwargs(url)
+    return {
+        "connect_args": {
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "keepalives_interval": 10,
+            "keepalives_count": 5
+        },
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW
+    }
+
+
+def build_engine(url: str):
+    """
+    Crea un engine con el perfil que corresponde al backend de la URL.
+    """
+    engine = create_engine(url, **_engine_kwargs(url))
+    if engine.url.get_backend_name() == "sqlite":
+        sqlite_profile.configure_engine(engine)
+    sql_stats.install(engine)
+    return engine
+
+
+def get_engine():
+    """
+    Devuelve el engine principal, creándolo en la primera llamada.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_engine(settings.DATABASE_URL)
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_replica_engine():
+    """
+    Engine de la réplica de lectura, o None si DATABASE_REPLICA_URL está vacío.
+    """
+    global _replica_engine
+    if _replica_engine is None and settings.DATABASE_REPLICA_URL:
+        with _engine_lock:
+            if _replica_engine is None:
+                _replica_engine = build_engine(settings.DATABASE_REPLICA_URL)
+    return _replica_engine
+
+
+def init_db() -> set[str]:
+    """
+    Verificaciones de arranque: extensiones de PostgreSQL y tablas existentes.
+    Devuelve el conjunto de tablas declaradas que faltan en la base de datos.
+    """
+    engine = get_engine()
+    if engine.url.get_backend_name() == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+            conn.commit()
+    existing = set(inspect(engine).get_table_names())
+    return set(Base.metadata.tables) - existing
+
+
+def prefill_pool(size: int):
+    """
+    Abre `size` conexiones y las devuelve al pool para que las primeras
+    peticiones no paguen el costo de conexión.
+    """
+    engine = get_engine()
+    conns = []
+    try:
+        for _ in range(size):
+            conns.append(engine.connect())
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def session_loader(fn, *args):
+    """
+    Cargador sin argumentos que ejecuta fn(session, *args) en una sesión
+    propia y la cierra al terminar. Para cachés que se refrescan en segundo
+    plano, cuando la sesión de la petición que las llenó ya está cerrada.
+    """
+    def load():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    return load
+
+
+def dispose_engine():
+    global _engine, _replica_engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        if _replica_engine is not None:
+            _replica_engine.dispose()
+            _replica_engine = None
+
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith(
-    "sqlite") else {
-    "keepalives": 1,
-    "keepalives_idle": 30,
-    "keepalives_interval": 10,
-    "keepalives_count": 5
-}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-if engine.url.get_backend_name() == "postgresql":
-    with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
-        conn.commit()
-
-Base = declarative_base()
\ No newline at end of file
+def __getattr__(name):
+    # Compatibilidad con `from db.base import engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
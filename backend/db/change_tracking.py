@@ -0,0 +1,165 @@
+"""
+Alimenta change_log desde la sesión ORM.
+
+En before_flush se anotan las entidades sincronizables nuevas, modificadas
+o eliminadas (y las órdenes cuyas líneas de servicio/empleado cambiaron);
+en after_flush, con los ids ya asignados, se acumulan en la sesión. Justo
+antes del commit se inserta una fila por entidad en change_log y su id
+queda como row_version de la fila junto con updated_at, de modo que
+row_version crece de forma monótona con cada cambio.
+
+Los ids de change_log son el token del feed de sincronización, así que
+deben hacerse visibles en orden: un cliente que ya vio el id N no puede
+recibir después un id menor. Por eso las escrituras en change_log se
+serializan hasta el commit (en PostgreSQL con un advisory lock de
+transacción; SQLite ya serializa a los escritores) y ocurren al final de
+la transacción, para que el lock se retenga solo durante el commit.
+
+Las escrituras que no pasan por el ORM (UPDATE Core, carga masiva de
+seed_data.py) deben llamar a `record_changes` por su cuenta, justo antes
+del commit.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from db.models.change_log import ChangeLog
+from db.models.empleado import Empleado
+from db.models.orden import Orden
+from db.models.orden_empleado import OrdenEmpleado
+from db.models.orden_servicio import OrdenServicio
+from db.models.producto import Producto
+from db.models.servicio import Servicio
+
+# Entidad sincronizable -> nombre en el feed (Autoparte cuenta como Producto)
+TRACKED = {
+    Producto: "productos",
+    Servicio: "servicios",
+    Empleado: "empleados",
+    Orden: "ordenes",
+}
+TABLES = {name: model.__table__ for model, name in TRACKED.items()}
+# Líneas cuyo cambio modifica la orden a la que pertenecen
+ORDEN_LINES = (OrdenServicio, OrdenEmpleado)
+
+_PENDING_KEY = "change_tracking_pending"
+_CHANGES_KEY = "change_tracking_changes"
+
+# Clave del advisory lock que ordena las escrituras de change_log
+_LOCK_KEY = 0x63686C67
+
+
+def _entity_name(obj) -> str | None:
+    for model, name in TRACKED.items():
+        if isinstance(obj, model):
+            return name
+    return None
+
+
+def _before_flush(session: Session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+
+    for obj in session.new:
+        name = _entity_name(obj)
+        if name:
+            pending.append(("upsert", name, obj))
+        elif isinstance(obj, ORDEN_LINES):
+            # La orden puede ser nueva en el mismo flush (todavía sin id)
+            pending.append(("upsert", "ordenes", obj.orden_id if obj.orden_id is not None else obj.orden))
+
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        name = _entity_name(obj)
+        if name:
+            pending.append(("upsert", name, obj))
+        elif isinstance(obj, ORDEN_LINES):
+            pending.append(("upsert", "ordenes", obj.orden_id))
+
+    for obj in session.deleted:
+        name = _entity_name(obj)
+        if name:
+            pending.append(("delete", name, obj.id))
+        elif isinstance(obj, ORDEN_LINES):
+            pending.append(("upsert", "ordenes", obj.orden_id))
+
+
+def _after_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_CHANGES_KEY, None)
+
+
+def _after_flush(session: Session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    # Una fila por entidad; la baja prevalece sobre una modificación previa
+    changes: dict[tuple[str, int], str] = session.info.setdefault(_CHANGES_KEY, {})
+    for operacion, name, target in pending:
+        entity_id = target if isinstance(target, int) or target is None else target.id
+        if entity_id is None:
+            continue
+        key = (name, entity_id)
+        if changes.get(key) != "delete":
+            changes[key] = operacion
+
+
+def _before_commit(session: Session):
+    # before_commit corre antes del último flush: se hace aquí para que sus
+    # cambios entren en este mismo registro
+    session.flush()
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes:
+        record_changes(session.connection(), changes)
+
+
+def _serialize(connection, changes: dict[tuple[str, int], str]):
+    """
+    Toma el lock de change_log hasta el fin de la transacción (PostgreSQL).
+    Antes bloquea las filas cuyo row_version se va a actualizar: quien tiene
+    el lock solo espera por filas que ya son suyas, así que no puede haber
+    un interbloqueo con otra transacción que espera el lock.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for name, table in TABLES.items():
+        ids = sorted(entity_id for (entity, entity_id), op in changes.items() if entity == name and op == "upsert")
+        if ids:
+            connection.execute(select(table.c.id).where(table.c.id.in_(ids)).order_by(table.c.id).with_for_update())
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+
+def record_changes(connection, changes: dict[tuple[str, int], str]):
+    """
+    Inserta en change_log los cambios {(entidad, id): operación} y actualiza
+    row_version/updated_at de las filas que siguen existiendo. Serializa las
+    escrituras de change_log hasta el commit: llamarla al final de la
+    transacción.
+    """
+    if not changes:
+        return
+    _serialize(connection, changes)
+    now = datetime.now()
+    for (name, entity_id), operacion in changes.items():
+        version = connection.execute(
+            insert(ChangeLog).values(
+                entidad=name, entidad_id=entity_id, operacion=operacion, changed_at=now
+            )
+        ).inserted_primary_key[0]
+        if operacion == "upsert":
+            table = TABLES[name]
+            connection.execute(
+                update(table).where(table.c.id == entity_id).values(row_version=version, updated_at=now)
+            )
+
+
+def install(session_factory=Session):
+    event.listen(session_factory, "before_flush", _before_flush)
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_rollback", _after_rollback)
+
+
+install()
@@ -0,0 +1,158 @@
+"""
+Migraciones de esquema versionadas (runner propio, sin Alembic).
+
+Cada migración es un módulo `versions/vNNNN_descripcion.py` con una función
+`upgrade(op)` que recibe un `Operations` (ver ops.py). Las aplicadas se
+registran en la tabla `schema_migrations`. Las operaciones son
+idempotentes, por lo que correr una migración sobre una base que ya tiene
+parte del cambio (p. ej. creada con create_all) es seguro.
+
+Uso, desde backend/:
+
+    python -m db.migrations upgrade   # aplica las pendientes
+    python -m db.migrations status    # aplicadas y pendientes
+    python -m db.migrations check     # pendientes, índices faltantes y FKs sin índice
+"""
+import importlib
+import logging
+import pkgutil
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import (Column, Date, DateTime, Integer, MetaData, String, Table,
+                        inspect, insert, select, text)
+from sqlalchemy.exc import IntegrityError
+
+from db.base import Base, get_engine
+from db.migrations import versions
+from db.migrations.ops import Operations
+
+logger = logging.getLogger(__name__)
+
+# Fuera de Base.metadata: no es un modelo de la aplicación
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("nombre", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Columnas de fecha que no se filtran por sí solas (no requieren índice)
+UNINDEXED_DATES = {"productos.updated_at", "servicios.updated_at", "empleados.updated_at",
+                   "ordenes.updated_at", "change_log.changed_at", "movimientos_inventario.fecha"}
+
+# Clave del advisory lock de PostgreSQL: un solo proceso migra a la vez
+_PG_LOCK_KEY = 4_417_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    nombre: str
+    module: ModuleType
+
+    @property
+    def descripcion(self) -> str:
+        return (self.module.__doc__ or self.nombre).strip().splitlines()[0]
+
+
+def discover() -> list[Migration]:
+    migrations = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        if not info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        migrations.append(Migration(int(info.name[1:5]), info.name, module))
+    migrations.sort(key=lambda m: m.version)
+    return migrations
+
+
+def applied_versions(engine=None) -> set[int]:
+    engine = engine or get_engine()
+    if not inspect(engine).has_table(schema_migrations.name):
+        return set()
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending(engine=None) -> list[Migration]:
+    done = applied_versions(engine)
+    return [m for m in discover() if m.version not in done]
+
+
+def upgrade(engine=None) -> list[Migration]:
+    """
+    Aplica las migraciones pendientes en orden. Devuelve las aplicadas.
+    """
+    engine = engine or get_engine()
+    schema_migrations.create(engine, checkfirst=True)
+    lock = None
+    if engine.dialect.name == "postgresql":
+        lock = engine.connect()
+        lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _PG_LOCK_KEY})
+    try:
+        applied = []
+        op = Operations(engine)
+        for migration in pending(engine):
+            logger.info("Aplicando migración %04d: %s", migration.version, migration.descripcion)
+            migration.module.upgrade(op)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(schema_migrations).values(
+                        version=migration.version, nombre=migration.nombre, applied_at=datetime.now()
+                    ))
+            except IntegrityError:
+                # Otro proceso la registró mientras tanto (solo sin advisory lock)
+                pass
+            applied.append(migration)
+        return applied
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _PG_LOCK_KEY})
+            lock.close()
+
+
+def _indexed_prefixes(inspector, table: str) -> list[list[str]]:
+    # Columnas de cada índice existente (incluye PK y UNIQUE)
+    prefixes = [i["column_names"] for i in inspector.get_indexes(table)]
+    prefixes += [u["column_names"] for u in inspector.get_unique_constraints(table)]
+    pk = inspector.get_pk_constraint(table).get("constrained_columns")
+    if pk:
+        prefixes.append(pk)
+    return prefixes
+
+
+def check(engine=None) -> list[str]:
+    """
+    Problemas de esquema: migraciones pendientes, índices declarados en los
+    modelos que faltan en la base, FKs sin índice que las encabece y columnas
+    de fecha sin índice.
+    """
+    engine = engine or get_engine()
+    problems = [f"Migración pendiente: {m.nombre}" for m in pending(engine)]
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            problems.append(f"Tabla faltante: {table.name}")
+            continue
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                problems.append(f"Índice faltante: {index.name} en {table.name}")
+
+        prefixes = _indexed_prefixes(inspector, table.name)
+        model_indexes = [[c.name for c in i.columns] for i in table.indexes]
+        for column in table.columns:
+            if column.primary_key:
+                continue
+            if column.foreign_keys and not any(p and p[0] == column.name for p in prefixes):
+                problems.append(f"FK sin índice: {table.name}.{column.name}")
+            if (isinstance(column.type, (Date, DateTime))
+                    and f"{table.name}.{column.name}" not in UNINDEXED_DATES
+                    and not any(column.name in cols for cols in model_indexes)):
+                problems.append(f"Columna de fecha sin índice: {table.name}.{column.name}")
+    return problems
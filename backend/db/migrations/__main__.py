@@ -0,0 +1,33 @@
+import argparse
+import logging
+import sys
+
+import db.models  # registra las tablas en Base.metadata
+from db.migrations import applied_versions, check, discover, upgrade
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m db.migrations", description="Migraciones de esquema")
+    parser.add_argument("command", choices=("upgrade", "status", "check"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        print(f"{len(applied)} migraciones aplicadas" if applied else "El esquema está al día")
+    elif args.command == "status":
+        done = applied_versions()
+        for migration in discover():
+            estado = "aplicada " if migration.version in done else "pendiente"
+            print(f"{estado}  {migration.nombre}  {migration.descripcion}")
+    else:
+        problems = check()
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print("Sin problemas de esquema")
+
+
+if __name__ == "__main__":
+    main()
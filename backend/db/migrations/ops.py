@@ -0,0 +1,92 @@
+"""
+Operaciones de esquema idempotentes para las migraciones.
+
+Cada operación verifica el estado actual antes de actuar (tabla, columna o
+índice ya existentes se saltean), así que una migración interrumpida se
+puede volver a ejecutar sin más. En PostgreSQL los índices se crean con
+CREATE INDEX CONCURRENTLY fuera de una transacción: la tabla sigue
+aceptando escrituras mientras se construye el índice.
+"""
+import logging
+
+from sqlalchemy import Column, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
+
+
+class Operations:
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self._quote = engine.dialect.identifier_preparer.quote
+
+    def _inspector(self):
+        # Un inspector nuevo por consulta: su caché no ve el DDL recién ejecutado
+        return inspect(self.engine)
+
+    def has_table(self, table: str) -> bool:
+        return self._inspector().has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in {c["name"] for c in self._inspector().get_columns(table)}
+
+    def has_index(self, table: str, name: str) -> bool:
+        return name in {i["name"] for i in self._inspector().get_indexes(table)}
+
+    def execute(self, sql: str, **params):
+        with self.engine.begin() as conn:
+            return conn.execute(text(sql), params)
+
+    def create_table(self, table: Table):
+        """
+        Crea la tabla (con sus índices declarados) si no existe.
+        """
+        if self.has_table(table.name):
+            return
+        logger.info("Creando tabla %s", table.name)
+        with self.engine.begin() as conn:
+            table.create(conn, checkfirst=True)
+
+    def add_column(self, table: str, column: Column):
+        """
+        Agrega la columna si falta. Una columna NOT NULL necesita server_default
+        para las filas existentes.
+        """
+        if not self.has_table(table) or self.has_column(table, column.name):
+            return
+        logger.info("Agregando columna %s.%s", table, column.name)
+        spec = CreateColumn(column).compile(dialect=self.engine.dialect)
+        self.execute(f"ALTER TABLE {self._quote(table)} ADD COLUMN {spec}")
+
+    def create_index(self, name: str, table: str, columns: list[str], unique: bool = False):
+        """
+        Crea el índice si no existe (CONCURRENTLY en PostgreSQL).
+        """
+        if not self.has_table(table):
+            return
+        cols = ", ".join(self._quote(c) for c in columns)
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        if self.dialect == "postgresql":
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                valid = conn.execute(
+                    text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                         "WHERE c.relname = :name"),
+                    {"name": name},
+                ).scalar()
+                if valid:
+                    return
+                if valid is False:
+                    # Un CONCURRENTLY interrumpido deja el índice inválido: se reconstruye
+                    logger.warning("Índice %s inválido, reconstruyendo", name)
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self._quote(name)}"))
+                logger.info("Creando índice %s (CONCURRENTLY)", name)
+                conn.execute(text(
+                    f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {self._quote(name)} ON {self._quote(table)} ({cols})"
+                ))
+            return
+        if self.has_index(table, name):
+            return
+        logger.info("Creando índice %s", name)
+        self.execute(f"CREATE {kind} IF NOT EXISTS {self._quote(name)} ON {self._quote(table)} ({cols})")
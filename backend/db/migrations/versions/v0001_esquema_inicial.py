@@ -0,0 +1,10 @@
+"""Tablas base del taller (productos, ventas, órdenes, servicios y empleados)"""
+from db.base import Base
+
+TABLES = ("productos", "autopartes", "ventas", "venta_producto", "servicios", "empleados",
+          "ordenes", "orden_servicio", "orden_empleado")
+
+
+def upgrade(op):
+    for name in TABLES:
+        op.create_table(Base.metadata.tables[name])
@@ -0,0 +1,13 @@
+"""Columnas row_version/updated_at y tabla change_log para /sync/changes"""
+from sqlalchemy import Column, DateTime, Integer
+
+from db.base import Base
+
+TABLES = ("productos", "servicios", "empleados", "ordenes")
+
+
+def upgrade(op):
+    for table in TABLES:
+        op.add_column(table, Column("row_version", Integer, nullable=False, server_default="0"))
+        op.add_column(table, Column("updated_at", DateTime, nullable=True))
+    op.create_table(Base.metadata.tables["change_log"])
@@ -0,0 +1,10 @@
+"""Libro de movimientos de inventario, fotos de stock y secuencias de códigos de barras"""
+from db.base import Base
+
+
+def upgrade(op):
+    for name in ("movimientos_inventario", "snapshots_inventario", "barcode_sequences"):
+        op.create_table(Base.metadata.tables[name])
+    # Por si la tabla existía sin el índice (creada antes de declararlo)
+    op.create_index("ix_movimientos_inventario_producto_id", "movimientos_inventario", ["producto_id", "id"])
+    op.create_index("ix_snapshots_inventario_producto_fecha", "snapshots_inventario", ["producto_id", "fecha"])
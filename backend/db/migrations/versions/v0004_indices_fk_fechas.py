@@ -0,0 +1,18 @@
+"""Índices en claves foráneas y columnas de filtro (fechas, categoría)"""
+
+INDEXES = (
+    ("ix_venta_producto_venta_id", "venta_producto", ["venta_id"]),
+    ("ix_venta_producto_producto_id", "venta_producto", ["producto_id"]),
+    ("ix_orden_servicio_orden_id", "orden_servicio", ["orden_id"]),
+    ("ix_orden_servicio_servicio_id", "orden_servicio", ["servicio_id"]),
+    ("ix_orden_empleado_orden_id", "orden_empleado", ["orden_id"]),
+    ("ix_orden_empleado_empleado_id", "orden_empleado", ["empleado_id"]),
+    ("ix_ventas_fecha", "ventas", ["fecha"]),
+    ("ix_ordenes_fecha", "ordenes", ["fecha"]),
+    ("ix_productos_categoria", "productos", ["categoria"]),
+)
+
+
+def upgrade(op):
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
@@ -0,0 +1,26 @@
+"""ordenes.precio derivado de sus líneas de servicio, con índice"""
+from sqlalchemy import text
+
+from db.change_tracking import record_changes
+
+# Órdenes con líneas cuyo precio no coincide con la suma de precio_servicio
+_INCONSISTENTES = """
+    SELECT o.id, t.total
+    FROM ordenes o
+    JOIN (SELECT orden_id, SUM(precio_servicio) AS total FROM orden_servicio GROUP BY orden_id) t
+      ON t.orden_id = o.id
+    WHERE o.precio <> t.total
+"""
+
+
+def upgrade(op):
+    with op.engine.begin() as conn:
+        filas = conn.execute(text(_INCONSISTENTES)).all()
+        if filas:
+            conn.execute(
+                text("UPDATE ordenes SET precio = :total WHERE id = :id"),
+                [{"id": id, "total": total} for id, total in filas],
+            )
+            # Los clientes de /sync/changes reciben el precio corregido
+            record_changes(conn, {("ordenes", id): "upsert" for id, _ in filas})
+    op.create_index("ix_ordenes_precio", "ordenes", ["precio"])
@@ -0,0 +1,23 @@
+"""Precio y costo unitario capturados en cada línea de venta"""
+from sqlalchemy import Column, Integer, select, update
+
+from db.models import Producto, VentaProducto
+
+
+def upgrade(op):
+    nuevas = not op.has_column("venta_producto", "precio_unitario")
+    op.add_column("venta_producto", Column("precio_unitario", Integer, nullable=False, server_default="0"))
+    op.add_column("venta_producto", Column("costo_unitario", Integer, nullable=False, server_default="0"))
+    if not nuevas:
+        return
+    # Las ventas anteriores no guardaron el precio: se completan con el
+    # precio actual del catálogo, la mejor aproximación disponible
+    lineas = VentaProducto.__table__
+    productos = Producto.__table__
+    with op.engine.begin() as conn:
+        conn.execute(
+            update(lineas).values(
+                precio_unitario=select(productos.c.precioVenta).where(productos.c.id == lineas.c.producto_id).scalar_subquery(),
+                costo_unitario=select(productos.c.precioCompra).where(productos.c.id == lineas.c.producto_id).scalar_subquery(),
+            ).where(select(productos.c.id).where(productos.c.id == lineas.c.producto_id).exists())
+        )
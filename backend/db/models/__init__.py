@@ -7,3 +7,9 @@ from db.models.servicio import Servicio
 from db.models.orden_servicio import OrdenServicio
 from db.models.empleado import Empleado
 from db.models.orden_empleado import OrdenEmpleado
+
+from db.models.change_log import ChangeLog
+from db.models.movimiento_inventario import MovimientoInventario
+from db.models.snapshot_inventario import SnapshotInventario
+from db.models.barcode_sequence import BarcodeSequence
+import db.change_tracking  # registra los eventos que alimentan change_log
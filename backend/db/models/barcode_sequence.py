@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+from db.base import Base
+
+
+
+class BarcodeSequence(Base):
+    """
+    Última secuencia asignada por código de categoría (T-<secuencia>-FIL).
+    Se incrementa con un UPDATE atómico al reservar códigos en lote.
+    """
+    __tablename__ = "barcode_sequences"
+
+    categoria = Column(String(10), primary_key=True)  # código de 3 letras, p. ej. "FIL"
+    ultimo = Column(Integer, nullable=False, default=0)
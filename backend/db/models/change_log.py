@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from db.base import Base
+
+
+
+class ChangeLog(Base):
+    """
+    Registro de cambios para la sincronización incremental: cada alta,
+    modificación o baja de una entidad sincronizable agrega una fila. El id
+    (autoincremental) es el token monótono que usan los clientes; las bajas
+    quedan como tombstones.
+    """
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    entidad = Column(String(30), nullable=False)
+    entidad_id = Column(Integer, nullable=False)
+    operacion = Column(String(10), nullable=False)  # "upsert" o "delete"
+    changed_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime
 from db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -11,4 +11,8 @@ class Empleado(Base):
     estado = Column(String, nullable=False, default="activo")
     especialidad = Column(String, nullable=False)
 
+    # Sincronización incremental (ver db/change_tracking.py)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
+
     ordenes = relationship("OrdenEmpleado", back_populates="empleado")
\ No newline at end of file
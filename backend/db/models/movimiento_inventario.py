@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from db.base import Base
+
+
+
+class MovimientoInventario(Base):
+    """
+    Libro de movimientos de stock (solo inserción). Cada cambio de
+    Producto.stock agrega una fila con la variación firmada, de modo que el
+    stock de un producto es la suma de sus movimientos. producto_id no es
+    FK: el historial se conserva aunque el producto se elimine.
+    """
+    __tablename__ = "movimientos_inventario"
+
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer, nullable=False)
+    tipo = Column(String(20), nullable=False)  # apertura, alta, venta, ajuste, actualizacion
+    cantidad = Column(Integer, nullable=False)
+    venta_id = Column(Integer, nullable=True)
+    motivo = Column(String, nullable=True)
+    fecha = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Movimientos de un producto posteriores a una foto (id > movimiento_id)
+        Index("ix_movimientos_inventario_producto_id", "producto_id", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, DateTime
 from db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -8,8 +8,13 @@ class Orden(Base):
     id = Column(Integer, primary_key=True)
     garantia = Column(Integer, nullable=False)
     estadoPago = Column(String, nullable=False)
-    precio = Column(Integer, nullable=False)
-    fecha = Column(Date, nullable=False)
+    # Total de la orden: suma de precio_servicio de sus líneas (ver OrdenRepository)
+    precio = Column(Integer, nullable=False, index=True)
+    fecha = Column(Date, nullable=False, index=True)
+
+    # Sincronización incremental (ver db/change_tracking.py)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
 
     servicios = relationship("OrdenServicio", back_populates="orden")
     empleados = relationship("OrdenEmpleado", back_populates="orden")
\ No newline at end of file
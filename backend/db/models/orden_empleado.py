@@ -6,8 +6,8 @@ class OrdenEmpleado(Base):
     __tablename__ = "orden_empleado"
 
     id = Column(Integer, primary_key=True)
-    orden_id = Column(Integer, ForeignKey("ordenes.id"), nullable=False)
-    empleado_id = Column(Integer, ForeignKey("empleados.id"), nullable=False)
+    orden_id = Column(Integer, ForeignKey("ordenes.id"), nullable=False, index=True)
+    empleado_id = Column(Integer, ForeignKey("empleados.id"), nullable=False, index=True)
 
     empleado = relationship("Empleado", back_populates="ordenes")
     orden = relationship("Orden", back_populates="empleados")
\ No newline at end of file
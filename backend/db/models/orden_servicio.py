@@ -6,8 +6,8 @@ class OrdenServicio(Base):
     __tablename__ = "orden_servicio"
 
     id = Column(Integer, primary_key=True)
-    orden_id = Column(Integer, ForeignKey("ordenes.id"), nullable=False)
-    servicio_id = Column(Integer, ForeignKey("servicios.id"), nullable=False)
+    orden_id = Column(Integer, ForeignKey("ordenes.id"), nullable=False, index=True)
+    servicio_id = Column(Integer, ForeignKey("servicios.id"), nullable=False, index=True)
     precio_servicio = Column(Integer, nullable=False)
 
     servicio = relationship("Servicio", back_populates="ordenes")
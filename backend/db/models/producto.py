@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime
 from db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -11,13 +11,17 @@ class Producto(Base):
     precioVenta = Column(Integer, nullable=False)
     precioCompra = Column(Integer, nullable=False)
     marca = Column(String, nullable=False)
-    categoria = Column(String, nullable=False)
+    categoria = Column(String, nullable=False, index=True)
     stock = Column(Integer, nullable=False, default=0)
     stockMin = Column(Integer, nullable=False, default=0)
     codBarras = Column(String, nullable=True, unique=True)
     img = Column(String, nullable=True)
     tipo = Column(String, nullable=False)
 
+    # Sincronización incremental (ver db/change_tracking.py)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
+
     ventas = relationship("VentaProducto", back_populates="producto")
     
     __mapper_args__ = {
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime
 from db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -9,4 +9,8 @@ class Servicio(Base):
     nombre = Column(String, nullable=False, unique=True)
     descripcion = Column(String, nullable=False, default="")
 
+    # Sincronización incremental (ver db/change_tracking.py)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
+
     ordenes = relationship("OrdenServicio", back_populates="servicio")
\ No newline at end of file
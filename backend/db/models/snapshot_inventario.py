@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from db.base import Base
+
+
+
+class SnapshotInventario(Base):
+    """
+    Foto periódica del stock de un producto: `stock` es la suma de sus
+    movimientos hasta `movimiento_id` inclusive. El stock a una fecha se
+    obtiene desde la última foto anterior más los movimientos posteriores.
+    """
+    __tablename__ = "snapshots_inventario"
+
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(Integer, nullable=False)
+    movimiento_id = Column(Integer, nullable=False)
+    stock = Column(Integer, nullable=False)
+    fecha = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_snapshots_inventario_producto_fecha", "producto_id", "fecha"),
+    )
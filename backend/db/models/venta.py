@@ -8,6 +8,10 @@ class Venta(Base):
     __tablename__ = "ventas"
 
     id = Column(Integer, primary_key=True)
-    fecha = Column(DateTime, nullable=False)
+    fecha = Column(DateTime, nullable=False, index=True)
 
-    productos = relationship("VentaProducto", back_populates="venta")
\ No newline at end of file
+    productos = relationship("VentaProducto", back_populates="venta")
+
+    @property
+    def total(self) -> int:
+        return sum(linea.subtotal for linea in self.productos)
@@ -8,9 +8,17 @@ class VentaProducto(Base):
     __tablename__ = "venta_producto"
 
     id = Column(Integer, primary_key=True)
-    venta_id = Column(Integer, ForeignKey("ventas.id"), nullable=False)
-    producto_id = Column(Integer, ForeignKey("productos.id"), nullable=False)
+    venta_id = Column(Integer, ForeignKey("ventas.id"), nullable=False, index=True)
+    producto_id = Column(Integer, ForeignKey("productos.id"), nullable=False, index=True)
     cantidad = Column(Integer, nullable=False)
+    # Precio de venta y de compra del producto al momento de la venta: los
+    # reportes no dependen del catálogo ni de sus cambios de precio
+    precio_unitario = Column(Integer, nullable=False, default=0, server_default="0")
+    costo_unitario = Column(Integer, nullable=False, default=0, server_default="0")
 
     producto = relationship("Producto", back_populates="ventas")
-    venta = relationship("Venta", back_populates="productos")
\ No newline at end of file
+    venta = relationship("Venta", back_populates="productos")
+
+    @property
+    def subtotal(self) -> int:
+        return self.cantidad * self.precio_unitario
@@ -0,0 +1,60 @@
+"""
+Réplica de lectura opcional (DATABASE_REPLICA_URL).
+
+`core/read_routing.py` marca las peticiones de solo lectura con
+`prefer_replica`; `RoutingSession` (db/base.py) envía sus SELECT a la
+réplica mientras la sesión no haya escrito nada y la réplica esté sana. El
+estado de salud lo actualiza `run_replica_monitor` (core/startup.py) cada
+REPLICA_LAG_CHECK_SECONDS: si el retraso supera REPLICA_MAX_LAG_SECONDS o la
+réplica no responde, todas las lecturas vuelven a la base principal.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+
+from sqlalchemy import text
+
+# Verdadero durante una petición que se puede atender desde la réplica
+prefer_replica: ContextVar[bool] = ContextVar("prefer_replica", default=False)
+
+# Sin WAL pendiente de aplicar la réplica está al día aunque la última
+# transacción replicada sea antigua (base principal sin escrituras)
+_PG_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaState:
+    def __init__(self):
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        self.error: str | None = None
+        self.checked_at: datetime | None = None
+
+    def as_dict(self):
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+        }
+
+
+state = ReplicaState()
+
+
+def measure_lag(engine) -> float | None:
+    """
+    Segundos de retraso de la réplica, o None si el motor no lo informa
+    (fuera de PostgreSQL solo se comprueba que responda).
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return float(conn.execute(_PG_LAG).scalar())
+        conn.execute(text("SELECT 1"))
+        return None
+
+
+def routable() -> bool:
+    return prefer_replica.get() and state.healthy
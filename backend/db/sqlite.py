@@ -0,0 +1,77 @@
+"""
+Perfil de producción para SQLite: pragmas por conexión, pool adecuado y
+escrituras serializadas dentro del proceso.
+"""
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from core.config import settings
+
+# SQLite admite un solo escritor a la vez. Serializar las escrituras del
+# proceso evita que varios hilos compitan (y reintenten) por el lock del
+# archivo; los lectores no se bloquean gracias a WAL.
+_write_lock = threading.Lock()
+
+_WRITE_PREFIXES = ("insert", "update", "delete", "replace")
+
+
+def is_memory_url(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def engine_kwargs(url: str) -> dict:
+    """
+    Argumentos de create_engine para SQLite.
+    """
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if is_memory_url(url):
+        # Una base en memoria solo existe dentro de su conexión
+        kwargs["poolclass"] = StaticPool
+    else:
+        kwargs["poolclass"] = QueuePool
+        kwargs["pool_size"] = settings.SQLITE_POOL_SIZE
+        kwargs["max_overflow"] = settings.SQLITE_MAX_OVERFLOW
+    return kwargs
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # Valor negativo: tamaño en KiB en lugar de páginas
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+def _acquire_write_lock(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("sqlite_write_lock"):
+        return
+    if statement.lstrip()[:7].lower().startswith(_WRITE_PREFIXES):
+        # Si no se obtiene a tiempo, busy_timeout de SQLite hace de respaldo
+        if _write_lock.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000):
+            conn.info["sqlite_write_lock"] = True
+
+
+def _release_write_lock(info: dict):
+    if info.pop("sqlite_write_lock", False):
+        _write_lock.release()
+
+
+def configure_engine(engine):
+    """
+    Registra los eventos del perfil SQLite sobre un engine ya creado.
+    """
+    event.listen(engine, "connect", _set_pragmas)
+    event.listen(engine, "before_cursor_execute", _acquire_write_lock)
+    event.listen(engine, "commit", lambda conn: _release_write_lock(conn.info))
+    event.listen(engine, "rollback", lambda conn: _release_write_lock(conn.info))
+    # Respaldo: una conexión que vuelve al pool nunca conserva el lock
+    event.listen(engine.pool, "checkin", lambda dbapi_conn, record: _release_write_lock(record.info))
+    return engine
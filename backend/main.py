@@ -1,9 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import Response, HTMLResponse
+from fastapi.responses import Response, HTMLResponse, JSONResponse
 from fastapi.openapi.docs import get_swagger_ui_html
-from api.v1.routes import producto_routes, venta_routes, autoparte_routes, orden_routes, servicio_routes, empleado_routes, status_routes, auth_routes
+from api.v1.routes import producto_routes, venta_routes, autoparte_routes, orden_routes, servicio_routes, empleado_routes, status_routes, auth_routes, sync_routes, event_routes, imagen_routes, dashboard_routes
+from core.startup import lifespan
+from core import metrics
+from core.read_routing import ReadRoutingMiddleware
+from core.cache import CacheLoadTimeout
+from core.serialization import default_response_class
 import time
 
 app = FastAPI(
@@ -12,7 +17,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url=None,
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=default_response_class(),
+    lifespan=lifespan
 )
 
 # Middleware de compresión gzip (reduce tamaño de respuestas)
@@ -40,10 +47,22 @@ async def add_cache_headers(request: Request, call_next):
     # Agregar headers de caché para endpoints de API
     if request.url.path.startswith("/api/v1/"):
         # Caché de 5 minutos para datos que no cambian frecuentemente
-        response.headers["Cache-Control"] = "public, max-age=300"
+        # (salvo que el endpoint defina su propia política)
+        response.headers.setdefault("Cache-Control", "public, max-age=300")
     
     return response
 
+# Lecturas a la réplica (solo si DATABASE_REPLICA_URL está configurada)
+app.add_middleware(ReadRoutingMiddleware)
+
+# Un cálculo de caché compartido que no terminó a tiempo: reintentar en breve
+@app.exception_handler(CacheLoadTimeout)
+async def cache_load_timeout(request: Request, exc: CacheLoadTimeout):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# Métricas por ruta (middleware más externo para medir la petición completa)
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(status_routes.router,
                    prefix="/api/v1/status", tags=["Status"])
 app.include_router(auth_routes.router,
@@ -60,6 +79,14 @@ app.include_router(servicio_routes.router,
                    prefix="/api/v1/servicios", tags=["Servicios"])
 app.include_router(empleado_routes.router,
                    prefix="/api/v1/empleados", tags=["Empleados"])
+app.include_router(sync_routes.router,
+                   prefix="/api/v1/sync", tags=["Sincronización"])
+app.include_router(event_routes.router,
+                   prefix="/api/v1/events", tags=["Eventos"])
+app.include_router(imagen_routes.router,
+                   prefix="/api/v1/imagenes", tags=["Imágenes"])
+app.include_router(dashboard_routes.router,
+                   prefix="/api/v1/dashboard", tags=["Dashboard"])
 
 # Documentación personalizada con colores oscuros
 @app.get("/docs", include_in_schema=False)
@@ -76,6 +103,10 @@ async def custom_swagger_ui_html():
         swagger_js_url="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js",
     )
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from db.models.autoparte import Autoparte
 from schemas.autoparte_schema import AutoparteCreate
+from repositories.inventario_repo import InventarioRepository
 
 
 
@@ -12,6 +13,8 @@ class AutoparteRepository:
     def create(self, autoparte_data: AutoparteCreate):
         autoparte = Autoparte(**autoparte_data.model_dump())
         self.db.add(autoparte)
+        self.db.flush()
+        InventarioRepository(self.db).record([{"producto_id": autoparte.id, "tipo": "alta", "cantidad": autoparte.stock}])
         self.db.commit()
         self.db.refresh(autoparte)
         return autoparte
@@ -26,12 +29,19 @@ class AutoparteRepository:
         return self.db.query(Autoparte).filter(Autoparte.nombre.ilike(nombre)).first()
 
     def update(self, id: int, autoparte_data: AutoparteCreate):
-        autoparte = self.get_by_id(id)
+        # Bloqueada hasta el commit, como ProductoRepository.update
+        autoparte = (self.db.query(Autoparte).filter(Autoparte.id == id)
+                     .with_for_update().populate_existing().first())
         if not autoparte:
             return None
         data = autoparte_data.model_dump(exclude_unset=True)
+        stock_anterior = autoparte.stock
         for key, value in data.items():
             setattr(autoparte, key, value)
+        self.db.flush()
+        InventarioRepository(self.db).record([
+            {"producto_id": id, "tipo": "actualizacion", "cantidad": autoparte.stock - stock_anterior}
+        ])
         self.db.commit()
         self.db.refresh(autoparte)
         return autoparte
@@ -0,0 +1,61 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.barcodes import MAX_SEQUENCE, PREFIX, parse_barcode
+from db.models import BarcodeSequence, Producto
+
+_SEQ = BarcodeSequence.__table__
+
+
+class BarcodeRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def allocate(self, codigo: str, count: int) -> range:
+        """
+        Reserva `count` secuencias consecutivas para el código de categoría
+        con un único UPDATE ultimo = ultimo + count: dos reservas
+        concurrentes nunca reciben el mismo rango.
+        """
+        try:
+            ultimo = self._increment(codigo, count)
+            if ultimo is None:
+                self._create_sequence(codigo)
+                ultimo = self._increment(codigo, count)
+            if ultimo > MAX_SEQUENCE:
+                raise ValueError(f"Sin códigos disponibles para la categoría {codigo}")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return range(ultimo - count + 1, ultimo + 1)
+
+    def _increment(self, codigo: str, count: int) -> int | None:
+        stmt = update(_SEQ).where(_SEQ.c.categoria == codigo).values(ultimo=_SEQ.c.ultimo + count)
+        if self.db.get_bind().dialect.update_returning:
+            return self.db.execute(stmt.returning(_SEQ.c.ultimo)).scalar()
+        if self.db.execute(stmt).rowcount != 1:
+            return None
+        return self.db.execute(select(_SEQ.c.ultimo).where(_SEQ.c.categoria == codigo)).scalar()
+
+    def _create_sequence(self, codigo: str):
+        """
+        Primera reserva de la categoría: la secuencia arranca después del
+        mayor código existente con ese sufijo (los generados en el navegador
+        usaban un contador global).
+        """
+        barcodes = self.db.execute(
+            select(Producto.codBarras).where(Producto.codBarras.like(f"{PREFIX}-%-{codigo}"))
+        ).scalars()
+        ultimo = max(
+            (parsed[0] for parsed in map(parse_barcode, barcodes) if parsed and parsed[1] == codigo),
+            default=0,
+        )
+        try:
+            # SAVEPOINT: si otra reserva creó la fila primero, se usa la suya
+            with self.db.begin_nested():
+                self.db.execute(insert(_SEQ).values(categoria=codigo, ultimo=ultimo))
+        except IntegrityError:
+            pass
@@ -0,0 +1,22 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db.models import ChangeLog
+
+
+class ChangeLogRepository:
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_since(self, since: int, limit: int):
+        # Recorre el índice de la PK: id > since
+        return self.db.execute(
+            select(ChangeLog.id, ChangeLog.entidad, ChangeLog.entidad_id, ChangeLog.operacion)
+            .where(ChangeLog.id > since)
+            .order_by(ChangeLog.id)
+            .limit(limit)
+        ).all()
+
+    def latest_id(self) -> int:
+        return self.db.execute(select(func.max(ChangeLog.id))).scalar() or 0
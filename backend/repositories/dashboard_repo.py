@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db.models import Empleado, Orden, Producto, Servicio, Venta, VentaProducto
+
+
+class DashboardRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def totales(self, ahora: datetime) -> dict:
+        """
+        Todos los números del dashboard en una sola sentencia (un
+        subselect escalar por indicador): un único viaje a la base, que
+        resuelve cada agregado con su propio índice.
+        """
+        inicio = datetime.combine(ahora.date(), datetime.min.time())
+        # Toda orden que no está pagada (pendiente, parcial...) queda por cobrar
+        sin_pagar = Orden.estadoPago != "pagado"
+        ventas_hoy = select(Venta.id).where(Venta.fecha >= inicio, Venta.fecha < inicio + timedelta(days=1))
+        indicadores = {
+            "productos": select(func.count()).select_from(Producto),
+            "productos_bajo_stock": select(func.count()).where(Producto.stock <= Producto.stockMin),
+            "servicios": select(func.count()).select_from(Servicio),
+            "empleados": select(func.count()).select_from(Empleado),
+            "empleados_activos": select(func.count()).where(Empleado.estado == "activo"),
+            "ordenes": select(func.count()).select_from(Orden),
+            "ordenes_pendientes": select(func.count()).where(sin_pagar),
+            "por_cobrar": select(func.coalesce(func.sum(Orden.precio), 0)).where(sin_pagar),
+            "ventas_hoy": select(func.count()).where(Venta.id.in_(ventas_hoy)),
+            "ingresos_hoy": select(
+                func.coalesce(func.sum(VentaProducto.cantidad * VentaProducto.precio_unitario), 0)
+            ).where(VentaProducto.venta_id.in_(ventas_hoy)),
+        }
+        row = self.db.execute(
+            select(*(stmt.scalar_subquery().label(name) for name, stmt in indicadores.items()))
+        ).mappings().one()
+        return dict(row)
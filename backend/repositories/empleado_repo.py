@@ -1,8 +1,16 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from db.models import Empleado
 
 from schemas.empleado_schema import EmpleadoCreate
 
+
+def _columns(fields: tuple[str, ...] | None):
+    # Proyección SQL: solo las columnas pedidas con ?fields=
+    table = Empleado.__table__
+    return [table.c[name] for name in fields] if fields else [table]
+
+
 class EmpleadoRepository:
 
     def __init__(self, db: Session):
@@ -18,6 +26,15 @@ class EmpleadoRepository:
     def get_all(self):
         return self.db.query(Empleado).all()
     
+    def get_all_rows(self, fields: tuple[str, ...] | None = None):
+        return self.db.execute(select(*_columns(fields))).mappings().all()
+
+    def get_row_by_id(self, id: int, fields: tuple[str, ...] | None = None):
+        return self.db.execute(select(*_columns(fields)).where(Empleado.id == id)).mappings().first()
+
+    def get_rows_by_ids(self, ids):
+        return self.db.execute(select(Empleado.__table__).where(Empleado.id.in_(ids))).mappings().all()
+    
     def get_by_id(self, id: int):
         return self.db.query(Empleado).filter(Empleado.id == id).first()
 
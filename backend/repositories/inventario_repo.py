@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from sqlalchemy import and_, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from db.models import MovimientoInventario, Producto, SnapshotInventario
+
+_M = MovimientoInventario.__table__
+_S = SnapshotInventario.__table__
+
+
+class InventarioRepository:
+    """
+    Libro de movimientos de stock y sus fotos periódicas.
+
+    Los movimientos se insertan con Core en la transacción de quien cambia
+    el stock, después del UPDATE de la fila del producto: con la fila
+    bloqueada, los ids de movimientos de un mismo producto quedan en el
+    orden en que se aplicaron y una foto nunca deja atrás uno pendiente.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, movimientos: list[dict]):
+        """
+        Agrega movimientos {producto_id, tipo, cantidad[, venta_id, motivo]}
+        a la transacción en curso (sin commit).
+        """
+        movimientos = [m for m in movimientos if m["cantidad"]]
+        if not movimientos:
+            return
+        now = datetime.now()
+        self.db.execute(
+            insert(_M),
+            [{"venta_id": None, "motivo": None, **m, "fecha": now} for m in movimientos],
+        )
+
+    def ensure_opening_balances(self) -> int:
+        """
+        Movimiento de apertura (stock actual) para los productos que todavía
+        no tienen ninguno: productos anteriores al libro de movimientos.
+        """
+        productos = Producto.__table__
+        now = datetime.now()
+        result = self.db.execute(
+            insert(_M).from_select(
+                ["producto_id", "tipo", "cantidad", "fecha"],
+                select(productos.c.id, literal("apertura"), productos.c.stock, literal(now, _M.c.fecha.type))
+                .where(productos.c.stock != 0, ~exists().where(_M.c.producto_id == productos.c.id)),
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def take_snapshots(self) -> int:
+        """
+        Una foto nueva por cada producto con movimientos posteriores a su
+        última foto. Devuelve la cantidad de fotos creadas.
+        """
+        last = (
+            select(_S.c.producto_id, func.max(_S.c.movimiento_id).label("movimiento_id"))
+            .group_by(_S.c.producto_id)
+            .subquery()
+        )
+        base = dict(
+            self.db.execute(
+                select(_S.c.producto_id, _S.c.stock).join(
+                    last,
+                    and_(_S.c.producto_id == last.c.producto_id, _S.c.movimiento_id == last.c.movimiento_id),
+                )
+            ).all()
+        )
+        pending = self.db.execute(
+            select(_M.c.producto_id, func.sum(_M.c.cantidad), func.max(_M.c.id))
+            .outerjoin(last, last.c.producto_id == _M.c.producto_id)
+            .where(_M.c.id > func.coalesce(last.c.movimiento_id, 0))
+            .group_by(_M.c.producto_id)
+        ).all()
+        if not pending:
+            return 0
+        now = datetime.now()
+        self.db.execute(
+            insert(_S),
+            [
+                {"producto_id": pid, "movimiento_id": max_id, "stock": base.get(pid, 0) + delta, "fecha": now}
+                for pid, delta, max_id in pending
+            ],
+        )
+        self.db.commit()
+        return len(pending)
+
+    def producto_exists(self, producto_id: int) -> bool:
+        return self.db.get(Producto, producto_id) is not None
+
+    def stock_at(self, producto_id: int, fecha: datetime) -> int:
+        """
+        Stock tras los movimientos hasta `fecha`: última foto anterior (índice
+        producto_id, fecha) más los movimientos posteriores a ella.
+        """
+        snapshot = self.db.execute(
+            select(_S.c.stock, _S.c.movimiento_id)
+            .where(_S.c.producto_id == producto_id, _S.c.fecha <= fecha)
+            .order_by(_S.c.fecha.desc(), _S.c.id.desc())
+            .limit(1)
+        ).first()
+        stock, movimiento_id = snapshot if snapshot else (0, 0)
+        delta = self.db.execute(
+            select(func.coalesce(func.sum(_M.c.cantidad), 0))
+            .where(_M.c.producto_id == producto_id, _M.c.id > movimiento_id, _M.c.fecha <= fecha)
+        ).scalar()
+        return stock + delta
+
+    def get_movimientos(self, producto_id: int, desde: datetime | None, hasta: datetime, limit: int):
+        stmt = select(_M).where(_M.c.producto_id == producto_id, _M.c.fecha <= hasta)
+        if desde is not None:
+            stmt = stmt.where(_M.c.fecha > desde)
+        return self.db.execute(stmt.order_by(_M.c.id).limit(limit)).mappings().all()
@@ -1,9 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from db.models import Orden
-from sqlalchemy import Date, cast
+from sqlalchemy import func, select
 from db.models import OrdenServicio, Servicio
 from db.models import OrdenEmpleado, Empleado
 
+# OrdenResponse incluye servicios y empleados con su detalle
+_ORDEN_LOAD = (
+    selectinload(Orden.servicios).selectinload(OrdenServicio.servicio),
+    selectinload(Orden.empleados).selectinload(OrdenEmpleado.empleado),
+)
+
 class OrdenRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -15,18 +21,29 @@ class OrdenRepository:
         self.db.refresh(orden)
         return orden
 
-    def create_with_services(self, garantia: int, estadoPago: str, precio: int, fecha, servicios: list[dict], empleados: list[dict] | None = None):
-        orden = Orden(garantia=garantia, estadoPago=estadoPago, precio=precio, fecha=fecha)
+    def create_with_services(self, garantia: int, estadoPago: str, precio: int | None, fecha, servicios: list[dict], empleados: list[dict] | None = None):
+        """
+        Crea la orden con sus líneas de servicio y empleados en una sola
+        transacción. Con servicios, el precio de la orden es la suma de sus
+        precio_servicio; si se informa un precio distinto se rechaza. Sin
+        servicios se guarda el precio informado.
+        """
+        if not servicios and precio is None:
+            raise ValueError("El precio es obligatorio si la orden no tiene servicios")
+        orden = Orden(garantia=garantia, estadoPago=estadoPago, precio=precio or 0, fecha=fecha)
         self.db.add(orden)
         try:
             # flush to get orden.id without committing
             self.db.flush()
 
+            total = 0
             for item in servicios:
                 sid = item.get("servicio_id")
                 precio_servicio = item.get("precio_servicio")
                 if not sid or precio_servicio is None:
                     raise ValueError("Servicio o precio_servicio inválido")
+                if precio_servicio < 0:
+                    raise ValueError("precio_servicio no puede ser negativo")
 
                 servicio = self.db.query(Servicio).filter(Servicio.id == sid).first()
                 if not servicio:
@@ -35,6 +52,14 @@ class OrdenRepository:
                 # create relation orden-servicio
                 os = OrdenServicio(orden_id=orden.id, servicio_id=sid, precio_servicio=precio_servicio)
                 self.db.add(os)
+                total += precio_servicio
+
+            if servicios:
+                if precio is not None and precio != total:
+                    raise ValueError(
+                        f"El precio de la orden ({precio}) no coincide con la suma de sus servicios ({total})"
+                    )
+                orden.precio = total
 
             # asociar empleados si vienen
             if empleados:
@@ -58,11 +83,138 @@ class OrdenRepository:
             self.db.rollback()
             raise
 
+    def _total_servicios(self, orden_id: int) -> int:
+        return self.db.execute(
+            select(func.coalesce(func.sum(OrdenServicio.precio_servicio), 0))
+            .where(OrdenServicio.orden_id == orden_id)
+        ).scalar()
+
+    def _edit_servicios(self, orden_id: int, edit):
+        """
+        Aplica `edit(orden)` sobre las líneas de servicio con la orden
+        bloqueada y recalcula su precio en la misma transacción: dos
+        ediciones concurrentes de una orden no pueden dejar un total que no
+        coincida con sus líneas. `edit` devuelve False si la línea no existe.
+        """
+        orden = self.db.query(Orden).filter(Orden.id == orden_id).with_for_update().first()
+        if not orden:
+            self.db.rollback()
+            return None
+        try:
+            if edit(orden) is False:
+                self.db.rollback()
+                return None
+            self.db.flush()
+            orden.precio = self._total_servicios(orden_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return self.get_by_id(orden_id)
+
+    def _linea(self, orden_id: int, linea_id: int):
+        return self.db.query(OrdenServicio).filter(
+            OrdenServicio.id == linea_id, OrdenServicio.orden_id == orden_id
+        ).first()
+
+    def add_servicio(self, orden_id: int, servicio_id: int, precio_servicio: int):
+        if precio_servicio < 0:
+            raise ValueError("precio_servicio no puede ser negativo")
+
+        def edit(orden):
+            if not self.db.query(Servicio.id).filter(Servicio.id == servicio_id).first():
+                raise ValueError(f"Servicio con id {servicio_id} no existe")
+            self.db.add(OrdenServicio(orden_id=orden.id, servicio_id=servicio_id, precio_servicio=precio_servicio))
+
+        return self._edit_servicios(orden_id, edit)
+
+    def update_servicio(self, orden_id: int, linea_id: int, precio_servicio: int):
+        if precio_servicio < 0:
+            raise ValueError("precio_servicio no puede ser negativo")
+
+        def edit(orden):
+            linea = self._linea(orden.id, linea_id)
+            if not linea:
+                return False
+            linea.precio_servicio = precio_servicio
+
+        return self._edit_servicios(orden_id, edit)
+
+    def remove_servicio(self, orden_id: int, linea_id: int):
+        def edit(orden):
+            linea = self._linea(orden.id, linea_id)
+            if not linea:
+                return False
+            # Sin líneas el precio quedaría en 0: create_with_services tampoco
+            # acepta una orden sin servicios ni precio
+            restantes = self.db.execute(
+                select(func.count()).where(OrdenServicio.orden_id == orden.id, OrdenServicio.id != linea_id)
+            ).scalar()
+            if not restantes:
+                raise ValueError("La orden debe conservar al menos un servicio")
+            self.db.delete(linea)
+
+        return self._edit_servicios(orden_id, edit)
+
     def get_all(self):
-        return self.db.query(Orden).all()
+        return self.db.query(Orden).options(*_ORDEN_LOAD).all()
+
+    def get_rows(self, fecha=None, ids=None):
+        """
+        Órdenes con sus líneas de servicio y empleados (y el detalle de cada
+        uno) como filas Core, para serializar sin construir objetos ORM.
+        """
+        ordenes_q = select(Orden.__table__)
+        orden_ids = select(Orden.id)
+        if fecha is not None:
+            # Orden.fecha ya es Date: sin CAST para que use ix_ordenes_fecha
+            ordenes_q = ordenes_q.where(Orden.fecha == fecha)
+            orden_ids = orden_ids.where(Orden.fecha == fecha)
+        if ids is not None:
+            ordenes_q = ordenes_q.where(Orden.id.in_(ids))
+            orden_ids = orden_ids.where(Orden.id.in_(ids))
+        servicios_q = select(OrdenServicio.__table__).order_by(OrdenServicio.id)
+        empleados_q = select(OrdenEmpleado.__table__).order_by(OrdenEmpleado.id)
+        if fecha is not None or ids is not None:
+            servicios_q = servicios_q.where(OrdenServicio.orden_id.in_(orden_ids))
+            empleados_q = empleados_q.where(OrdenEmpleado.orden_id.in_(orden_ids))
+
+        ordenes = self.db.execute(ordenes_q).mappings().all()
+        servicios = self.db.execute(servicios_q).mappings().all()
+        empleados = self.db.execute(empleados_q).mappings().all()
+        # Catálogos pequeños: se cargan completos
+        catalogo_servicios = self.db.execute(select(Servicio.__table__)).mappings().all()
+        catalogo_empleados = self.db.execute(select(Empleado.__table__)).mappings().all()
+        return ordenes, servicios, empleados, catalogo_servicios, catalogo_empleados
+
+    def iter_rows(self, batch_size: int = 1000):
+        """
+        Cursores en streaming de órdenes, líneas de servicio (columnas
+        "servicio__*") y empleados asignados (columnas "empleado__*"),
+        todos ordenados por orden.
+        """
+        stream = {"yield_per": batch_size, "stream_results": True}
+        ordenes = self.db.execute(
+            select(Orden.__table__).order_by(Orden.id).execution_options(**stream)
+        ).mappings()
+        servicio_cols = [c.label(f"servicio__{c.name}") for c in Servicio.__table__.c]
+        servicios = self.db.execute(
+            select(OrdenServicio.__table__, *servicio_cols)
+            .outerjoin(Servicio, Servicio.id == OrdenServicio.servicio_id)
+            .order_by(OrdenServicio.orden_id, OrdenServicio.id)
+            .execution_options(**stream)
+        ).mappings()
+        empleado_cols = [c.label(f"empleado__{c.name}") for c in Empleado.__table__.c]
+        empleados = self.db.execute(
+            select(OrdenEmpleado.__table__, *empleado_cols)
+            .outerjoin(Empleado, Empleado.id == OrdenEmpleado.empleado_id)
+            .order_by(OrdenEmpleado.orden_id, OrdenEmpleado.id)
+            .execution_options(**stream)
+        ).mappings()
+        return ordenes, servicios, empleados
 
     def get_by_id(self, id: int):
-        return self.db.query(Orden).filter(Orden.id == id).first()
+        return self.db.query(Orden).options(*_ORDEN_LOAD).filter(Orden.id == id).first()
 
     def delete(self, id: int):
         orden = self.get_by_id(id)
@@ -73,6 +225,6 @@ class OrdenRepository:
         return False
 
     def get_by_fecha(self, fecha):
-        return self.db.query(Orden).filter(
-            cast(Orden.fecha, Date) == fecha
+        return self.db.query(Orden).options(*_ORDEN_LOAD).filter(
+            Orden.fecha == fecha
         ).all()
\ No newline at end of file
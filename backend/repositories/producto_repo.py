@@ -1,7 +1,17 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from db.models import Producto
 from schemas.producto_schema import ProductoCreate
+from core import events
+from db.change_tracking import record_changes
+from repositories.inventario_repo import InventarioRepository
+
+
+def _columns(fields: tuple[str, ...] | None):
+    # Proyección SQL: solo las columnas pedidas con ?fields=
+    table = Producto.__table__
+    return [table.c[name] for name in fields] if fields else [table]
 
 
 
@@ -13,12 +23,41 @@ class ProductoRepository:
     def create(self, producto_data: ProductoCreate):
         producto = Producto(**producto_data.model_dump())
         self.db.add(producto)
+        self.db.flush()
+        InventarioRepository(self.db).record([{"producto_id": producto.id, "tipo": "alta", "cantidad": producto.stock}])
         self.db.commit()
         self.db.refresh(producto)
+        events.publish("catalog", {"action": "created", **events.producto_snapshot(producto)})
         return producto
 
     def get_all(self):
         return self.db.query(Producto).all()
+
+    def get_all_rows(self, fields: tuple[str, ...] | None = None):
+        # Filas Core sin construir objetos ORM (serialización rápida)
+        return self.db.execute(select(*_columns(fields))).mappings().all()
+
+    def get_row_by_id(self, id: int, fields: tuple[str, ...] | None = None):
+        return self.db.execute(select(*_columns(fields)).where(Producto.id == id)).mappings().first()
+
+    def get_rows_by_ids(self, ids):
+        return self.db.execute(select(Producto.__table__).where(Producto.id.in_(ids))).mappings().all()
+    
+    def get_label_rows(self, ids: list[int] | None = None, categoria: str | None = None):
+        # Solo lo que va en la etiqueta: id, nombre y código de barras
+        stmt = select(Producto.id, Producto.nombre, Producto.codBarras)
+        if ids is not None:
+            stmt = stmt.where(Producto.id.in_(ids))
+        if categoria is not None:
+            stmt = stmt.where(Producto.categoria == categoria).order_by(Producto.nombre)
+        return self.db.execute(stmt).all()
+    
+    def iter_rows(self, batch_size: int = 1000):
+        # Cursor del lado del servidor: memoria constante en exportaciones
+        return self.db.execute(
+            select(Producto.__table__).order_by(Producto.id)
+            .execution_options(yield_per=batch_size, stream_results=True)
+        ).mappings()
     
     def get_by_id(self, id: int):
         return self.db.query(Producto).filter(Producto.id == id).first()
@@ -30,22 +69,86 @@ class ProductoRepository:
         return self.db.query(Producto).filter(Producto.codBarras == codBarras).first()
 
     def update(self, id: int, producto_data: ProductoCreate):
-        producto = self.get_by_id(id)
+        # Fila bloqueada (y releída) hasta el commit: una venta concurrente no
+        # se pisa y el delta del movimiento parte del stock vigente
+        producto = (self.db.query(Producto).filter(Producto.id == id)
+                    .with_for_update().populate_existing().first())
         if not producto:
             return None
         data = producto_data.model_dump(exclude_unset=True)
+        previous = (producto.stock, producto.precioVenta, producto.precioCompra)
         for key, value in data.items():
             setattr(producto, key, value)
+        # Primero el UPDATE del producto, después su movimiento (ver InventarioRepository)
+        self.db.flush()
+        InventarioRepository(self.db).record([
+            {"producto_id": id, "tipo": "actualizacion", "cantidad": producto.stock - previous[0]}
+        ])
         self.db.commit()
         self.db.refresh(producto)
+
+        # Eventos después del commit: los clientes nunca ven cambios revertidos
+        snapshot = events.producto_snapshot(producto)
+        if producto.stock != previous[0]:
+            events.publish("stock", snapshot)
+        if (producto.precioVenta, producto.precioCompra) != previous[1:]:
+            events.publish("price", snapshot)
+        events.publish("catalog", {"action": "updated", **snapshot})
         return producto
     
+    def apply_stock_delta(self, id: int, delta: int):
+        """
+        UPDATE condicional stock = stock + delta si el resultado no queda
+        negativo, sin lectura previa. Devuelve (id, nombre, stock, precioVenta,
+        precioCompra) ya actualizados, o None si no se actualizó ninguna fila.
+        No hace commit.
+        """
+        productos = Producto.__table__
+        stmt = (
+            update(productos)
+            .where(productos.c.id == id, productos.c.stock + delta >= 0)
+            .values(stock=productos.c.stock + delta)
+        )
+        returning = (productos.c.id, productos.c.nombre, productos.c.stock,
+                     productos.c.precioVenta, productos.c.precioCompra)
+        if self.db.get_bind().dialect.update_returning:
+            return self.db.execute(stmt.returning(*returning)).first()
+        # Sin RETURNING: el conteo de filas decide y se relee la fila
+        if self.db.execute(stmt).rowcount != 1:
+            return None
+        return self.db.execute(select(*returning).where(productos.c.id == id)).first()
+
+    def adjust_stock(self, id: int, cantidad: int, motivo: str):
+        """
+        Ajuste manual (conteo, merma, ingreso de mercadería): suma `cantidad`
+        al stock con un UPDATE condicional que no lo deja negativo.
+        """
+        try:
+            row = self.apply_stock_delta(id, cantidad)
+            if row is None:
+                if self.db.get(Producto, id) is None:
+                    return None
+                raise ValueError("Stock insuficiente para el ajuste")
+            InventarioRepository(self.db).record([
+                {"producto_id": id, "tipo": "ajuste", "cantidad": cantidad, "motivo": motivo}
+            ])
+            record_changes(self.db.connection(), {("productos", id): "upsert"})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        events.publish("stock", {**events.producto_snapshot(row), "motivo": motivo})
+        # La sesión puede tener el producto cargado con el stock anterior
+        self.db.expire_all()
+        return self.get_by_id(id)
+
     def delete(self, id: int):
         producto = self.get_by_id(id)
         if producto:
             try:
                 self.db.delete(producto)
                 self.db.commit()
+                events.publish("catalog", {"action": "deleted", "producto_id": id})
             except IntegrityError as e:
                 self.db.rollback()
                 # Si hay un error de integridad (ej: ventas asociadas), lanzar una excepción más clara
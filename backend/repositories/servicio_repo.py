@@ -1,9 +1,17 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from db.models import Servicio
 
 from schemas.servicio_schema import ServicioCreate
 
+
+def _columns(fields: tuple[str, ...] | None):
+    # Proyección SQL: solo las columnas pedidas con ?fields=
+    table = Servicio.__table__
+    return [table.c[name] for name in fields] if fields else [table]
+
+
 class ServicioRepository:
 
     def __init__(self, db: Session):
@@ -19,6 +27,15 @@ class ServicioRepository:
     def get_all(self):
         return self.db.query(Servicio).all()
     
+    def get_all_rows(self, fields: tuple[str, ...] | None = None):
+        return self.db.execute(select(*_columns(fields))).mappings().all()
+
+    def get_row_by_id(self, id: int, fields: tuple[str, ...] | None = None):
+        return self.db.execute(select(*_columns(fields)).where(Servicio.id == id)).mappings().first()
+
+    def get_rows_by_ids(self, ids):
+        return self.db.execute(select(Servicio.__table__).where(Servicio.id.in_(ids))).mappings().all()
+    
     def get_by_id(self, id: int):
         return self.db.query(Servicio).filter(Servicio.id == id).first()
     
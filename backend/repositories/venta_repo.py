@@ -1,12 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import Date, cast
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
 
 from db.models import Venta
 from db.models import VentaProducto
 from db.models import Producto
+from core import events
+from core.config import settings
+from db.change_tracking import record_changes
+from repositories.inventario_repo import InventarioRepository
+from repositories.producto_repo import ProductoRepository
 
+# VentaResponse incluye las líneas y su producto: cargarlos en bloque evita
+# una consulta por venta y otra por línea al serializar.
+_VENTA_LOAD = selectinload(Venta.productos).selectinload(VentaProducto.producto)
+
+_SUBTOTAL = (VentaProducto.cantidad * VentaProducto.precio_unitario).label("subtotal")
+
+
+def _mismo_dia(fecha: datetime):
+    # Rango [00:00, 00:00 del día siguiente) en lugar de CAST(fecha AS DATE):
+    # la comparación directa sobre la columna puede usar ix_ventas_fecha
+    inicio = datetime.combine(fecha.date(), datetime.min.time())
+    return Venta.fecha >= inicio, Venta.fecha < inicio + timedelta(days=1)
 
 
 class VentaRepository:
@@ -22,12 +39,16 @@ class VentaRepository:
         return venta
 
     def create_with_products(self, fecha: datetime, productos: list[dict]):
+        if settings.STOCK_DECREMENT_MODE == "atomic":
+            return self._create_with_products_atomic(fecha, productos)
 
         venta = Venta(fecha=fecha)
         self.db.add(venta)
         try:
             # flush to get venta.id without committing
             self.db.flush()
+            stock_changes = []
+            movimientos = []
 
             for item in productos:
                 pid = item.get("producto_id")
@@ -39,17 +60,26 @@ class VentaRepository:
                 if not producto:
                     raise ValueError(f"Producto con id {pid} no existe")
                 if producto.stock < cantidad:
-                    raise ValueError(f"Stock insuficiente.")
+                    raise ValueError("Stock insuficiente.")
                 
-                # create relation venta-producto
-                vp = VentaProducto(venta_id=venta.id, producto_id=pid, cantidad=cantidad)
+                # create relation venta-producto (con los precios vigentes)
+                vp = VentaProducto(
+                    venta_id=venta.id, producto_id=pid, cantidad=cantidad,
+                    precio_unitario=producto.precioVenta, costo_unitario=producto.precioCompra,
+                )
                 self.db.add(vp)
 
                 # update stock
                 producto.stock = producto.stock - cantidad
+                stock_changes.append({**events.producto_snapshot(producto), "venta_id": venta.id})
+                movimientos.append({"producto_id": pid, "tipo": "venta", "cantidad": -cantidad, "venta_id": venta.id})
 
             # commit everything
+            self.db.flush()
+            InventarioRepository(self.db).record(movimientos)
             self.db.commit()
+            for snapshot in stock_changes:
+                events.publish("stock", snapshot)
             # refresh to load relationships
             self.db.refresh(venta)
             return venta
@@ -57,11 +87,131 @@ class VentaRepository:
             self.db.rollback()
             raise
 
+    def _create_with_products_atomic(self, fecha: datetime, productos: list[dict]):
+        """
+        Igual que create_with_products, pero el stock se descuenta con un
+        UPDATE condicional (stock >= cantidad) en vez de leer la fila con
+        FOR UPDATE: una sola sentencia por producto, sin lectura previa ni
+        comparación en Python que otra transacción pueda invalidar. Si no se actualiza
+        ninguna fila, el producto no existe o no alcanza el stock.
+        """
+        cantidades: dict[int, int] = {}
+        for item in productos:
+            pid = item.get("producto_id")
+            cantidad = item.get("cantidad", 0)
+            if not pid or cantidad <= 0:
+                raise ValueError("Producto o cantidad inválida")
+            cantidades[pid] = cantidades.get(pid, 0) + cantidad
+
+        venta = Venta(fecha=fecha)
+        self.db.add(venta)
+        try:
+            # flush to get venta.id without committing
+            self.db.flush()
+
+            # Descuentos en orden de id: dos ventas concurrentes con los
+            # mismos productos bloquean las filas en el mismo orden (sin deadlock)
+            stock_changes = []
+            precios: dict[int, tuple[int, int]] = {}
+            for pid in sorted(cantidades):
+                row = ProductoRepository(self.db).apply_stock_delta(pid, -cantidades[pid])
+                if row is None:
+                    if self.db.get(Producto, pid) is None:
+                        raise ValueError(f"Producto con id {pid} no existe")
+                    raise ValueError("Stock insuficiente.")
+                stock_changes.append({**events.producto_snapshot(row), "venta_id": venta.id})
+                precios[pid] = (row.precioVenta, row.precioCompra)
+
+            for item in productos:
+                precio_unitario, costo_unitario = precios[item["producto_id"]]
+                self.db.add(VentaProducto(
+                    venta_id=venta.id, producto_id=item["producto_id"], cantidad=item["cantidad"],
+                    precio_unitario=precio_unitario, costo_unitario=costo_unitario,
+                ))
+            self.db.flush()
+
+            InventarioRepository(self.db).record([
+                {"producto_id": pid, "tipo": "venta", "cantidad": -cantidad, "venta_id": venta.id}
+                for pid, cantidad in sorted(cantidades.items())
+            ])
+            # El UPDATE no pasa por el ORM: registrar el cambio para /sync
+            record_changes(self.db.connection(), {("productos", pid): "upsert" for pid in cantidades})
+            self.db.commit()
+            for snapshot in stock_changes:
+                events.publish("stock", snapshot)
+            self.db.refresh(venta)
+            return venta
+        except Exception:
+            self.db.rollback()
+            raise
+
     def get_all(self):
-        return self.db.query(Venta).all()
+        return self.db.query(Venta).options(_VENTA_LOAD).all()
+
+    def get_rows(self, fecha: datetime | None = None):
+        """
+        Ventas, sus líneas y los productos vendidos como filas Core, para
+        serializar sin construir objetos ORM. Tres consultas en total.
+        """
+        venta_ids = select(Venta.id)
+        ventas_q = select(Venta.__table__)
+        if fecha is not None:
+            venta_ids = venta_ids.where(*_mismo_dia(fecha))
+            ventas_q = ventas_q.where(*_mismo_dia(fecha))
+        lineas_q = select(VentaProducto.__table__, _SUBTOTAL).order_by(VentaProducto.id)
+        producto_ids = select(VentaProducto.producto_id)
+        if fecha is not None:
+            lineas_q = lineas_q.where(VentaProducto.venta_id.in_(venta_ids))
+            producto_ids = producto_ids.where(VentaProducto.venta_id.in_(venta_ids))
+        productos_q = select(Producto.__table__).where(Producto.id.in_(producto_ids))
+
+        ventas = self.db.execute(ventas_q).mappings().all()
+        lineas = self.db.execute(lineas_q).mappings().all()
+        productos = self.db.execute(productos_q).mappings().all()
+        return ventas, lineas, productos
+
+    def iter_rows(self, batch_size: int = 1000):
+        """
+        Cursores en streaming de ventas y de sus líneas (con el producto
+        unido, columnas "producto__*"), ambos ordenados por venta.
+        """
+        ventas = self.db.execute(
+            select(Venta.__table__).order_by(Venta.id)
+            .execution_options(yield_per=batch_size, stream_results=True)
+        ).mappings()
+        producto_cols = [c.label(f"producto__{c.name}") for c in Producto.__table__.c]
+        lineas = self.db.execute(
+            select(VentaProducto.__table__, _SUBTOTAL, *producto_cols)
+            .outerjoin(Producto, Producto.id == VentaProducto.producto_id)
+            .order_by(VentaProducto.venta_id, VentaProducto.id)
+            .execution_options(yield_per=batch_size, stream_results=True)
+        ).mappings()
+        return ventas, lineas
+
+    def resumen(self, desde: datetime | None = None, hasta: datetime | None = None):
+        """
+        Ventas, unidades, ingresos y costo del periodo [desde, hasta) con los
+        precios capturados en cada línea: solo recorre venta_producto (ventas
+        aporta el filtro por fecha, vía ix_ventas_fecha), nunca el catálogo.
+        """
+        stmt = select(
+            func.count(func.distinct(VentaProducto.venta_id)),
+            func.coalesce(func.sum(VentaProducto.cantidad), 0),
+            func.coalesce(func.sum(VentaProducto.cantidad * VentaProducto.precio_unitario), 0),
+            func.coalesce(func.sum(VentaProducto.cantidad * VentaProducto.costo_unitario), 0),
+        )
+        if desde is not None or hasta is not None:
+            venta_ids = select(Venta.id)
+            if desde is not None:
+                venta_ids = venta_ids.where(Venta.fecha >= desde)
+            if hasta is not None:
+                venta_ids = venta_ids.where(Venta.fecha < hasta)
+            stmt = stmt.where(VentaProducto.venta_id.in_(venta_ids))
+        ventas, unidades, ingresos, costo = self.db.execute(stmt).one()
+        return {"ventas": ventas, "unidades": unidades, "ingresos": ingresos, "costo": costo}
 
     def get_by_id(self, id: int):
-        return self.db.query(Venta).filter(Venta.id == id).first()
+        return self.db.query(Venta).options(_VENTA_LOAD).filter(Venta.id == id).first()
 
     def delete(self, id: int):
         venta = self.get_by_id(id)
@@ -72,6 +222,6 @@ class VentaRepository:
         return False
 
     def get_by_fecha(self, fecha: datetime):
-        return self.db.query(Venta).filter(
-            cast(Venta.fecha, Date) == fecha.date()
+        return self.db.query(Venta).options(_VENTA_LOAD).filter(
+            *_mismo_dia(fecha)
         ).all()
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+
+class DashboardProductos(BaseModel):
+    total: int
+    bajo_stock: int
+
+
+class DashboardEmpleados(BaseModel):
+    total: int
+    activos: int
+
+
+class DashboardOrdenes(BaseModel):
+    total: int
+    pendientes_pago: int
+    por_cobrar: int
+
+
+class DashboardVentas(BaseModel):
+    cantidad_hoy: int
+    ingresos_hoy: int
+
+
+class DashboardResponse(BaseModel):
+    productos: DashboardProductos
+    servicios: int
+    empleados: DashboardEmpleados
+    ordenes: DashboardOrdenes
+    ventas: DashboardVentas
@@ -13,4 +13,8 @@ class EmpleadoCreate(EmpleadoBase):
 class EmpleadoResponse(EmpleadoBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class EmpleadoBatchResponse(BaseModel):
+    items: list[EmpleadoResponse]
+    missing: list[int]
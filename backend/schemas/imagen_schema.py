@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class ImagenResponse(BaseModel):
+    hash: str
+    url: str
+    miniaturas: dict[str, str]
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from pydantic import BaseModel, field_validator
+
+
+class MovimientoResponse(BaseModel):
+    id: int
+    fecha: datetime
+    tipo: str
+    cantidad: int
+    stock: int
+    venta_id: int | None = None
+    motivo: str | None = None
+
+
+class StockHistoryResponse(BaseModel):
+    producto_id: int
+    desde: datetime | None
+    hasta: datetime
+    stock_inicial: int
+    stock_final: int
+    has_more: bool
+    movimientos: list[MovimientoResponse]
+
+
+class AjusteStockCreate(BaseModel):
+    cantidad: int
+    motivo: str
+
+    @field_validator('cantidad')
+    @classmethod
+    def cantidad_no_cero(cls, v: int) -> int:
+        if v == 0:
+            raise ValueError("La cantidad del ajuste no puede ser 0")
+        return v
+
+    @field_validator('motivo')
+    @classmethod
+    def motivo_valido(cls, v: str) -> str:
+        v = v.strip()
+        if len(v) < 3:
+            raise ValueError("El motivo debe tener al menos 3 caracteres")
+        return v
@@ -14,7 +14,11 @@ class OrdenServicioBase(BaseModel):
     servicio_id: int
     precio_servicio: int
 
+class OrdenServicioUpdate(BaseModel):
+    precio_servicio: int
+
 class OrdenServicioResponse(OrdenServicioBase):
+    id: int | None = None
     servicio: ServicioResponse | None = None
     class Config:
         from_attributes = True
@@ -30,6 +34,9 @@ class OrdenEmpleadoResponse(OrdenEmpleadoBase):
 
 
 class OrdenCreate(OrdenBase):
+    # Con servicios el precio se calcula como la suma de sus líneas; si se
+    # envía debe coincidir con esa suma
+    precio: int | None = None
     servicios: list[OrdenServicioBase] | None = []
     empleados: list[OrdenEmpleadoBase] | None = []
 
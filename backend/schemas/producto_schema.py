@@ -48,5 +48,16 @@ class ProductoResponse(ProductoBase):
     img: str | None = None
     tipo: str | None = None
 
+
+class BarcodeAllocationResponse(BaseModel):
+    categoria: str
+    codigo_categoria: str
+    codigos: list[str]
+
+
+class ProductoBatchResponse(BaseModel):
+    items: list[ProductoResponse]
+    missing: list[int]
+
 class Config:
     from_attributes = True
\ No newline at end of file
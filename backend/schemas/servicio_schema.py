@@ -26,4 +26,9 @@ class ServicioCreate(ServicioBase):
 class ServicioResponse(ServicioBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ServicioBatchResponse(BaseModel):
+    items: list[ServicioResponse]
+    missing: list[int]
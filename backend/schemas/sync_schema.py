@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class EntityChanges(BaseModel):
+    upserts: list[dict] = []
+    deletes: list[int] = []
+
+
+class SyncResponse(BaseModel):
+    since: int | None
+    next: int
+    has_more: bool
+    reset: bool
+    changes: dict[str, EntityChanges]
@@ -16,6 +16,10 @@ class VentaProductoBase(BaseModel):
  
 
 class VentaProductoResponse(VentaProductoBase):
+    # Precios capturados al registrar la venta; subtotal = cantidad * precio_unitario
+    precio_unitario: int
+    costo_unitario: int
+    subtotal: int
     producto: ProductoResponse | None = None
 
     class Config:
@@ -31,6 +35,18 @@ class VentaCreate(VentaBase):
 class VentaResponse(VentaBase):
     id: int
     productos: list[VentaProductoResponse] | None = None
+    total: int = 0
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+
+class VentasResumenResponse(BaseModel):
+    desde: datetime | None = None
+    hasta: datetime | None = None
+    ventas: int
+    unidades: int
+    ingresos: int
+    costo: int
+    margen: int
@@ -0,0 +1,332 @@
+"""
+Generador de datos sintéticos para pruebas de carga y benchmarks.
+
+No interactivo y reproducible (--seed). Genera productos, autopartes con
+rangos de años, empleados, servicios, ventas con sus líneas y órdenes con
+servicios y empleados. La popularidad de productos y servicios sigue una
+distribución tipo Zipf: pocos artículos concentran la mayoría de las ventas.
+
+Inserta en lotes con Core (executemany) o con COPY en PostgreSQL, generando
+las filas por partes para mantener la memoria constante.
+
+Ejecutar desde backend/ con:
+    python seed_data.py --productos 20000 --ventas 3000000 --ordenes 1000000 --reset
+"""
+import argparse
+import csv
+import io
+import itertools
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from core.barcodes import MAX_SEQUENCE, build_barcode
+from db.base import Base, build_engine
+from db.models import (
+    Autoparte, Empleado, Orden, OrdenEmpleado, OrdenServicio, Producto, Servicio, Venta, VentaProducto,
+)
+from core.config import settings
+
+CATEGORIAS = {
+    "Filtros": ("Filtro de aceite", "Filtro de aire", "Filtro de combustible", "Filtro de cabina"),
+    "Aceites": ("Aceite 5W-30", "Aceite 10W-40", "Aceite 15W-40", "Aceite de caja"),
+    "Frenos": ("Pastillas de freno", "Disco de freno", "Líquido de frenos", "Zapatas"),
+    "Suspensión": ("Amortiguador", "Rótula", "Terminal de dirección", "Buje"),
+    "Motor": ("Bujía", "Correa de distribución", "Bomba de agua", "Empaquetadura"),
+    "Baterías": ("Batería 12V 45Ah", "Batería 12V 65Ah", "Borne de batería"),
+    "Iluminación": ("Foco H4", "Foco H7", "Faro LED", "Luz de freno"),
+    "Refrigeración": ("Refrigerante", "Radiador", "Termostato", "Manguera de radiador"),
+    "Transmisión": ("Kit de embrague", "Aceite de transmisión", "Cruceta"),
+    "Escape": ("Silenciador", "Tubo de escape", "Sensor de oxígeno"),
+}
+MARCAS = ("Bosch", "Castrol", "NGK", "Mann", "Febi", "Monroe", "Mobil", "Shell", "Brembo", "Denso", "Gates", "Valeo")
+MODELOS = (
+    "Toyota Corolla", "Toyota Hilux", "Toyota Yaris", "Nissan Sentra", "Nissan Frontier", "Hyundai Accent",
+    "Kia Rio", "Chevrolet Sail", "Suzuki Swift", "Mitsubishi L200", "Volkswagen Gol", "Honda Civic",
+)
+SERVICIOS_BASE = (
+    "Cambio de aceite", "Alineación y balanceo", "Revisión de frenos", "Diagnóstico computarizado",
+    "Cambio de bujías", "Mantenimiento preventivo", "Cambio de embrague", "Afinamiento",
+    "Reparación de suspensión", "Cambio de batería", "Limpieza de inyectores", "Revisión eléctrica",
+)
+NOMBRES = ("Juan", "Carlos", "Luis", "Miguel", "José", "Pedro", "Jorge", "Ana", "María", "Rosa", "Diego", "Raúl")
+APELLIDOS = ("Pérez", "García", "Quispe", "Mamani", "Flores", "Rojas", "Torres", "Vargas", "Cruz", "Ramos")
+ESPECIALIDADES = ("Mecánica general", "Electricidad", "Frenos", "Suspensión", "Diagnóstico", "Pintura")
+
+
+def zipf_cum_weights(n: int, s: float, rnd: random.Random) -> tuple[list[int], list[float]]:
+    """
+    Ids 1..n en orden aleatorio con pesos acumulados 1/rango^s, para usar con
+    random.choices(population, cum_weights=...).
+    """
+    population = list(range(1, n + 1))
+    rnd.shuffle(population)
+    cum_weights = list(itertools.accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+    return population, cum_weights
+
+
+def _batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _copy_rows(conn, table, columns: list[str], rows: list[tuple]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(["\\N" if v is None else v for v in row] for row in rows)
+    buffer.seek(0)
+    cols = ", ".join(f'"{c}"' for c in columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(conn, table, columns: list[str], rows, batch_size: int) -> int:
+    """
+    Inserta filas (tuplas en el orden de `columns`) por lotes. Usa COPY en
+    PostgreSQL y executemany de Core en el resto.
+    """
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+    stmt = insert(table)
+    total = 0
+    for batch in _batched(rows, batch_size):
+        if use_copy:
+            _copy_rows(conn, table, columns, batch)
+        else:
+            conn.execute(stmt, [dict(zip(columns, row)) for row in batch])
+        total += len(batch)
+    return total
+
+
+class Generator:
+    def __init__(self, productos: int, servicios: int, empleados: int, ventas: int, ordenes: int,
+                 seed: int = 42, dias: int = 3 * 365, skew: float = 1.1):
+        if productos > MAX_SEQUENCE:
+            raise ValueError(f"Máximo {MAX_SEQUENCE} productos (capacidad del código de barras)")
+        self.n_productos = productos
+        self.n_servicios = servicios
+        self.n_empleados = empleados
+        self.n_ventas = ventas
+        self.n_ordenes = ordenes
+        self.rnd = random.Random(seed)
+        # producto_id -> (precioVenta, precioCompra), para las líneas de venta
+        self.precios: dict[int, tuple[int, int]] = {}
+        self.skew = skew
+        # Periodo que termina hoy a medianoche: misma semilla, mismos datos en el día
+        self.end = datetime.combine(datetime.now().date(), datetime.min.time())
+        self.start = self.end - timedelta(days=dias)
+
+    # --- Catálogo ---
+
+    def productos(self):
+        """
+        Un cuarto de los productos son autopartes (id múltiplo de 4).
+        """
+        rnd = self.rnd
+        categorias = list(CATEGORIAS)
+        for i in range(1, self.n_productos + 1):
+            categoria = rnd.choice(categorias)
+            base = rnd.choice(CATEGORIAS[categoria])
+            marca = rnd.choice(MARCAS)
+            precio_compra = rnd.randint(5, 400)
+            precio_venta = int(precio_compra * rnd.uniform(1.2, 1.8)) + 1
+            self.precios[i] = (precio_venta, precio_compra)
+            yield (
+                i, f"{base} {marca} {i}", f"{base} marca {marca} para uso automotriz",
+                precio_venta, precio_compra, marca, categoria,
+                int(rnd.paretovariate(1.5) * 5), rnd.choice((2, 5, 10)),
+                build_barcode(i, categoria), None, "autoparte" if i % 4 == 0 else "producto",
+            )
+
+    def autopartes(self):
+        rnd = self.rnd
+        for i in range(4, self.n_productos + 1, 4):
+            desde = rnd.randint(2000, 2022)
+            if rnd.random() < 0.7:
+                anio = f"{desde}-{min(desde + rnd.randint(1, 8), 2025)}"
+            else:
+                anio = ", ".join(str(desde + k) for k in sorted(rnd.sample(range(0, 8), 3)))
+            yield i, rnd.choice(MODELOS), anio
+
+    def servicios(self):
+        for i in range(1, self.n_servicios + 1):
+            base = SERVICIOS_BASE[(i - 1) % len(SERVICIOS_BASE)]
+            nombre = base if i <= len(SERVICIOS_BASE) else f"{base} {i}"
+            yield i, nombre, f"{base} realizado por personal especializado"
+
+    def empleados(self):
+        rnd = self.rnd
+        for i in range(1, self.n_empleados + 1):
+            yield (
+                i, f"{rnd.choice(NOMBRES)} {i}", f"{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}",
+                "activo" if rnd.random() < 0.9 else "inactivo", rnd.choice(ESPECIALIDADES),
+            )
+
+    # --- Transacciones ---
+
+    def _fechas(self, n: int):
+        """
+        n fechas crecientes repartidas en el periodo, en horario de atención.
+        """
+        rnd = self.rnd
+        span = (self.end - self.start).total_seconds()
+        step = span / max(n, 1)
+        for k in range(n):
+            moment = self.start + timedelta(seconds=k * step)
+            yield moment.replace(hour=rnd.randint(8, 18), minute=rnd.randint(0, 59))
+
+    def ventas(self):
+        for i, fecha in enumerate(self._fechas(self.n_ventas), start=1):
+            yield i, fecha
+
+    def venta_productos(self):
+        rnd = self.rnd
+        population, cum = zipf_cum_weights(self.n_productos, self.skew, rnd)
+        next_id = 1
+        chunk = 10_000
+        for start in range(1, self.n_ventas + 1, chunk):
+            ventas = range(start, min(start + chunk, self.n_ventas + 1))
+            lineas = [rnd.choices((1, 2, 3, 4), weights=(60, 25, 10, 5))[0] for _ in ventas]
+            productos = rnd.choices(population, cum_weights=cum, k=sum(lineas))
+            pos = 0
+            for venta_id, n in zip(ventas, lineas):
+                # Sin productos repetidos dentro de la misma venta
+                for producto_id in dict.fromkeys(productos[pos:pos + n]):
+                    cantidad = rnd.choices((1, 2, 3, 5), weights=(70, 20, 7, 3))[0]
+                    yield (next_id, venta_id, producto_id, cantidad, *self.precios[producto_id])
+                    next_id += 1
+                pos += n
+
+    def ordenes_y_lineas(self):
+        """
+        Genera órdenes con sus servicios y empleados. Devuelve tres iteradores
+        alimentados por lotes para no materializar todo en memoria.
+        """
+        rnd = self.rnd
+        servicios, cum = zipf_cum_weights(self.n_servicios, self.skew, rnd)
+        precios_servicio = {s: rnd.randint(30, 400) for s in range(1, self.n_servicios + 1)}
+        os_id = itertools.count(1)
+        oe_id = itertools.count(1)
+        for orden_id, fecha in enumerate(self._fechas(self.n_ordenes), start=1):
+            elegidos = dict.fromkeys(rnd.choices(servicios, cum_weights=cum, k=rnd.choice((1, 1, 2, 3))))
+            lineas = [(next(os_id), orden_id, s, precios_servicio[s]) for s in elegidos]
+            empleados = {rnd.randint(1, self.n_empleados) for _ in range(rnd.choice((1, 1, 2)))}
+            orden = (
+                orden_id, rnd.choice((0, 30, 90, 180)),
+                "pagado" if rnd.random() < 0.8 else "pendiente",
+                sum(linea[3] for linea in lineas), fecha.date(),
+            )
+            yield orden, lineas, [(next(oe_id), orden_id, e) for e in empleados]
+
+
+def _reset_sequences(conn, tables):
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
+
+
+def generate(engine, productos: int = 1000, servicios: int = 30, empleados: int = 15,
+             ventas: int = 10_000, ordenes: int = 5_000, seed: int = 42, batch_size: int = 20_000,
+             reset: bool = False, verbose: bool = True) -> dict:
+    """
+    Crea las tablas (borrándolas antes si `reset`) e inserta el dataset.
+    Devuelve la cantidad de filas insertadas por tabla.
+    """
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Producto.__table__)).scalar():
+            raise RuntimeError("La base de datos ya tiene productos; usar --reset para regenerarla")
+
+    gen = Generator(productos, servicios, empleados, ventas, ordenes, seed=seed)
+    counts = {}
+
+    def report(name, n, elapsed):
+        counts[name] = n
+        if verbose:
+            print(f"  {name:<16} {n:>11,} filas  {n / elapsed if elapsed else 0:>10,.0f} filas/s")
+
+    def load(conn, model, columns, rows):
+        started = time.perf_counter()
+        n = bulk_insert(conn, model.__table__, columns, rows, batch_size)
+        report(model.__tablename__, n, time.perf_counter() - started)
+
+    with engine.begin() as conn:
+        load(conn, Producto, ["id", "nombre", "descripcion", "precioVenta", "precioCompra", "marca",
+                              "categoria", "stock", "stockMin", "codBarras", "img", "tipo"], gen.productos())
+        load(conn, Autoparte, ["id", "modelo", "anio"], gen.autopartes())
+        load(conn, Servicio, ["id", "nombre", "descripcion"], gen.servicios())
+        load(conn, Empleado, ["id", "nombres", "apellidos", "estado", "especialidad"], gen.empleados())
+
+    with engine.begin() as conn:
+        load(conn, Venta, ["id", "fecha"], gen.ventas())
+        load(conn, VentaProducto, ["id", "venta_id", "producto_id", "cantidad", "precio_unitario", "costo_unitario"],
+             gen.venta_productos())
+
+    with engine.begin() as conn:
+        # Las órdenes y sus líneas se generan juntas; se insertan por lotes
+        started = time.perf_counter()
+        totals = {"ordenes": 0, "orden_servicio": 0, "orden_empleado": 0}
+        for batch in _batched(gen.ordenes_y_lineas(), batch_size):
+            totals["ordenes"] += bulk_insert(
+                conn, Orden.__table__, ["id", "garantia", "estadoPago", "precio", "fecha"],
+                (o for o, _, _ in batch), batch_size)
+            totals["orden_servicio"] += bulk_insert(
+                conn, OrdenServicio.__table__, ["id", "orden_id", "servicio_id", "precio_servicio"],
+                itertools.chain.from_iterable(ls for _, ls, _ in batch), batch_size)
+            totals["orden_empleado"] += bulk_insert(
+                conn, OrdenEmpleado.__table__, ["id", "orden_id", "empleado_id"],
+                itertools.chain.from_iterable(es for _, _, es in batch), batch_size)
+        elapsed = time.perf_counter() - started
+        for name, n in totals.items():
+            report(name, n, elapsed)
+        _reset_sequences(conn, [t for t in Base.metadata.sorted_tables if "id" in t.c])
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos para pruebas de carga")
+    parser.add_argument("--url", default=settings.DATABASE_URL, help="URL de la base de datos (por defecto DATABASE_URL)")
+    parser.add_argument("--productos", type=int, default=1000)
+    parser.add_argument("--servicios", type=int, default=30)
+    parser.add_argument("--empleados", type=int, default=15)
+    parser.add_argument("--ventas", type=int, default=10_000)
+    parser.add_argument("--ordenes", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--reset", action="store_true", help="Borrar y recrear todas las tablas antes de insertar")
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    started = time.perf_counter()
+    print(f"Generando datos en {engine.url.render_as_string(hide_password=True)}")
+    try:
+        counts = generate(
+            engine, productos=args.productos, servicios=args.servicios, empleados=args.empleados,
+            ventas=args.ventas, ordenes=args.ordenes, seed=args.seed, batch_size=args.batch_size,
+            reset=args.reset,
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
+    total = sum(counts.values())
+    print(f"✅ {total:,} filas insertadas en {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
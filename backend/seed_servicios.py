@@ -4,12 +4,9 @@ Script para insertar datos de ejemplo de servicios en la base de datos.
 Ejecutar con: python -m backend.seed_servicios
 """
 
-from db.base import SessionLocal, engine, Base
+from db.base import SessionLocal, get_engine, Base
 from db.models.servicio import Servicio
 
-# Crear todas las tablas
-Base.metadata.create_all(bind=engine)
-
 # Datos de ejemplo
 servicios_ejemplo = [
     {
@@ -36,6 +33,8 @@ servicios_ejemplo = [
 
 def seed_servicios():
     """Inserta servicios de ejemplo en la base de datos."""
+    # Crear todas las tablas
+    Base.metadata.create_all(bind=get_engine())
     db = SessionLocal()
     
     try:
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from core.cache import cache
+from core.conditional import weak_etag
+from core.compression import Precompressed
+from core.config import settings
+from core.serialization import dumps
+from repositories.dashboard_repo import DashboardRepository
+
+
+class DashboardService:
+
+    def __init__(self, db: Session):
+        self.repo = DashboardRepository(db)
+
+    def dashboard_json(self) -> tuple[Precompressed, str]:
+        """
+        Cuerpo del dashboard y su ETag. Se cachea unos segundos
+        (DASHBOARD_CACHE_SECONDS): los totales no se invalidan con cada
+        escritura, basta con que no queden viejos por mucho tiempo. El cuerpo
+        solo tiene los totales, así que el ETag no cambia mientras no cambien.
+        """
+        def load():
+            t = self.repo.totales(datetime.now())
+            body = dumps({
+                "productos": {"total": t["productos"], "bajo_stock": t["productos_bajo_stock"]},
+                "servicios": t["servicios"],
+                "empleados": {"total": t["empleados"], "activos": t["empleados_activos"]},
+                "ordenes": {
+                    "total": t["ordenes"],
+                    "pendientes_pago": t["ordenes_pendientes"],
+                    "por_cobrar": t["por_cobrar"],
+                },
+                "ventas": {"cantidad_hoy": t["ventas_hoy"], "ingresos_hoy": t["ingresos_hoy"]},
+            })
+            return Precompressed(body), weak_etag(body)
+
+        return cache.get_or_set('dashboard', load, ttl_seconds=settings.DASHBOARD_CACHE_SECONDS)
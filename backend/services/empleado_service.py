@@ -1,6 +1,11 @@
 from sqlalchemy.orm import Session
 from repositories.empleado_repo import EmpleadoRepository
-from schemas.empleado_schema import EmpleadoCreate
+from schemas.empleado_schema import EmpleadoCreate, EmpleadoResponse
+from core.batch import fetch_batch
+from core.cache import cache
+from core.serialization import dumps, fieldset_encoder, row_encoder
+
+_encode_empleado = row_encoder(EmpleadoResponse)
 
 class EmpleadoService:
 
@@ -13,16 +18,35 @@ class EmpleadoService:
             raise ValueError("Ya existe un empleado con ese nombre")
         empleado_data = data
         empleado = self.repo.create(empleado_data)
+        
+        # Invalidar caché (lecturas en lote)
+        cache.invalidate_pattern('empleados')
+        
         return empleado
     
     def list_empleados(self):
         return self.repo.get_all()
     
+    def list_empleados_json(self, fields: tuple[str, ...] | None = None) -> bytes:
+        encode = fieldset_encoder(EmpleadoResponse, fields)
+        return dumps([encode(row) for row in self.repo.get_all_rows(fields)])
+    
     def get_by_id(self, id: int):
         return self.repo.get_by_id(id)
+    
+    def get_by_id_json(self, id: int, fields: tuple[str, ...] | None = None) -> bytes | None:
+        row = self.repo.get_row_by_id(id, fields)
+        return dumps(fieldset_encoder(EmpleadoResponse, fields)(row)) if row is not None else None
+
+    def get_batch_json(self, ids: list[int]) -> bytes:
+        return fetch_batch(ids, 'empleados_item_', self.repo.get_rows_by_ids, _encode_empleado)
 
     def update_empleado(self, id: int, data: EmpleadoCreate):
-        return self.repo.update(id, data)
+        empleado = self.repo.update(id, data)
+        cache.delete(f'empleados_item_{id}')
+        return empleado
     
     def delete_empleado(self, id: int):
-        return self.repo.delete(id)
\ No newline at end of file
+        result = self.repo.delete(id)
+        cache.delete(f'empleados_item_{id}')
+        return result
\ No newline at end of file
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from repositories.inventario_repo import InventarioRepository
+
+
+class InventarioService:
+
+    def __init__(self, db: Session):
+        self.repo = InventarioRepository(db)
+
+    def stock_history(self, producto_id: int, desde: datetime | None, hasta: datetime | None, limit: int) -> dict | None:
+        if not self.repo.producto_exists(producto_id):
+            return None
+        # Sin desde: desde el inicio del libro (stock inicial 0)
+        hasta = hasta or datetime.now()
+        stock_inicial = self.repo.stock_at(producto_id, desde) if desde else 0
+        rows = self.repo.get_movimientos(producto_id, desde, hasta, limit + 1)
+        has_more = len(rows) > limit
+
+        stock = stock_inicial
+        movimientos = []
+        for row in rows[:limit]:
+            stock += row["cantidad"]
+            movimientos.append({**row, "stock": stock})
+
+        return {
+            "producto_id": producto_id,
+            "desde": desde,
+            "hasta": hasta,
+            "stock_inicial": stock_inicial,
+            "stock_final": self.repo.stock_at(producto_id, hasta) if has_more else stock,
+            "has_more": has_more,
+            "movimientos": movimientos,
+        }
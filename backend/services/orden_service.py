@@ -1,7 +1,26 @@
 from sqlalchemy.orm import Session
 from repositories.orden_repo import OrdenRepository
-from schemas.orden_schema import OrdenCreate
+from schemas.orden_schema import (
+    OrdenCreate,
+    OrdenEmpleadoResponse,
+    OrdenResponse,
+    OrdenServicioBase,
+    OrdenServicioResponse,
+    OrdenServicioUpdate,
+)
+from schemas.servicio_schema import ServicioResponse
+from schemas.empleado_schema import EmpleadoResponse
 from fastapi import HTTPException
+from core.serialization import dumps, row_encoder
+from core.streaming import GroupedRows
+
+_encode_orden = row_encoder(OrdenResponse)
+_encode_orden_servicio = row_encoder(OrdenServicioResponse)
+_encode_orden_empleado = row_encoder(OrdenEmpleadoResponse)
+_encode_servicio = row_encoder(ServicioResponse)
+_encode_empleado = row_encoder(EmpleadoResponse)
+_encode_servicio_unido = row_encoder(ServicioResponse, prefix="servicio__")
+_encode_empleado_unido = row_encoder(EmpleadoResponse, prefix="empleado__")
 
 class OrdenService:
     
@@ -29,15 +48,89 @@ class OrdenService:
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
-        # Caso simple: solo la orden
+        # Caso simple: solo la orden, sin líneas de las que derivar el precio
+        if data.precio is None:
+            raise HTTPException(status_code=400, detail="El precio es obligatorio si la orden no tiene servicios")
         return self.repo.create(data.garantia, data.estadoPago, data.precio, data.fecha)
 
     def list_ordens(self):
         return self.repo.get_all()
 
+    def list_ordens_json(self) -> bytes:
+        return self._ordenes_json(self.repo.get_rows())
+
+    def get_by_fecha_json(self, fecha) -> bytes:
+        return self._ordenes_json(self.repo.get_rows(fecha))
+
+    def _ordenes_json(self, rows) -> bytes:
+        return dumps(self.ordenes_data(rows))
+
+    @staticmethod
+    def ordenes_data(rows) -> list[dict]:
+        # Misma forma que list[OrdenResponse], armada desde filas Core
+        ordenes, servicios, empleados, catalogo_servicios, catalogo_empleados = rows
+        servicios_por_id = {row["id"]: _encode_servicio(row) for row in catalogo_servicios}
+        empleados_por_id = {row["id"]: _encode_empleado(row) for row in catalogo_empleados}
+
+        servicios_por_orden: dict[int, list] = {}
+        for row in servicios:
+            item = _encode_orden_servicio(row)
+            item["servicio"] = servicios_por_id.get(row["servicio_id"])
+            servicios_por_orden.setdefault(row["orden_id"], []).append(item)
+        empleados_por_orden: dict[int, list] = {}
+        for row in empleados:
+            item = _encode_orden_empleado(row)
+            item["empleado"] = empleados_por_id.get(row["empleado_id"])
+            empleados_por_orden.setdefault(row["orden_id"], []).append(item)
+
+        data = []
+        for row in ordenes:
+            orden = _encode_orden(row)
+            orden["servicios"] = servicios_por_orden.get(row["id"], [])
+            orden["empleados"] = empleados_por_orden.get(row["id"], [])
+            data.append(orden)
+        return data
+
+    def iter_ordenes(self):
+        # Exportación en streaming: órdenes, servicios y empleados avanzan a la par
+        ordenes, servicios, empleados = self.repo.iter_rows()
+        servicios = GroupedRows(servicios, "orden_id")
+        empleados = GroupedRows(empleados, "orden_id")
+        for row in ordenes:
+            orden = _encode_orden(row)
+            orden["servicios"] = []
+            for item in servicios.take(row["id"]):
+                linea = _encode_orden_servicio(item)
+                linea["servicio"] = _encode_servicio_unido(item) if item["servicio__id"] is not None else None
+                orden["servicios"].append(linea)
+            orden["empleados"] = []
+            for item in empleados.take(row["id"]):
+                linea = _encode_orden_empleado(item)
+                linea["empleado"] = _encode_empleado_unido(item) if item["empleado__id"] is not None else None
+                orden["empleados"].append(linea)
+            yield orden
+
     def get_by_id(self, id: int):
         return self.repo.get_by_id(id)
 
+    def add_servicio(self, orden_id: int, data: OrdenServicioBase):
+        try:
+            return self.repo.add_servicio(orden_id, data.servicio_id, data.precio_servicio)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def update_servicio(self, orden_id: int, linea_id: int, data: OrdenServicioUpdate):
+        try:
+            return self.repo.update_servicio(orden_id, linea_id, data.precio_servicio)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def remove_servicio(self, orden_id: int, linea_id: int):
+        try:
+            return self.repo.remove_servicio(orden_id, linea_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     def get_by_fecha(self, fecha):
         return self.repo.get_by_fecha(fecha)
 
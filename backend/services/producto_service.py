@@ -1,13 +1,53 @@
 from sqlalchemy.orm import Session
 from repositories.producto_repo import ProductoRepository
-from schemas.producto_schema import ProductoCreate
+from repositories.barcode_repo import BarcodeRepository
+from schemas.producto_schema import ProductoCreate, ProductoResponse
 from core.cache import cache
+from core.config import settings
+from core.barcodes import build_barcode, category_code
+from core.batch import fetch_batch
+from core.labels import encodable
+from core.compression import Precompressed
+from core.serialization import dumps, fields_key, fieldset_encoder, row_encoder
+from db.base import session_loader
+
+_encode_producto = row_encoder(ProductoResponse)
+
+
+# Cargadores de caché con sesión propia: se refrescan en segundo plano,
+# cuando la sesión de la petición ya se cerró
+
+def _load_list(db: Session):
+    return ProductoRepository(db).get_all()
+
+
+def _load_list_json(db: Session, fields: tuple[str, ...] | None):
+    encode = fieldset_encoder(ProductoResponse, fields)
+    return Precompressed(dumps([encode(row) for row in ProductoRepository(db).get_all_rows(fields)]))
+
+
+def _load_item_json(db: Session, id: int, fields: tuple[str, ...] | None):
+    row = ProductoRepository(db).get_row_by_id(id, fields)
+    if row is None:
+        return None
+    return Precompressed(dumps(fieldset_encoder(ProductoResponse, fields)(row)))
+
+
+def _load_item(db: Session, id: int):
+    return ProductoRepository(db).get_by_id(id)
+
+
+def _load_barcode_map():
+    # Desde el listado en caché (sin sesión propia)
+    productos = cache.get_or_refresh('productos_list', session_loader(_load_list))
+    return {p.codBarras: p.id for p in productos if p.codBarras}
 
 
 class ProductoService:
 
     def __init__(self, db: Session):
         self.repo = ProductoRepository(db)
+        self.barcodes = BarcodeRepository(db)
     
     def create_producto(self, data: ProductoCreate):
         if self.repo.get_by_name(data.nombre):
@@ -21,39 +61,58 @@ class ProductoService:
         return producto
     
     def list_productos(self):
-        # Intentar obtener del caché
-        cached = cache.get('productos_list')
-        if cached is not None:
-            return cached
-        
-        # Si no está en caché, obtener de la BD
-        productos = self.repo.get_all()
-        
-        # Guardar en caché por 5 minutos
-        cache.set('productos_list', productos, ttl_seconds=300)
-        
-        return productos
+        # Desde el caché; vencido el TTL blando se sirve igual y se refresca
+        # en segundo plano, y si falta, una sola consulta para todos
+        return cache.get_or_refresh('productos_list', session_loader(_load_list))
+    
+    def list_productos_json(self, fields: tuple[str, ...] | None = None) -> Precompressed:
+        # Cuerpo JSON ya serializado (y precomprimido) desde filas Core;
+        # cada conjunto de ?fields= es una variante de caché distinta
+        return cache.get_or_refresh(f'productos_list_json{fields_key(fields)}',
+                                    session_loader(_load_list_json, fields))
+    
+    def get_by_id_json(self, id: int, fields: tuple[str, ...] | None = None) -> Precompressed | None:
+        # Clave con prefijo 'productos' para que toda escritura la invalide
+        return cache.get_or_refresh(f'productos_item_{id}{fields_key(fields)}',
+                                    session_loader(_load_item_json, id, fields))
+    
+    def get_batch_json(self, ids: list[int]) -> bytes:
+        # Comparte la caché de detalle (productos_item_{id}) con get_by_id_json
+        return fetch_batch(
+            ids, 'productos_item_', self.repo.get_rows_by_ids, _encode_producto,
+            ttl_seconds=settings.CACHE_HARD_TTL_SECONDS, soft_ttl_seconds=settings.CACHE_SOFT_TTL_SECONDS,
+            loader_for=lambda id: session_loader(_load_item_json, id, None),
+        )
+    
+    def get_by_barcode_json(self, codBarras: str, fields: tuple[str, ...] | None = None) -> Precompressed | None:
+        producto_id = self.get_barcode_map().get(codBarras)
+        if producto_id is None:
+            producto = self.repo.get_by_barcode(codBarras)
+            if not producto:
+                return None
+            producto_id = producto.id
+        return self.get_by_id_json(producto_id, fields)
+    
+    def iter_productos(self):
+        # Exportación en streaming (sin caché: recorre el cursor)
+        for row in self.repo.iter_rows():
+            yield _encode_producto(row)
     
     def get_by_id(self, id: int):
-        # Intentar obtener del caché
-        cache_key = f'producto_{id}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-        
-        # Si no está en caché, obtener de la BD
-        producto = self.repo.get_by_id(id)
-        
-        # Guardar en caché
-        if producto:
-            cache.set(cache_key, producto, ttl_seconds=300)
-        
-        return producto
+        # Desde el caché; un producto inexistente (None) no se guarda
+        return cache.get_or_refresh(f'producto_{id}', session_loader(_load_item, id))
     
     def get_by_name(self, nombre: str):
         return self.repo.get_by_name(nombre)
     
+    def get_barcode_map(self):
+        # Mapa codBarras -> id construido desde el listado (se precalienta al arrancar)
+        return cache.get_or_refresh('productos_barcode_map', _load_barcode_map)
+    
     def get_by_barcode(self, codBarras: str):
+        producto_id = self.get_barcode_map().get(codBarras)
+        if producto_id is not None:
+            return self.get_by_id(producto_id)
         return self.repo.get_by_barcode(codBarras)
     
     def update_producto(self, id: int, data: ProductoCreate):
@@ -65,6 +124,40 @@ class ProductoService:
         
         return producto
     
+    def label_rows(self, ids: list[int] | None, categoria: str | None) -> tuple[list[tuple[str, str]], list[int]]:
+        """
+        (codigo, nombre) de las etiquetas a imprimir, en el orden pedido, y
+        los ids que no existen o cuyo código de barras no se puede imprimir.
+        """
+        rows = self.repo.get_label_rows(ids, categoria)
+        if ids is not None:
+            por_id = {row.id: row for row in rows}
+            rows = [por_id[id] for id in ids if id in por_id]
+        labels = [(row.codBarras, row.nombre) for row in rows if encodable(row.codBarras)]
+        omitidos = [row.id for row in rows if not encodable(row.codBarras)]
+        if ids is not None:
+            encontrados = {row.id for row in rows}
+            omitidos += [id for id in ids if id not in encontrados]
+        return labels, omitidos
+    
+    def allocate_barcodes(self, categoria: str, count: int) -> dict:
+        codigo = category_code(categoria)
+        secuencias = self.barcodes.allocate(codigo, count)
+        return {
+            "categoria": categoria,
+            "codigo_categoria": codigo,
+            "codigos": [build_barcode(n, categoria) for n in secuencias],
+        }
+    
+    def ajustar_stock(self, id: int, cantidad: int, motivo: str):
+        producto = self.repo.adjust_stock(id, cantidad, motivo)
+        
+        # Invalidar caché
+        cache.delete(f'producto_{id}')
+        cache.invalidate_pattern('productos')
+        
+        return producto
+    
     def delete_producto(self, id: int):
         try:
             result = self.repo.delete(id)
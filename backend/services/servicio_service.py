@@ -1,7 +1,37 @@
 from sqlalchemy.orm import Session
 from repositories.servicio_repo import ServicioRepository
-from schemas.servicio_schema import ServicioCreate
+from schemas.servicio_schema import ServicioCreate, ServicioResponse
 from core.cache import cache
+from core.config import settings
+from core.batch import fetch_batch
+from core.compression import Precompressed
+from core.serialization import dumps, fields_key, fieldset_encoder, row_encoder
+from db.base import session_loader
+
+_encode_servicio = row_encoder(ServicioResponse)
+
+
+# Cargadores de caché con sesión propia (se refrescan en segundo plano)
+
+def _load_list(db: Session):
+    return ServicioRepository(db).get_all()
+
+
+def _load_list_json(db: Session, fields: tuple[str, ...] | None):
+    encode = fieldset_encoder(ServicioResponse, fields)
+    return Precompressed(dumps([encode(row) for row in ServicioRepository(db).get_all_rows(fields)]))
+
+
+def _load_item_json(db: Session, id: int, fields: tuple[str, ...] | None):
+    row = ServicioRepository(db).get_row_by_id(id, fields)
+    if row is None:
+        return None
+    return Precompressed(dumps(fieldset_encoder(ServicioResponse, fields)(row)))
+
+
+def _load_item(db: Session, id: int):
+    return ServicioRepository(db).get_by_id(id)
+
 
 class ServicioService:
 
@@ -20,31 +50,29 @@ class ServicioService:
         return servicio
     
     def list_servicios(self):
-        # Intentar obtener del caché
-        cached = cache.get('servicios_list')
-        if cached is not None:
-            return cached
-        
-        # Si no está en caché, obtener de la BD
-        servicios = self.repo.get_all()
-        
-        # Guardar en caché por 5 minutos
-        cache.set('servicios_list', servicios, ttl_seconds=300)
-        
-        return servicios
+        # Desde el caché; vencido el TTL blando se sirve igual y se refresca
+        # en segundo plano, y si falta, una sola consulta para todos
+        return cache.get_or_refresh('servicios_list', session_loader(_load_list))
+    
+    def list_servicios_json(self, fields: tuple[str, ...] | None = None) -> Precompressed:
+        # Listado con ?fields=: proyección SQL y una variante de caché por conjunto
+        return cache.get_or_refresh(f'servicios_list_json{fields_key(fields)}',
+                                    session_loader(_load_list_json, fields))
+    
+    def get_by_id_json(self, id: int, fields: tuple[str, ...] | None = None) -> Precompressed | None:
+        return cache.get_or_refresh(f'servicios_item_{id}{fields_key(fields)}',
+                                    session_loader(_load_item_json, id, fields))
+    
+    def get_batch_json(self, ids: list[int]) -> bytes:
+        # Comparte la caché de detalle (servicios_item_{id}) con get_by_id_json
+        return fetch_batch(
+            ids, 'servicios_item_', self.repo.get_rows_by_ids, _encode_servicio,
+            ttl_seconds=settings.CACHE_HARD_TTL_SECONDS, soft_ttl_seconds=settings.CACHE_SOFT_TTL_SECONDS,
+            loader_for=lambda id: session_loader(_load_item_json, id, None),
+        )
     
     def get_by_id(self, id: int):
-        cache_key = f'servicio_{id}'
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-        
-        servicio = self.repo.get_by_id(id)
-        
-        if servicio:
-            cache.set(cache_key, servicio, ttl_seconds=300)
-        
-        return servicio
+        return cache.get_or_refresh(f'servicio_{id}', session_loader(_load_item, id))
     
     def get_by_name(self, nombre: str):
         return self.repo.get_by_name(nombre)
@@ -0,0 +1,88 @@
+from sqlalchemy.orm import Session
+
+from core.serialization import dumps, row_encoder
+from repositories.change_log_repo import ChangeLogRepository
+from repositories.empleado_repo import EmpleadoRepository
+from repositories.orden_repo import OrdenRepository
+from repositories.producto_repo import ProductoRepository
+from repositories.servicio_repo import ServicioRepository
+from schemas.empleado_schema import EmpleadoResponse
+from schemas.producto_schema import ProductoResponse
+from schemas.servicio_schema import ServicioResponse
+from services.orden_service import OrdenService
+
+_ENCODERS = {
+    "productos": row_encoder(ProductoResponse),
+    "servicios": row_encoder(ServicioResponse),
+    "empleados": row_encoder(EmpleadoResponse),
+}
+ENTITIES = ("productos", "servicios", "empleados", "ordenes")
+
+
+def _versioned(item: dict, row) -> dict:
+    item["row_version"] = row["row_version"]
+    item["updated_at"] = row["updated_at"]
+    return item
+
+
+class SyncService:
+    """
+    Feed de cambios para la caché offline del frontend: devuelve solo lo que
+    cambió desde un token (id de change_log) en lugar del catálogo completo.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.log = ChangeLogRepository(db)
+        self.repos = {
+            "productos": ProductoRepository(db),
+            "servicios": ServicioRepository(db),
+            "empleados": EmpleadoRepository(db),
+        }
+        self.ordenes = OrdenRepository(db)
+
+    def changes(self, since: int | None, limit: int) -> bytes:
+        # Los ids de change_log se hacen visibles en orden (ver
+        # db/change_tracking.py): el token nunca salta un cambio
+        if since is None:
+            # Cliente sin caché: instantánea completa y token actual
+            return dumps({
+                "since": since,
+                "next": self.log.latest_id(),
+                "has_more": False,
+                "reset": True,
+                "changes": {name: {"upserts": self._rows(name), "deletes": []} for name in ENTITIES},
+            })
+
+        entries = self.log.get_since(since, limit)
+        latest: dict[str, dict[int, str]] = {name: {} for name in ENTITIES}
+        for entry in entries:
+            latest[entry.entidad][entry.entidad_id] = entry.operacion
+
+        changes = {}
+        for name, ops in latest.items():
+            upsert_ids = [entity_id for entity_id, op in ops.items() if op == "upsert"]
+            upserts = self._rows(name, upsert_ids) if upsert_ids else []
+            # Modificada y luego borrada fuera de esta página: también es baja
+            found = {item["id"] for item in upserts}
+            deletes = [entity_id for entity_id, op in ops.items() if op == "delete" or entity_id not in found]
+            changes[name] = {"upserts": upserts, "deletes": deletes}
+
+        return dumps({
+            "since": since,
+            "next": entries[-1].id if entries else since,
+            "has_more": len(entries) == limit,
+            "reset": False,
+            "changes": changes,
+        })
+
+    def _rows(self, name: str, ids: list[int] | None = None) -> list[dict]:
+        if name == "ordenes":
+            rows = self.ordenes.get_rows(ids=ids)
+            versions = {row["id"]: row for row in rows[0]}
+            return [_versioned(item, versions[item["id"]]) for item in OrdenService.ordenes_data(rows)]
+
+        repo = self.repos[name]
+        rows = repo.get_all_rows() if ids is None else repo.get_rows_by_ids(ids)
+        encode = _ENCODERS[name]
+        return [_versioned(encode(row), row) for row in rows]
@@ -4,7 +4,17 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from repositories.venta_repo import VentaRepository
-from schemas.venta_schema import VentaCreate
+from schemas.producto_schema import ProductoResponse
+from schemas.venta_schema import VentaCreate, VentaProductoResponse, VentaResponse
+from core.cache import cache
+from core.serialization import dumps, row_encoder
+from core.streaming import GroupedRows
+
+# total se calcula a partir de las líneas ya agrupadas
+_encode_venta = row_encoder(VentaResponse, fields=tuple(f for f in VentaResponse.model_fields if f != "total"))
+_encode_linea = row_encoder(VentaProductoResponse)
+_encode_producto = row_encoder(ProductoResponse)
+_encode_producto_unido = row_encoder(ProductoResponse, prefix="producto__")
 
 
 
@@ -18,14 +28,65 @@ class VentaService:
         if productos:
             productos_list = [p.model_dump() if hasattr(p, 'model_dump') else p for p in productos]
             try:
-                return self.repo.create_with_products(data.fecha, productos_list)
+                venta = self.repo.create_with_products(data.fecha, productos_list)
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
+            
+            # El stock cambió: invalidar productos en caché
+            for item in productos_list:
+                cache.delete(f"producto_{item['producto_id']}")
+            cache.invalidate_pattern('productos')
+            
+            return venta
         return self.repo.create(data.fecha)
 
     def list_ventas(self):
         return self.repo.get_all()
 
+    def list_ventas_json(self) -> bytes:
+        return self._ventas_json(self.repo.get_rows())
+
+    def get_by_fecha_json(self, fecha: datetime) -> bytes:
+        return self._ventas_json(self.repo.get_rows(fecha))
+
+    def _ventas_json(self, rows) -> bytes:
+        # Misma forma que list[VentaResponse], armada desde filas Core
+        ventas, lineas, productos = rows
+        productos_por_id = {row["id"]: _encode_producto(row) for row in productos}
+        lineas_por_venta: dict[int, list] = {}
+        for row in lineas:
+            linea = _encode_linea(row)
+            linea["producto"] = productos_por_id.get(row["producto_id"])
+            lineas_por_venta.setdefault(row["venta_id"], []).append(linea)
+
+        data = []
+        for row in ventas:
+            venta = _encode_venta(row)
+            venta["productos"] = lineas_por_venta.get(row["id"], [])
+            venta["total"] = sum(linea["subtotal"] for linea in venta["productos"])
+            data.append(venta)
+        return dumps(data)
+
+    def iter_ventas(self):
+        # Exportación en streaming: ventas y líneas avanzan a la par
+        ventas, lineas = self.repo.iter_rows()
+        lineas = GroupedRows(lineas, "venta_id")
+        for row in ventas:
+            venta = _encode_venta(row)
+            venta["productos"] = [self._linea_unida(l) for l in lineas.take(row["id"])]
+            venta["total"] = sum(linea["subtotal"] for linea in venta["productos"])
+            yield venta
+
+    @staticmethod
+    def _linea_unida(row) -> dict:
+        linea = _encode_linea(row)
+        linea["producto"] = _encode_producto_unido(row) if row["producto__id"] is not None else None
+        return linea
+
+    def resumen(self, desde: datetime | None, hasta: datetime | None) -> dict:
+        totales = self.repo.resumen(desde, hasta)
+        return {"desde": desde, "hasta": hasta, **totales, "margen": totales["ingresos"] - totales["costo"]}
+
     def get_by_id(self, id: int):
         return self.repo.get_by_id(id)
 
@@ -0,0 +1,61 @@
+"""
+La ruta rápida de los listados (filas Core + orjson, ver core/serialization.py)
+debe devolver el mismo JSON que el response_model de Pydantic, también con
+?fields= y con los totales de ventas calculados desde las líneas.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+LISTADOS = ["/api/v1/productos/", "/api/v1/servicios/", "/api/v1/ventas/", "/api/v1/ordenes/"]
+CAMPOS = ("id", "nombre", "stock", "precioVenta")
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    from benchmarks.api import _prepare
+    from core.config import settings
+    from db.base import dispose_engine
+    from main import app
+
+    url = settings.DATABASE_URL
+    _prepare(f"sqlite:///{tmp_path_factory.mktemp('serializacion') / 'test.db'}", 60)
+    yield TestClient(app)
+    dispose_engine()
+    settings.DATABASE_URL = url
+
+
+def _get(client, path: str, response_class: str, params: dict | None = None):
+    from core.cache import cache
+    from core.config import settings
+
+    previous = settings.JSON_RESPONSE_CLASS
+    settings.JSON_RESPONSE_CLASS = response_class
+    cache.clear()
+    try:
+        response = client.get(path, params=params)
+    finally:
+        settings.JSON_RESPONSE_CLASS = previous
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("path", LISTADOS)
+def test_ruta_rapida_igual_a_response_model(client, path):
+    esperado = _get(client, path, "json")
+    assert esperado
+    assert _get(client, path, "orjson") == esperado
+
+
+def test_fields_es_proyeccion_del_response_model(client):
+    completo = _get(client, "/api/v1/productos/", "json")
+    proyectado = _get(client, "/api/v1/productos/", "orjson", {"fields": ",".join(CAMPOS)})
+    assert proyectado == [{campo: item[campo] for campo in CAMPOS} for item in completo]
+
+
+def test_totales_de_ventas(client):
+    ventas = _get(client, "/api/v1/ventas/", "orjson")
+    assert any(venta["productos"] for venta in ventas)
+    for venta in ventas:
+        for linea in venta["productos"]:
+            assert linea["subtotal"] == linea["cantidad"] * linea["precio_unitario"]
+        assert venta["total"] == sum(linea["subtotal"] for linea in venta["productos"])
@@ -1,4 +1,4 @@
-import { createResource, updateResource, fetchFromApi } from "../../data-manager.js";
+import { createResource, updateResource, fetchFromApi, allocateBarcode } from "../../data-manager.js";
 import { showNotification } from "../../utils/notification.js";
 import { uploadImage, updateImage, compressImage } from "../../utils/store/manager-image.js";
 import { closeModalForm } from "./modal-product.js";
@@ -48,233 +48,6 @@ function containsForbiddenContent(value) {
   return false;
 }
 
-// ========================================
-// GENERADOR DE CÓDIGOS DE BARRAS
-// ========================================
-
-/**
- * Genera un código de barras único con el formato: T-A001-CAT (Base-26 alfanumérica)
- * Verifica que no exista en la base de datos antes de retornarlo
- * 
- * Formato: T-[LETRAS][NÚMEROS]-[CATEGORÍA]
- * - T: Prefijo del taller
- * - A-ZZ: Secuencia alfanumérica base-26 (A, B, ..., Z, AA, AB, ..., ZZ)
- * - 001-999: Número secuencial con padding de 3 dígitos
- * - CAT: Código de 3 letras de la categoría
- * 
- * Capacidad: 675,999 combinaciones (26 letras simples + 676 letras dobles × 999 números)
- * 
- * Secuencia de ejemplo:
- * - A001 a A999 (999 productos)
- * - B001 a Z999 (25 × 999 = 24,975 productos)
- * - AA001 a AZ999 (26 × 999 = 25,974 productos)
- * - BA001 a ZZ999 (650 × 999 = 649,350 productos)
- * 
- * @param {string} categoria - Categoría del producto (ej: "Filtros", "Aceites")
- * @param {number} lastId - Último ID registrado en la base de datos
- * @param {Array} existingBarcodes - Array de códigos existentes para verificar unicidad
- * @returns {string} Código de barras único generado (ej: "T-A001-FIL")
- * 
- * @example
- * generateBarcode("Filtros", 0, [])    // "T-A001-FIL"
- * generateBarcode("Aceites", 999, [])  // "T-B001-ACE"
- * generateBarcode("Filtros", 25999, []) // "T-AA001-FIL"
- */
-function generateBarcode(categoria, lastId, existingBarcodes = []) {
-  // Prefijo fijo del taller
-  const prefix = "T";
-
-  // Generar sufijo de 3 letras basado en la categoría
-  const categorySuffix = getCategorySuffix(categoria);
-
-  let attempts = 0;
-  const maxAttempts = 100; // Límite de intentos para evitar bucles infinitos
-
-  // Intentar generar un código único
-  while (attempts < maxAttempts) {
-    const totalNumber = lastId + 1 + attempts;
-
-    // Convertir a sistema base-26 alfanumérico
-    // Secuencia: A001-A999, B001-B999, ..., Z001-Z999, AA001-AA999, ..., ZZ999
-    const lettersAndNumber = convertToBase26(totalNumber);
-
-    // Formato final: T-A001-FIL
-    const barcode = `${prefix}-${lettersAndNumber}-${categorySuffix}`;
-
-    // Verificar si el código ya existe
-    if (!existingBarcodes.includes(barcode)) {
-      return barcode;
-    }
-
-    attempts++;
-  }
-
-  // Si después de 100 intentos no se encuentra un código único, agregar timestamp
-  const timestamp = Date.now().toString().slice(-3);
-  const randomLetter = String.fromCharCode(65 + Math.floor(Math.random() * 26));
-  const fallbackBarcode = `${prefix}-${randomLetter}${timestamp}-${categorySuffix}`;
-  return fallbackBarcode;
-}
-
-/**
- * Convierte un número a formato base-26 alfanumérico (A001-ZZ999)
- * 
- * @param {number} num - Número a convertir (1-675999)
- * @returns {string} Código en formato base-26 (ej: "A001", "B342", "AA001", "ZZ999")
- * 
- * @example
- * convertToBase26(1)     // "A001"
- * convertToBase26(999)   // "A999"
- * convertToBase26(1000)  // "B001"
- * convertToBase26(25999) // "Z999"
- * convertToBase26(26000) // "AA001"
- */
-function convertToBase26(num) {
-  // Cada letra cubre 999 números
-  const numbersPerLetter = 999;
-
-  // Calcular índice de letra (0-based)
-  const letterIndex = Math.floor((num - 1) / numbersPerLetter);
-
-  // Calcular el número dentro del grupo (1-999)
-  const numberPart = ((num - 1) % numbersPerLetter) + 1;
-
-  // Convertir índice a letras (A, B, ..., Z, AA, AB, ..., ZZ)
-  let letters = '';
-  if (letterIndex < 26) {
-    // Letras simples: A-Z (índices 0-25)
-    letters = String.fromCharCode(65 + letterIndex);
-  } else {
-    // Letras dobles: AA-ZZ (índices 26+)
-    const doubleIndex = letterIndex - 26;
-    const firstLetter = String.fromCharCode(65 + Math.floor(doubleIndex / 26));
-    const secondLetter = String.fromCharCode(65 + (doubleIndex % 26));
-    letters = firstLetter + secondLetter;
-  }
-
-  // Formatear número con padding de 3 dígitos
-  const formattedNumber = numberPart.toString().padStart(3, '0');
-
-  return `${letters}${formattedNumber}`;
-}
-
-/**
- * Obtiene un sufijo de 3 letras basado en la categoría del producto
- * 
- * @param {string} categoria - Nombre de la categoría
- * @returns {string} Sufijo de 3 letras en mayúsculas
- * 
- * @example
- * getCategorySuffix("Filtros")        // "FIL"
- * getCategorySuffix("Aceites")        // "ACE"
- * getCategorySuffix("Llantas")        // "LLA"
- * getCategorySuffix("Herramientas")   // "HER"
- */
-function getCategorySuffix(categoria) {
-  // Mapeo de categorías comunes a códigos de 3 letras
-  const categoryMap = {
-    'Filtros': 'FIL',
-    'Aceites': 'ACE',
-    'Llantas': 'LLA',
-    'Baterías': 'BAT',
-    'Frenos': 'FRE',
-    'Lubricantes': 'LUB',
-    'Herramientas': 'HER',
-    'Repuestos': 'REP',
-    'Accesorios': 'ACC',
-    'Iluminación': 'ILU',
-    'Eléctricos': 'ELE',
-    'Suspensión': 'SUS',
-    'Motor': 'MOT',
-    'Transmisión': 'TRA',
-    'Refrigeración': 'REF',
-    'Combustible': 'COM',
-    'Escape': 'ESC',
-    'Carrocería': 'CAR',
-    'Limpieza': 'LIM',
-    'Seguridad': 'SEG'
-  };
-
-  // Si la categoría existe en el mapa, usar ese código
-  if (categoryMap[categoria]) {
-    return categoryMap[categoria];
-  }
-
-  // Si no, generar código a partir de las primeras 3 letras
-  // Eliminar espacios y acentos, convertir a mayúsculas
-  const cleanCategory = categoria
-    .normalize("NFD")
-    .replace(/[\u0300-\u036f]/g, "") // Eliminar acentos
-    .replace(/\s+/g, "") // Eliminar espacios
-    .toUpperCase()
-    .substring(0, 3);
-
-  return cleanCategory || 'GEN'; // 'GEN' para "General" si falla
-}
-
-/**
- * Obtiene el último ID de producto registrado en la base de datos
- * 
- * @returns {Promise<number>} El ID más alto encontrado, o 0 si no hay productos
- * 
- * @example
- * const lastId = await getLastProductId(); // 45
- */
-async function getLastProductId() {
-  try {
-    // Obtener todos los productos de la base de datos
-    const productos = await fetchFromApi('productos');
-
-    if (!productos || productos.length === 0) {
-      return 0;
-    }
-
-    // Encontrar el ID más alto
-    const maxId = Math.max(...productos.map(p => p.id));
-
-    return maxId;
-  } catch (error) {
-    return 0;
-  }
-}
-
-/**
- * Obtiene todos los códigos de barras existentes en la base de datos
- * para verificar unicidad al generar nuevos códigos
- * 
- * @returns {Promise<Array<string>>} Array de códigos de barras existentes
- * 
- * @example
- * const existingBarcodes = await getExistingBarcodes();
- * // ["TALLER-00001-FIL", "TALLER-00002-ACE", ...]
- */
-async function getExistingBarcodes() {
-  try {
-    // Obtener todos los productos de la base de datos
-    const productos = await fetchFromApi('productos');
-
-    if (!productos || productos.length === 0) {
-      return [];
-    }
-
-    // Filtrar solo los códigos de barras que no sean null o vacíos
-    const barcodes = productos
-      .map(p => p.codBarras)
-      .filter(code => code != null && code !== '');
-
-
-    // Mostrar algunos ejemplos en consola para debug
-    if (barcodes.length > 0) {
-    }
-
-    return barcodes;
-  } catch (error) {
-    return [];
-  }
-}
-
-
-
 export function setupModalEvents(type = 'add', productId = null) {
   const modalOverlay = document.querySelector(".modal-overlay");
   const form = document.getElementById('form-product');
@@ -386,29 +159,6 @@ function setupFormSubmit(form, autopartCheckbox, type = 'add', productId = null)
       descripcion: sanitizeText(rawDescripcion, { allowNewLines: true }),
     };
 
-    // ========================================
-    // GENERACIÓN AUTOMÁTICA DE CÓDIGO DE BARRAS ÚNICO
-    // Solo para productos nuevos (no edición)
-    // ========================================
-    if (!isEdit) {
-      try {
-        // Paso 1: Obtener el último ID
-        const lastId = await getLastProductId();
-
-        // Paso 2: Obtener todos los códigos existentes para verificar unicidad
-        const existingBarcodes = await getExistingBarcodes();
-
-        // Paso 3: Generar código único (verifica que no exista en BD)
-        const barcode = generateBarcode(formData.categoria, lastId, existingBarcodes);
-
-        // Paso 4: Asignar al producto
-        formData.codBarras = barcode;
-      } catch (error) {
-        showNotification('Error al generar código de barras único', 'error');
-        return; // Detener el envío si falla la generación
-      }
-    }
-
     const isAutopart = autopartCheckbox?.checked ?? false;
 
     if (isAutopart) {
@@ -425,6 +175,20 @@ function setupFormSubmit(form, autopartCheckbox, type = 'add', productId = null)
       return; // Detener el envío si hay errores de validación
     }
 
+    // ========================================
+    // CÓDIGO DE BARRAS ÚNICO (solo productos nuevos)
+    // Lo reserva el servidor con una secuencia atómica por categoría:
+    // dos altas simultáneas nunca reciben el mismo código
+    // ========================================
+    if (!isEdit) {
+      const barcode = await allocateBarcode(formData.categoria);
+      if (!barcode) {
+        showNotification('Error al generar código de barras único', 'error');
+        return; // Detener el envío si falla la reserva
+      }
+      formData.codBarras = barcode;
+    }
+
     // El año ya está validado como string (soporta rangos: "2018-2023" o listas: "2018, 2020")
     // No convertir a número, mantener como string
 
@@ -439,25 +203,19 @@ function setupFormSubmit(form, autopartCheckbox, type = 'add', productId = null)
         maxSizeBytes: 5 * 1024 * 1024
       })
 
+      // La imagen se sube primero (al almacén del backend) y su hash va en
+      // la misma petición que el producto
       if (isEdit) {
-        await updateResource(endpoint, productId, formData);
-
-
         if (imageFile) {
-          const imgName = await updateImage(productId, imageCompress, 'productos', 'productos');
-          formData.img = imgName;
-          await updateResource(endpoint, productId, formData);
+          formData.img = await updateImage(productId, imageCompress, 'productos', 'productos');
         }
+        await updateResource(endpoint, productId, formData);
         showNotification("Producto actualizado exitosamente", "success");
       } else {
-        const newProduct = await createResource(endpoint, formData);
-
         if (imageCompress) {
-          const imgName = await uploadImage(imageCompress, newProduct.id, 'productos');
-          formData.img = imgName;
-          await updateResource(endpoint, newProduct.id, formData);
-
+          formData.img = await uploadImage(imageCompress);
         }
+        await createResource(endpoint, formData);
         showNotification(`Producto agregado exitosamente.`, "success");
       }
 
@@ -142,7 +142,7 @@ export async function generateModalHTML(type = 'add', id = null) {
                 </div>
                 ` : ''}
                 ${(isEdit || isView) && data.img ?
-      `<img id="product-preview" class="product-preview show" alt="Vista previa" src="${fetchFromImagen(data.img, 'productos')}" style="display:block;max-width:100%;height:auto;border-radius:8px;margin-top:12px;">` :
+      `<img id="product-preview" class="product-preview show" alt="Vista previa" src="${fetchFromImagen(data.img, 'productos', 'md')}" style="display:block;max-width:100%;height:auto;border-radius:8px;margin-top:12px;">` :
       `<img id="product-preview" class="product-preview" alt="Vista previa" style="display:none">`
     }
                 ${!isView ? `
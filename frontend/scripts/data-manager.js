@@ -4,7 +4,7 @@ import { handleApiError } from "./utils/error-handlers.js";
  * URL base para la API
  * @constant {string}
  */
-const API_BASE_URL = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1'
+export const API_BASE_URL = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1'
   ? 'http://localhost:8000/api/v1'  // Desarrollo local
   : '/api/v1';
 
@@ -222,6 +222,58 @@ export async function countFromApi(endpoint) {
   }
 }
 
+/**
+ * Totales del dashboard en una sola petición (/dashboard).
+ * La respuesta lleva ETag: con `cache: 'no-cache'` el navegador revalida
+ * con If-None-Match y, si nada cambió, reutiliza su copia (304 sin cuerpo).
+ * @returns {Promise<Object|null>} Totales por widget, o null si falla.
+ */
+export async function fetchDashboard() {
+  try {
+    const response = await fetch(`${API_BASE_URL}/dashboard/`, {
+      method: 'GET',
+      cache: 'no-cache',
+    });
+    checkResponseStatus(response);
+    return await response.json();
+  } catch (error) {
+    handleApiError(error, {
+      endpoint: 'dashboard',
+      method: 'GET',
+    });
+    return null;
+  }
+}
+
+/**
+ * Reserva un código de barras nuevo para la categoría
+ * (POST /productos/barcodes/allocate). La secuencia es atómica en el
+ * servidor: dos altas simultáneas nunca reciben el mismo código.
+ * @param {string} categoria - Categoría del producto (ej: 'Filtros').
+ * @returns {Promise<string|null>} Código reservado (ej: 'T-A046-FIL'), o null si falla.
+ */
+export async function allocateBarcode(categoria) {
+  try {
+    const params = new URLSearchParams({ categoria, count: '1' });
+    const response = await fetch(`${API_BASE_URL}/productos/barcodes/allocate?${params}`, {
+      method: 'POST',
+      headers: {
+        'Authorization': token ? `Bearer ${token}` : '',
+      },
+    });
+    checkResponseStatus(response);
+    const data = await response.json();
+    return data.codigos[0] ?? null;
+  } catch (error) {
+    handleApiError(error, {
+      endpoint: 'productos/barcodes/allocate',
+      method: 'POST',
+      data: { categoria },
+    });
+    return null;
+  }
+}
+
 // ========================================
 // FUNCIONES ESPECÍFICAS - PRODUCTOS
 // (Provisionales hasta implementación en backend)
@@ -2,7 +2,7 @@
 // Script principal que manipula el DOM y obtiene datos dinámicos desde data-manager.js
 // Todas las funciones y textos están documentados en español.
 
-import { productUnderStock, countFromApi } from './data-manager.js';
+import { fetchDashboard } from './data-manager.js';
 import { bindAddProductButton } from './componets/modal-product/modal-product.js';
 // ========================================
 // HELPERS DE DOM
@@ -82,34 +82,22 @@ function renderCard(card, title, value) {
 }
 
 /**
- * Renderiza todas las tarjetas del dashboard con datos de la BD
+ * Renderiza todas las tarjetas del dashboard con los totales de /dashboard
+ * @param {Object|null} dashboard - Totales del dashboard
  */
-async function renderCards() {
+function renderCards(dashboard) {
   const cards = $$(selectors.cards);
   if (!cards.length) return;
 
   // Tarjeta 0: Productos en inventario
-  try {
-    const productCount = await countFromApi('productos');
-    renderCard(cards[0], 'Productos en inventario', productCount);
-  } catch (error) {
-    renderCard(cards[0], 'Productos en inventario', 0);
-  }
+  renderCard(cards[0], 'Productos en inventario', dashboard?.productos.total ?? 0);
 
-  // Tarjeta 1: Ventas recientes (mantener estático por ahora)
-  try {
-    const titleEl = $('h3', cards[1]);
-    if (titleEl) titleEl.textContent = 'Ventas recientes';
-  } catch (error) {
-  }
+  // Tarjeta 1: Ventas del día
+  const ingresos = dashboard?.ventas.ingresos_hoy ?? 0;
+  renderCard(cards[1], 'Ventas de hoy', `$${ingresos.toLocaleString('es-CL')}`);
 
   // Tarjeta 2: Servicios activos
-  try {
-    const serviciosCount = await countFromApi('servicios');
-    renderCard(cards[2], 'Servicios activos', serviciosCount);
-  } catch (error) {
-    renderCard(cards[2], 'Servicios activos', 0);
-  }
+  renderCard(cards[2], 'Servicios activos', dashboard?.servicios ?? 0);
 }
 
 /**
@@ -139,12 +127,12 @@ async function init() {
     // 1. Vincular eventos
     bindQuickActions();
 
-    // 2. Cargar y renderizar alerta de bajo stock
-    const lowStockCount = await productUnderStock();
-    renderAlert(lowStockCount);
+    // 2. Una sola petición con todos los totales
+    const dashboard = await fetchDashboard();
 
-    // 3. Cargar y renderizar tarjetas
-    await renderCards();
+    // 3. Renderizar alerta de bajo stock y tarjetas
+    renderAlert(dashboard?.productos.bajo_stock ?? 0);
+    renderCards(dashboard);
 
 
   } catch (error) {
@@ -1,79 +1,98 @@
-import { fetchFromApi } from "../../data-manager.js";
+import { API_BASE_URL, fetchFromApi } from "../../data-manager.js";
 import { handleApiError } from "../error-handlers.js";
 import { showNotification } from "../notification.js";
 import { SUPABASE } from "./data-store.js";
 
 
+// Las imágenes nuevas van al almacén del backend (/imagenes): `img` guarda
+// el hash del contenido y se muestran miniaturas ya redimensionadas. Los
+// productos anteriores conservan en `img` el nombre de su archivo en
+// Supabase Storage, que se sigue sirviendo desde ahí.
+const IMAGE_HASH = /^[0-9a-f]{32}$/;
+
+/**
+ * Indica si `img` es una imagen del almacén del backend (hash de contenido).
+ * @param {string} img - Valor del campo img del producto
+ * @returns {boolean}
+ */
+export function isStoredImage(img) {
+  return IMAGE_HASH.test(img || '');
+}
+
 /**
- * Sube una imagen a Supabase Storage.
+ * Sube una imagen al almacén del backend (POST /imagenes).
  * @param {File} file - Archivo de imagen a subir
- * @param {string|number} idObject - ID usado para nombrar el archivo
- * @param {string} bucket - Nombre del bucket (por defecto 'productos')
- * @returns {Promise<string>} Nombre del archivo subido (ej: "123.jpg")
+ * @returns {Promise<string>} Hash de la imagen, para guardar en `img`
  */
-export async function uploadImage(file, idObject, bucket = 'productos') {
-  if(!file){
+export async function uploadImage(file) {
+  if (!file) {
     showNotification("No se proporcionó ningun archivo", "info");
+    return null;
   }
-  const ext = (file.name.split('.').pop() || '').replace(/[^a-z0-9]/gi, '').toLowerCase();
-  const fileName = `${idObject}.${ext}`;
-
-  const { data, error } = await SUPABASE.storage
-    .from(bucket)
-    .upload(fileName, file, { upsert: true });
+  const body = new FormData();
+  body.append('file', file);
+  const token = localStorage.getItem('supabase_token');
+
+  const response = await fetch(`${API_BASE_URL}/imagenes/`, {
+    method: 'POST',
+    headers: {
+      'Authorization': token ? `Bearer ${token}` : '',
+    },
+    body,
+  });
 
-  if (error) {
-    handleApiError(error);
+  if (!response.ok) {
+    let errorData = null;
+    try {
+      errorData = await response.json();
+    } catch (e) {
+      // Si no se puede parsear, ignorar
+    }
+    const error = new Error(errorData?.detail || `Error HTTP: ${response.status}`);
+    error.status = response.status;
+    error.detail = errorData?.detail;
+    handleApiError(error, { endpoint: 'imagenes', method: 'POST' });
     throw error;
   }
 
-  return fileName;
+  const data = await response.json();
+  return data.hash;
 }
 
 
 /**
- * Actualiza la imagen de un producto existente.
+ * Reemplaza la imagen de un producto existente: sube la nueva y, si la
+ * anterior estaba en Supabase Storage, la elimina. Las del almacén del
+ * backend no se borran (se identifican por contenido y pueden compartirse).
  * @param {string|number} idObject - ID del producto
  * @param {File} file - Nueva imagen
- * @param {string} bucket - Bucket de Supabase
+ * @param {string} bucket - Bucket de Supabase de la imagen anterior
  * @param {string} endpoint - Endpoint de la API (ej: 'productos')
- * @returns {Promise<string>} Nombre del archivo actualizado
+ * @returns {Promise<string>} Hash de la nueva imagen
  */
 export async function updateImage(idObject, file, bucket = 'productos', endpoint) {
   if (!file) {
     showNotification('No se proporcionó ningún archivo para actualizar',"info");
+    return null;
   }
-  const data = await fetchFromApi(endpoint,idObject);
-
-  if(data.img){
-    await deleteImage(data.img,bucket);
-  }
-
-  
-
-  const ext = (file.name.split('.').pop() || '').replace(/[^a-z0-9]/gi, '').toLowerCase();
-  const fileName = `${idObject}.${ext}`;
+  const hash = await uploadImage(file);
+  const data = await fetchFromApi(endpoint, idObject);
 
-  
-  const { error } = await SUPABASE.storage
-    .from(bucket)
-    .upload(fileName, file, { upsert: true });
-
-  if (error) {
-    handleApiError(error);
-    throw error;
+  if (data?.img && data.img !== hash) {
+    await deleteImage(data.img, bucket);
   }
 
-  return fileName;
+  return hash;
 }
 
 /**
- * Elimina una imagen de Supabase Storage.
+ * Elimina una imagen heredada de Supabase Storage (las del almacén del
+ * backend no se eliminan).
  * @param {string} fileName - Nombre del archivo a eliminar (ej: "123.jpg")
  * @param {string} bucket - Bucket de Supabase
  */
 export async function deleteImage(fileName, bucket='productos'){
-  if (!fileName) return;
+  if (!fileName || isStoredImage(fileName)) return;
   const {error} = await SUPABASE.storage
   .from(bucket)
   .remove([fileName])
@@ -83,15 +102,20 @@ export async function deleteImage(fileName, bucket='productos'){
 }
 
 /**
- * Obtiene la URL pública de una imagen.
- * @param {string} fileName - Nombre del archivo (ej: "123.jpg")
- * @param {string} bucket - Bucket de Supabase
- * @returns {string} URL pública de la imagen
+ * URL de una imagen: la miniatura del tamaño pedido si está en el almacén
+ * del backend, o la URL pública de Supabase si es un archivo heredado.
+ * @param {string} fileName - Hash o nombre del archivo (ej: "123.jpg")
+ * @param {string} bucket - Bucket de Supabase (archivos heredados)
+ * @param {string} size - Miniatura: 'sm' (128 px), 'md' (320 px) o 'lg' (640 px)
+ * @returns {string} URL de la imagen
  */
-export function fetchFromImagen(fileName, bucket = 'productos') {
+export function fetchFromImagen(fileName, bucket = 'productos', size = 'md') {
   if(!fileName){
     return;
   }
+  if (isStoredImage(fileName)) {
+    return `${API_BASE_URL}/imagenes/${fileName}/${size}`;
+  }
   const { data } = SUPABASE.storage.from(bucket).getPublicUrl(fileName);
   return data?.publicUrl || '';
 }